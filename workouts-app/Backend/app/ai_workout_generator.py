@@ -1,8 +1,9 @@
 import os
 import json
 from typing import Dict, List, Optional
-from groq import Groq
 from pydantic import BaseModel
+from .chaos import inject
+from .tracing import span, traced, CLIENT
 
 class AIWorkoutRequest(BaseModel):
     # New structured approach
@@ -32,6 +33,15 @@ class AIWorkoutResponse(BaseModel):
     exercises: List[Exercise]
     tips: List[str]
 
+def Groq(*args, **kwargs):
+    """groq.Groq, imported on first use: the SDK adds ~100ms to every cold start"""
+    from groq import Groq as client_class
+    return client_class(*args, **kwargs)
+
+
+GROQ_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+
 class AIWorkoutGenerator:
     def __init__(self):
         api_key = os.getenv("GROQ_API_KEY")
@@ -39,6 +49,7 @@ class AIWorkoutGenerator:
             raise ValueError("GROQ_API_KEY environment variable is not set or is using the default placeholder value")
         self.client = Groq(api_key=api_key)
         
+    @traced("ai.generate_workout")
     def generate_workout(self, request: AIWorkoutRequest) -> AIWorkoutResponse:
         """Generate a workout using Groq API"""
         
@@ -46,21 +57,23 @@ class AIWorkoutGenerator:
         prompt = self._build_prompt(request)
         
         try:
-            response = self.client.chat.completions.create(
-                model="meta-llama/llama-4-scout-17b-16e-instruct",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional fitness trainer and workout planner. Create detailed, safe, and effective workout plans based on user requests. Always provide specific exercises with sets, reps, rest periods, and helpful notes."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
+            with span("groq.chat.completions", {"gen_ai.request.model": GROQ_MODEL}, CLIENT):
+                inject("groq")
+                response = self.client.chat.completions.create(
+                    model=GROQ_MODEL,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a professional fitness trainer and workout planner. Create detailed, safe, and effective workout plans based on user requests. Always provide specific exercises with sets, reps, rest periods, and helpful notes."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.7,
+                    max_tokens=1500
+                )
             
             # Parse the AI response
             ai_content = response.choices[0].message.content
@@ -134,6 +147,7 @@ class AIWorkoutGenerator:
         
         return "\n".join(prompt_parts)
     
+    @traced("ai.parse_response")
     def _parse_ai_response(self, ai_content: str, request: AIWorkoutRequest) -> AIWorkoutResponse:
         """Parse the AI response and convert to our data model"""
         
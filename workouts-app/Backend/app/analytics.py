@@ -0,0 +1,278 @@
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import select
+from .models import Workout, Exercise, WorkoutLog, ExerciseLog, CanonicalExercise
+from .canonical import normalize_exercise_name, display_name
+
+
+FORMULAS = ("epley", "brzycki")
+SECONDS_PER_WEEK = 7 * 24 * 3600
+
+
+def _epoch_seconds(column, dialect: str):
+    # Let the database hand back plain floats instead of per-row datetime parsing
+    if dialect == "postgresql":
+        return func.extract("epoch", column)
+    return (func.julianday(column) - 2440587.5) * 86400.0
+
+
+def load_exercise_logs(session, user_id: int, exercise: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Load a user's exercise logs as columnar arrays in a single query.
+
+    Exercises are grouped by canonical exercise; rows not yet backfilled
+    fall back to the same name normalization. The log query returns only
+    numbers; names are resolved per exercise row, never per log.
+    """
+    exercises = session.exec(
+        select(Exercise.id, Exercise.name, CanonicalExercise.key, CanonicalExercise.name)
+        .join(Workout)
+        .outerjoin(CanonicalExercise, Exercise.canonical_id == CanonicalExercise.id)
+        .where(Workout.owner_id == user_id)
+    ).all()
+    exercises = [
+        (eid, key or normalize_exercise_name(name), canonical_name or display_name(normalize_exercise_name(name)))
+        for eid, name, key, canonical_name in exercises
+    ]
+    if exercise:
+        wanted = normalize_exercise_name(exercise)
+        exercises = [row for row in exercises if row[1] == wanted]
+    if not exercises:
+        return empty_columns()
+
+    # exercise id -> dense group code
+    codes_by_key, names = {}, []
+    ids = np.array([row[0] for row in exercises], dtype=np.int64)
+    group_of_id = np.empty(len(exercises), dtype=np.int64)
+    for i, (_, key, name) in enumerate(exercises):
+        if key not in codes_by_key:
+            codes_by_key[key] = len(names)
+            names.append(name)
+        group_of_id[i] = codes_by_key[key]
+    # Sorted ids to search log rows against: memory follows the user's exercises, not the largest id
+    order = np.argsort(ids)
+    sorted_ids, group_of_sorted = ids[order], group_of_id[order]
+
+    dialect = session.get_bind().dialect.name
+    statement = (
+        select(
+            ExerciseLog.exercise_id,
+            _epoch_seconds(WorkoutLog.workout_date, dialect),
+            ExerciseLog.actual_sets,
+            ExerciseLog.actual_reps,
+            ExerciseLog.weight,
+        )
+        .join(WorkoutLog, ExerciseLog.workout_log_id == WorkoutLog.id)
+        .join(Workout, WorkoutLog.workout_id == Workout.id)
+        .where(Workout.owner_id == user_id)
+    )
+    if exercise:
+        statement = statement.where(ExerciseLog.exercise_id.in_(ids.tolist()))
+    # Core execution, transposed into one float matrix (None -> NaN)
+    rows = session.connection().execute(statement).fetchall()
+    if not rows:
+        return empty_columns()
+    data = np.array(list(zip(*rows)), dtype=np.float64)
+    exercise_ids = data[0].astype(np.int64)
+    positions = np.minimum(np.searchsorted(sorted_ids, exercise_ids), len(sorted_ids) - 1)
+    known = sorted_ids[positions] == exercise_ids
+    return {
+        "code": group_of_sorted[positions[known]],
+        "name": np.array(names, dtype=object),
+        "time": data[1, known],
+        "sets": data[2, known],
+        "reps": data[3, known],
+        "weight": data[4, known],
+    }
+
+
+def empty_columns() -> Dict[str, np.ndarray]:
+    return {
+        "code": np.array([], dtype=np.int64),
+        "name": np.array([], dtype=object),
+        "time": np.array([], dtype=np.float64),
+        "sets": np.array([], dtype=np.float64),
+        "reps": np.array([], dtype=np.float64),
+        "weight": np.array([], dtype=np.float64),
+    }
+
+
+def estimate_1rm(weight: np.ndarray, reps: np.ndarray, formula: str = "epley") -> np.ndarray:
+    """Estimated one-rep max; NaN where weight/reps don't allow an estimate"""
+    valid = (weight > 0) & (reps > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if formula == "brzycki":
+            e1rm = weight * 36.0 / (37.0 - reps)
+            valid &= reps < 37
+        else:
+            e1rm = weight * (1.0 + reps / 30.0)
+    e1rm = np.where(reps == 1, weight, e1rm)
+    return np.where(valid, e1rm, np.nan)
+
+
+def _group_max(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # NaN-aware per-group max over contiguous groups
+    filled = np.where(np.isnan(values), -np.inf, values)
+    result = np.maximum.reduceat(filled, starts)
+    return np.where(np.isneginf(result), np.nan, result)
+
+
+def _group_argmax(values: np.ndarray, best: np.ndarray, codes: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # Index of each group's maximum (last occurrence on ties) given the group maxima
+    hits = np.where(values == best[codes], np.arange(len(values)), -1)
+    return np.maximum.reduceat(hits, starts)
+
+
+def _rolling_mean(values: np.ndarray, starts_per_row: np.ndarray, window: int) -> np.ndarray:
+    # Mean of the last `window` non-NaN values within each row's group
+    present = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(present)))
+    idx = np.arange(len(values))
+    lo = np.maximum(idx - window + 1, starts_per_row)
+    total = csum[idx + 1] - csum[lo]
+    count = ccount[idx + 1] - ccount[lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _group_slope(x: np.ndarray, y: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    # Least-squares slope of y over x per group, ignoring NaNs
+    present = ~np.isnan(y)
+    x, y, codes = x[present], y[present], codes[present]
+    n = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    sx = np.bincount(codes, x, n_groups)
+    sy = np.bincount(codes, y, n_groups)
+    sxy = np.bincount(codes, x * y, n_groups)
+    sxx = np.bincount(codes, x * x, n_groups)
+    denom = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sxy - sx * sy) / denom
+    return np.where((n >= 2) & (denom > 0), slope, np.nan)
+
+
+def _num(value) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), 2)
+
+
+def _iso(seconds: float) -> str:
+    return str(np.datetime64(int(round(seconds)), "s"))
+
+
+def compute_progression(columns: Dict[str, np.ndarray], formula: str = "epley", window: int = 5,
+                        points: int = 20) -> List[dict]:
+    """Per-exercise volume, estimated 1RM, personal records and trends.
+
+    Every metric is computed with whole-array operations; the only Python
+    loop is over exercises when building the response.
+    """
+    if len(columns["code"]) == 0:
+        return []
+
+    order = np.lexsort((columns["time"], columns["code"]))
+    codes = columns["code"][order]
+    names = columns["name"]
+    seconds = columns["time"][order]
+    sets = columns["sets"][order]
+    reps = columns["reps"][order]
+    weight = columns["weight"][order]
+
+    volume = sets * reps * np.nan_to_num(weight)
+    e1rm = estimate_1rm(weight, reps, formula)
+    other_formula = "brzycki" if formula == "epley" else "epley"
+    e1rm_other = estimate_1rm(weight, reps, other_formula)
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    n_groups = len(starts)
+    group_names = names[codes[starts]]
+    # Renumber so codes are contiguous even when some exercises have no logs
+    codes = np.cumsum(np.r_[0, codes[1:] != codes[:-1]])
+
+    entries = np.bincount(codes, minlength=n_groups)
+    total_volume = np.bincount(codes, volume, n_groups)
+    total_sets = np.bincount(codes, sets, n_groups)
+    total_reps = np.bincount(codes, sets * reps, n_groups)
+    best_weight = _group_max(weight, starts)
+    best_e1rm = _group_max(e1rm, starts)
+    best_e1rm_other = _group_max(e1rm_other, starts)
+    best_volume = _group_max(volume, starts)
+    best_e1rm_at = _group_argmax(e1rm, best_e1rm, codes, starts)
+    best_volume_at = _group_argmax(volume, best_volume, codes, starts)
+    rolling_e1rm = _rolling_mean(e1rm, starts[codes], window)
+
+    # Weeks since each exercise's first entry; keeps the regression well conditioned
+    weeks = (seconds - seconds[starts][codes]) / SECONDS_PER_WEEK
+    weekly_trend = _group_slope(weeks, e1rm, codes, n_groups)
+
+    result = []
+    for g in range(n_groups):
+        start, end = starts[g], ends[g]
+        recent = slice(max(start, end - points), end)
+        has_e1rm = not np.isnan(best_e1rm[g])
+        result.append({
+            "exercise": group_names[g],
+            "entries": int(entries[g]),
+            "first_date": _iso(seconds[start]),
+            "last_date": _iso(seconds[end - 1]),
+            "total_sets": int(total_sets[g]),
+            "total_reps": int(total_reps[g]),
+            "total_volume": _num(total_volume[g]),
+            "records": {
+                "best_weight": _num(best_weight[g]),
+                f"best_e1rm_{formula}": _num(best_e1rm[g]),
+                f"best_e1rm_{other_formula}": _num(best_e1rm_other[g]),
+                "best_e1rm_date": _iso(seconds[best_e1rm_at[g]]) if has_e1rm else None,
+                "best_volume": _num(best_volume[g]),
+                "best_volume_date": _iso(seconds[best_volume_at[g]]),
+            },
+            "trend": {
+                "formula": formula,
+                "e1rm_change_per_week": _num(weekly_trend[g]),
+                "rolling_e1rm": _num(rolling_e1rm[end - 1]),
+                "window": window,
+            },
+            "history": [
+                {"date": _iso(d), "volume": _num(v), "e1rm": _num(e), "rolling_e1rm": _num(r)}
+                for d, v, e, r in zip(seconds[recent], volume[recent], e1rm[recent], rolling_e1rm[recent])
+            ],
+        })
+    result.sort(key=lambda item: item["total_volume"] or 0, reverse=True)
+    return result
+
+
+def exercise_stats(session, user_id: int) -> List[dict]:
+    """Per-canonical-exercise totals for a user as one indexed GROUP BY"""
+    volume = ExerciseLog.actual_sets * ExerciseLog.actual_reps * func.coalesce(ExerciseLog.weight, 0)
+    rows = session.exec(
+        select(
+            CanonicalExercise.id,
+            CanonicalExercise.name,
+            func.count(ExerciseLog.id),
+            func.sum(ExerciseLog.actual_sets),
+            func.sum(ExerciseLog.actual_sets * ExerciseLog.actual_reps),
+            func.sum(volume),
+            func.max(ExerciseLog.weight),
+            func.max(WorkoutLog.workout_date),
+        )
+        .join(Exercise, Exercise.canonical_id == CanonicalExercise.id)
+        .join(ExerciseLog, ExerciseLog.exercise_id == Exercise.id)
+        .join(WorkoutLog, ExerciseLog.workout_log_id == WorkoutLog.id)
+        .join(Workout, Exercise.workout_id == Workout.id)
+        .where(Workout.owner_id == user_id)
+        .group_by(CanonicalExercise.id, CanonicalExercise.name)
+        .order_by(func.count(ExerciseLog.id).desc(), CanonicalExercise.name)
+    ).all()
+    return [
+        {
+            "canonical_id": canonical_id,
+            "exercise": name,
+            "entries": entries,
+            "total_sets": int(sets or 0),
+            "total_reps": int(reps or 0),
+            "total_volume": round(float(total or 0), 2),
+            "best_weight": weight,
+            "last_date": last,
+        }
+        for canonical_id, name, entries, sets, reps, total, weight, last in rows
+    ]
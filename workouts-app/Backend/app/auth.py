@@ -1,22 +1,26 @@
 import os
 import hashlib
+import importlib.util
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, Header, HTTPException, Request
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from sqlmodel import select
 from .db import get_session
 from .models import User
+from .chaos import inject
+from .tracing import span
 
-# Try to use bcrypt if available (Docker), fallback to simple hashing (local)
-try:
+# Use bcrypt if available (Docker), fallback to simple hashing (local).
+# passlib is imported on first use; building its context slows every cold start.
+USE_BCRYPT = all(importlib.util.find_spec(name) is not None for name in ("passlib", "bcrypt"))
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context():
     from passlib.context import CryptContext
-    import bcrypt  # Check if bcrypt is actually available
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    USE_BCRYPT = True
-except (ImportError, Exception):
-    USE_BCRYPT = False
-    pwd_context = None
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_secret_key() -> str:
@@ -29,7 +33,9 @@ def get_serializer() -> URLSafeTimedSerializer:
 
 def hash_password(password: str) -> str:
     if USE_BCRYPT:
-        return pwd_context.hash(password)
+        with span("auth.hash_password", {"auth.scheme": "bcrypt"}):
+            inject("bcrypt")
+            return get_pwd_context().hash(password)
     else:
         # Simple SHA256 hashing for local development
         salt = get_secret_key()
@@ -43,11 +49,13 @@ def _looks_like_bcrypt(hash_value: str) -> bool:
 def verify_password(password: str, password_hash: str) -> bool:
     # Support legacy/local SHA256 hashes and bcrypt hashes side-by-side
     if _looks_like_bcrypt(password_hash):
-        if USE_BCRYPT and pwd_context is not None:
-            try:
-                return pwd_context.verify(password, password_hash)
-            except Exception:
-                return False
+        if USE_BCRYPT:
+            with span("auth.verify_password", {"auth.scheme": "bcrypt"}):
+                inject("bcrypt")
+                try:
+                    return get_pwd_context().verify(password, password_hash)
+                except Exception:
+                    return False
         # bcrypt hash present but bcrypt backend not available locally
         return False
     # Fallback/legacy SHA256 verification
@@ -70,6 +78,11 @@ def decode_session_cookie(token: str) -> Optional[int]:
 
 
 def require_user(request: Request, session=Depends(get_session)) -> User:
+    with span("auth.require_user"):
+        return _authenticate(request, session)
+
+
+def _authenticate(request: Request, session) -> User:
     token = request.cookies.get("session") or request.headers.get("x-session")
     user_id = decode_session_cookie(token) if token else None
     if not user_id:
@@ -77,6 +90,11 @@ def require_user(request: Request, session=Depends(get_session)) -> User:
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(401, "Invalid session")
+    # Lets db pin this user's reads to the primary after they write
+    session.info["user_id"] = user.id
     return user
 
 
+def require_admin(x_admin_token: str = Header(None)) -> None:
+    if x_admin_token != os.getenv("ADMIN_TOKEN", "changeme"):
+        raise HTTPException(403, "bad admin token")
@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+# redis is optional: only needed for CACHE_BACKEND=redis
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+INVALIDATION_CHANNEL = "workouts-cache-invalidate"
+
+
+class CacheBackend(ABC):
+    """Byte cache grouped into namespaces that are invalidated as a whole"""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self, namespace: str) -> None:
+        ...
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (namespace, key) -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[(namespace, key)]
+                return None
+            self._entries.move_to_end((namespace, key))
+            return entry[1]
+
+    def set(self, namespace, key, value, ttl):
+        with self._lock:
+            self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[entry_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache(CacheBackend):
+    """Shared cache on any Redis-protocol server; one hash per namespace.
+
+    ``client`` only needs the redis-py methods used here, so tests can pass
+    an in-memory fake.
+    """
+
+    def __init__(self, client, channel: str = INVALIDATION_CHANNEL):
+        self.client = client
+        self.channel = channel
+
+    def get(self, namespace, key):
+        return self.client.hget(namespace, key)
+
+    def set(self, namespace, key, value, ttl):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(namespace, key, value)
+        pipe.expire(namespace, ttl)
+        pipe.execute()
+
+    def generation(self, namespace: str) -> int:
+        """How many times ``namespace`` has been invalidated, across replicas"""
+        return int(self.client.get(f"{namespace}:generation") or 0)
+
+    def invalidate(self, namespace):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incr(f"{namespace}:generation")
+        pipe.delete(namespace)
+        pipe.execute()
+
+    def publish(self, namespace: str) -> None:
+        self.client.publish(self.channel, namespace)
+
+    def listen(self, handler: Callable[[Optional[str]], None]) -> threading.Thread:
+        """Call ``handler(namespace)`` for every broadcast invalidation.
+
+        ``handler(None)`` means messages may have been missed (reconnect) and
+        everything held locally should be dropped.
+        """
+        def run():
+            while True:
+                try:
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(self.channel)
+                    handler(None)
+                    for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        data = message["data"]
+                        handler(data.decode() if isinstance(data, bytes) else data)
+                except Exception as e:
+                    print(f"Cache invalidation listener error: {e}")
+                    time.sleep(1)
+
+        thread = threading.Thread(target=run, name="cache-invalidation", daemon=True)
+        thread.start()
+        return thread
+
+
+class ResponseCache:
+    """Local LRU in front of an optional shared backend.
+
+    Invalidations clear both layers and are broadcast so every replica drops
+    its local copy as well. Entries are stored under the namespace's
+    generation, which every invalidation bumps: a value built from data read
+    before an invalidation is set under the old generation, where no later
+    ``get`` looks, instead of being served until it expires.
+    """
+
+    def __init__(self, local: LRUCache, shared: Optional[RedisCache] = None, ttl: int = 60, local_ttl: int = 30):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        # Bounds staleness on this replica if a pub/sub message is lost
+        self.local_ttl = min(local_ttl, ttl)
+        # Local generations: invalidations seen by this replica, per namespace and overall
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        if shared is not None:
+            shared.listen(self._on_broadcast)
+
+    def _local_generation(self, namespace: str) -> str:
+        with self._lock:
+            return f"{self._epoch}.{self._generations.get(namespace, 0)}"
+
+    def generation(self, namespace: str) -> Tuple[str, int]:
+        """Read before building a value to ``set``, so the value is dropped if an invalidation comes in between"""
+        shared = self.shared.generation(namespace) if self.shared is not None else 0
+        return self._local_generation(namespace), shared
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        local_key = f"{self._local_generation(namespace)}:{key}"
+        value = self.local.get(namespace, local_key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(namespace, f"{self.shared.generation(namespace)}:{key}")
+            if value is not None:
+                self.local.set(namespace, local_key, value, self.local_ttl)
+        return value
+
+    def set(self, namespace: str, key: str, value: bytes, generation: Optional[Tuple[str, int]] = None) -> None:
+        local, shared = generation if generation is not None else self.generation(namespace)
+        self.local.set(namespace, f"{local}:{key}", value, self.local_ttl)
+        if self.shared is not None:
+            self.shared.set(namespace, f"{shared}:{key}", value, self.ttl)
+
+    def invalidate(self, namespace: str) -> None:
+        self._drop_local(namespace)
+        if self.shared is not None:
+            self.shared.invalidate(namespace)
+            self.shared.publish(namespace)
+
+    def _drop_local(self, namespace: str) -> None:
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self.local.invalidate(namespace)
+
+    def _on_broadcast(self, namespace: Optional[str]) -> None:
+        if namespace is None:
+            with self._lock:
+                self._epoch += 1
+            self.local.clear()
+        else:
+            self._drop_local(namespace)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def build_cache() -> ResponseCache:
+    ttl = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+    local = LRUCache(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "10000")))
+    backend = os.getenv("CACHE_BACKEND", "memory").lower()
+    if backend == "redis":
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        client = redis.Redis.from_url(os.getenv("REDIS_URL") or "redis://localhost:6379/0")
+        return ResponseCache(local, RedisCache(client), ttl=ttl)
+    return ResponseCache(local, ttl=ttl)
+
+
+def get_cache() -> ResponseCache:
+    # Built lazily so the pub/sub listener thread starts in the serving process
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = build_cache()
+    return _cache
+
+
+def set_cache(cache: Optional[ResponseCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def user_workouts_namespace(user_id: int) -> str:
+    return f"workouts:{user_id}"
+
+
+def invalidate_user_workouts(user_id: int) -> None:
+    get_cache().invalidate(user_workouts_namespace(user_id))
+
+
+def cached_json_response(namespace: str, key: str, build: Callable[[], object]) -> Response:
+    """Serve ``build()`` as JSON, caching the serialized bytes"""
+    cache = get_cache()
+    body = cache.get(namespace, key)
+    if body is None:
+        # Taken before build() reads anything, so a write that commits meanwhile discards this fill
+        generation = cache.generation(namespace)
+        body = json.dumps(
+            jsonable_encoder(build()), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+        cache.set(namespace, key, body, generation)
+    return Response(body, media_type="application/json")
@@ -0,0 +1,137 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy import update
+from sqlmodel import Session, select
+from .cache import invalidate_user_workouts
+from .catalog import tokenize
+from .db import insert_or_ignore
+from .models import CanonicalExercise, Exercise, Workout
+from .sync import stamp
+from .unit_of_work import model_defaults
+
+
+# Shorthand expanded token by token
+ABBREVIATIONS = {
+    "db": "dumbbell",
+    "bb": "barbell",
+    "kb": "kettlebell",
+    "bw": "bodyweight",
+    "pushup": "push up",
+    "pullup": "pull up",
+    "chinup": "chin up",
+    "situp": "sit up",
+    "ups": "up",  # too short for the plural rule: "push-ups", "sit-ups"
+}
+
+# Whole-name synonyms, applied after tokens are normalized
+ALIASES = {
+    "back squat": "squat",
+    "barbell squat": "squat",
+    "barbell back squat": "squat",
+    "bodyweight squat": "squat",
+    "air squat": "squat",
+    "press up": "push up",
+    "bodyweight push up": "push up",
+    "bench": "bench press",
+    "barbell bench press": "bench press",
+    "flat bench press": "bench press",
+    "conventional deadlift": "deadlift",
+    "barbell deadlift": "deadlift",
+    "rdl": "romanian deadlift",
+    "ohp": "overhead press",
+    "military press": "overhead press",
+    "forearm plank": "plank",
+}
+
+
+def normalize_exercise_name(name: str) -> str:
+    """Stable identity key for an exercise name.
+
+    "Squats", " squat " and "Back Squat" all map to "squat": lowercase,
+    punctuation-insensitive, singular, with shorthand and synonyms resolved.
+    """
+    tokens = []
+    for token in tokenize(name.replace("&", " and ")):
+        tokens.extend(ABBREVIATIONS.get(token, token).split())
+    key = " ".join(tokens)
+    return ALIASES.get(key, key)
+
+
+def display_name(key: str) -> str:
+    return key.title()
+
+
+def resolve_canonical_many(session: Session, names: Iterable[str],
+                           cache: Optional[Dict[str, int]] = None) -> Dict[str, Optional[int]]:
+    """Canonical exercise id for each of ``names`` (None for blank ones), creating missing rows.
+
+    At most three statements however many names: one lookup, one
+    multi-row insert that ignores keys inserted concurrently, and a lookup
+    of those. Runs in the caller's transaction. ``cache`` (key -> id) lets
+    callers working in batches skip keys already resolved.
+    """
+    cache = {} if cache is None else cache
+    keys = {name: normalize_exercise_name(name) for name in names}
+    wanted = sorted({key for key in keys.values() if key and key not in cache})
+    if wanted:
+        cache.update(session.exec(
+            select(CanonicalExercise.key, CanonicalExercise.id).where(CanonicalExercise.key.in_(wanted))).all())
+        new = [key for key in wanted if key not in cache]
+        if new:
+            inserted = insert_or_ignore(session.get_bind(), CanonicalExercise, ["key"]).returning(
+                CanonicalExercise.key, CanonicalExercise.id)
+            cache.update(session.execute(inserted, [
+                model_defaults(CanonicalExercise, {"key": key, "name": display_name(key)}) for key in new]).all())
+            raced = [key for key in new if key not in cache]
+            if raced:
+                cache.update(session.exec(
+                    select(CanonicalExercise.key, CanonicalExercise.id).where(CanonicalExercise.key.in_(raced))).all())
+    return {name: cache[key] if key else None for name, key in keys.items()}
+
+
+def resolve_canonical(session: Session, name: str, cache: Optional[Dict[str, int]] = None) -> Optional[int]:
+    """Id of the canonical exercise for ``name``, creating it if needed"""
+    return resolve_canonical_many(session, [name], cache)[name]
+
+
+def backfill_canonical(session: Session, batch_size: int = 1000) -> int:
+    """Link every Exercise without a canonical id; commits once per batch.
+
+    Linked rows are stamped for sync and their owners' cached workouts
+    invalidated, as for any other edit.
+    """
+    cache: Dict[str, int] = {}
+    updated = 0
+    last_id = 0
+    while True:
+        rows = session.exec(
+            select(Exercise.id, Exercise.name, Workout.owner_id)
+            .join(Workout, Workout.id == Exercise.workout_id)
+            .where(Exercise.canonical_id.is_(None), Exercise.id > last_id)
+            .order_by(Exercise.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        canonical_ids = resolve_canonical_many(session, [name for _, name, _ in rows], cache)
+        linked = [(eid, name, owner_id) for eid, name, owner_id in rows if canonical_ids[name] is not None]
+        # One change number per owner, taken in id order so concurrent writers lock users alike
+        stamps = {owner_id: stamp(session, owner_id) for owner_id in sorted({owner_id for _, _, owner_id in linked})}
+        params = [{"id": eid, "canonical_id": canonical_ids[name], **stamps[owner_id]} for eid, name, owner_id in linked]
+        if params:
+            session.execute(update(Exercise), params)
+        session.commit()
+        for owner_id in stamps:
+            invalidate_user_workouts(owner_id)
+        updated += len(params)
+        last_id = rows[-1][0]
+
+if __name__ == "__main__":
+    import argparse
+    from .db import engine, init_db
+    parser = argparse.ArgumentParser(description="Link existing exercises to canonical exercises")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    init_db()
+    with Session(engine) as session:
+        print(f"Linked {backfill_canonical(session, args.batch_size)} exercise(s)")
@@ -0,0 +1,233 @@
+import bisect
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from sqlmodel import Session, select
+from .db import insert_or_ignore
+from .models import CatalogExercise
+from .unit_of_work import model_defaults
+
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "exercise_catalog.json")
+
+# Weight of a token match by the field it came from
+FIELD_WEIGHTS = {"name": 4.0, "variations": 2.0, "muscle_groups": 2.0, "category": 1.0, "equipment": 1.0}
+# Score multiplier by how the query token matched
+EXACT, PREFIX, FUZZY = 1.0, 0.6, 0.4
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def singularize(token: str) -> str:
+    """Naive English plural strip ("squats" -> "squat", "presses" -> "press")"""
+    if len(token) > 4 and token.endswith(("ches", "shes", "sses", "xes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, singularized"""
+    return [singularize(token) for token in _TOKEN_RE.findall(text.lower())]
+
+
+def _deletes(token: str) -> Set[str]:
+    # Single-character deletions; two tokens within one edit share a variant
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    # Levenshtein distance <= 1, plus adjacent transpositions
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        return len(diff) == 1 or (
+            len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+        )
+    if la > lb:
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+class CatalogIndex:
+    """Immutable in-memory search index over catalog entries.
+
+    Built once per catalog load; lookups only touch dicts and a sorted
+    vocabulary, so they do not scale with the size of the catalog.
+    """
+
+    def __init__(self, entries: Iterable[dict]):
+        self.entries: List[dict] = sorted(entries, key=lambda e: e["name"].lower())
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.facets: Dict[str, Dict[str, Set[int]]] = {
+            "category": defaultdict(set),
+            "muscle_group": defaultdict(set),
+            "equipment": defaultdict(set),
+            "difficulty": defaultdict(set),
+        }
+        for doc, entry in enumerate(self.entries):
+            for field, weight in FIELD_WEIGHTS.items():
+                values = entry[field] if isinstance(entry[field], list) else [entry[field]]
+                for value in values:
+                    for token in tokenize(value):
+                        if self.postings[token].get(doc, 0) < weight:
+                            self.postings[token][doc] = weight
+            self.facets["category"][entry["category"].lower()].add(doc)
+            self.facets["difficulty"][entry["difficulty"].lower()].add(doc)
+            for group in entry["muscle_groups"]:
+                self.facets["muscle_group"][group.lower()].add(doc)
+            for item in entry["equipment"]:
+                self.facets["equipment"][item.lower()].add(doc)
+
+        self.vocabulary: List[str] = sorted(self.postings)
+        self.neighbours: Dict[str, Set[str]] = defaultdict(set)
+        for token in self.vocabulary:
+            if len(token) >= 4:
+                for variant in _deletes(token):
+                    self.neighbours[variant].add(token)
+
+        self._facet_values = {
+            "category": sorted({e["category"] for e in self.entries}),
+            "muscle_group": sorted({g for e in self.entries for g in e["muscle_groups"]}),
+            "equipment": sorted({item for e in self.entries for item in e["equipment"]}),
+            "difficulty": sorted({e["difficulty"] for e in self.entries}),
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(self.vocabulary, prefix)
+        hi = bisect.bisect_left(self.vocabulary, prefix + "\uffff")
+        return self.vocabulary[lo:hi]
+
+    def _fuzzy(self, token: str) -> Set[str]:
+        # Typos are only forgiven on tokens long enough to be unambiguous
+        if len(token) < 4:
+            return set()
+        candidates = set(self.neighbours.get(token, ()))
+        for variant in _deletes(token):
+            if variant in self.postings:
+                candidates.add(variant)
+            candidates |= self.neighbours.get(variant, set())
+        return {c for c in candidates if _within_one_edit(token, c)}
+
+    def _match_token(self, token: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+
+        def add(vocab_token, multiplier):
+            for doc, weight in self.postings[vocab_token].items():
+                scores[doc] = max(scores.get(doc, 0.0), weight * multiplier)
+
+        for vocab_token in self._prefixed(token):
+            add(vocab_token, EXACT if vocab_token == token else PREFIX)
+        for vocab_token in self._fuzzy(token):
+            add(vocab_token, FUZZY)
+        return scores
+
+    def search(self, query: str = "", limit: int = 20, **filters: Optional[str]) -> List[dict]:
+        """Entries matching every query token (exact, prefix or one typo) and every filter.
+
+        ``filters`` are facet names (category, muscle_group, equipment,
+        difficulty) mapped to a value; matching is case-insensitive.
+        """
+        candidates: Optional[Set[int]] = None
+        for facet, value in filters.items():
+            if value:
+                docs = self.facets[facet].get(value.lower(), set())
+                candidates = docs if candidates is None else candidates & docs
+
+        scores: Optional[Dict[int, float]] = None
+        for token in dict.fromkeys(tokenize(query)):
+            matched = self._match_token(token)
+            if scores is None:
+                scores = matched
+            else:
+                scores = {doc: score + matched[doc] for doc, score in scores.items() if doc in matched}
+            if not scores:
+                return []
+
+        if scores is None:
+            docs = range(len(self.entries)) if candidates is None else sorted(candidates)
+            return [self.entries[doc] for doc in docs][:limit]
+        if candidates is not None:
+            scores = {doc: score for doc, score in scores.items() if doc in candidates}
+        # Entries are pre-sorted by name, so doc order breaks score ties alphabetically
+        ranked = sorted(scores, key=lambda doc: (-scores[doc], doc))
+        return [self.entries[doc] for doc in ranked[:limit]]
+
+    def facet_values(self) -> Dict[str, List[str]]:
+        """Display values for each facet, for building filter controls"""
+        return self._facet_values
+
+
+def _entry(row: CatalogExercise) -> dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "category": row.category,
+        "difficulty": row.difficulty,
+        "muscle_groups": list(row.muscle_groups or []),
+        "equipment": list(row.equipment or []),
+        "instructions": list(row.instructions or []),
+        "tips": list(row.tips or []),
+        "variations": list(row.variations or []),
+        "common_mistakes": list(row.common_mistakes or []),
+    }
+
+
+def seed_catalog(session: Session, path: str = CATALOG_PATH) -> int:
+    """Insert catalog entries from the JSON data file that are not in the table yet.
+
+    Safe to run from several processes at once: entries another one
+    inserted first are skipped, not a unique violation.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    existing = set(session.exec(select(CatalogExercise.id)).all())
+    missing = [model_defaults(CatalogExercise, item) for item in data if item["id"] not in existing]
+    if not missing:
+        return 0
+    added = session.execute(
+        insert_or_ignore(session.get_bind(), CatalogExercise, ["id"]).returning(CatalogExercise.id), missing).all()
+    session.commit()
+    return len(added)
+
+
+def load_catalog(session: Session) -> CatalogIndex:
+    seed_catalog(session)
+    return CatalogIndex(_entry(row) for row in session.exec(select(CatalogExercise)).all())
+
+
+_index: Optional[CatalogIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_catalog() -> CatalogIndex:
+    # Built on first use; call reload_catalog() after editing the table
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from .db import engine
+                with Session(engine) as session:
+                    _index = load_catalog(session)
+    return _index
+
+
+def reload_catalog() -> CatalogIndex:
+    global _index
+    with _index_lock:
+        _index = None
+    return get_catalog()
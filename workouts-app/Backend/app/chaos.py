@@ -0,0 +1,149 @@
+"""Fault injection for rehearsing slow or failing dependencies in staging.
+
+Faults are switched on through ``POST /admin/fail/{target}_latency/on``
+and apply only while a request is being served, so background imports
+and the health checker are never slowed.
+"""
+import contextvars
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+
+TARGETS = ("db", "groq", "bcrypt")
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "exponential")
+
+_sleep = time.sleep  # patched in tests
+_request: contextvars.ContextVar = contextvars.ContextVar("chaos_request", default=None)
+
+
+class ChaosError(RuntimeError):
+    """Raised at an injection point to simulate a failing dependency"""
+
+
+@dataclass(frozen=True)
+class Fault:
+    """Latency and errors for one dependency, on ``percent`` of the requests matching ``route``"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    distribution: str = "fixed"
+    error_rate: float = 0.0
+    percent: float = 100.0
+    route: Optional[str] = None  # route template, e.g. /api/workouts/{wid}, or a path prefix
+
+    def validate(self) -> None:
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of: {', '.join(DISTRIBUTIONS)}")
+        if self.latency_ms < 0 or self.jitter_ms < 0:
+            raise ValueError("latency_ms and jitter_ms must be >= 0")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        if not 0 <= self.percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+
+    def delay_seconds(self, rng=random) -> float:
+        if self.distribution == "uniform":
+            ms = rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        elif self.distribution == "normal":
+            ms = rng.gauss(self.latency_ms, self.jitter_ms)
+        elif self.distribution == "exponential":
+            ms = rng.expovariate(1 / self.latency_ms) if self.latency_ms else 0.0
+        else:
+            ms = self.latency_ms
+        return max(0.0, ms) / 1000
+
+    def matches(self, scope) -> bool:
+        if self.route is None:
+            return True
+        route = scope.get("route")
+        return getattr(route, "path", None) == self.route or scope["path"].startswith(self.route)
+
+
+# target -> active fault; replaced wholesale so readers never see a partial update
+_faults: Dict[str, Fault] = {}
+
+
+def set_fault(target: str, fault: Optional[Fault]) -> None:
+    global _faults
+    if target not in TARGETS:
+        raise ValueError(f"target must be one of: {', '.join(TARGETS)}")
+    faults = dict(_faults)
+    if fault is None:
+        faults.pop(target, None)
+    else:
+        fault.validate()
+        faults[target] = fault
+    _faults = faults
+
+
+def clear() -> None:
+    global _faults
+    _faults = {}
+
+
+def active_faults() -> Dict[str, dict]:
+    return {target: asdict(fault) for target, fault in _faults.items()}
+
+
+class _RequestChaos:
+    """Per-request state: whether each target's fault was drawn for this request"""
+
+    __slots__ = ("scope", "draws")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.draws: Dict[str, bool] = {}
+
+
+def inject(target: str) -> None:
+    """Delay, and possibly fail, the current request's call to ``target`` per the active fault"""
+    fault = _faults.get(target)
+    if fault is None:
+        return
+    request = _request.get()
+    if request is None or not fault.matches(request.scope):
+        return
+    affected = request.draws.get(target)
+    if affected is None:
+        # Drawn once per request, so percent is a share of requests rather than of calls
+        affected = request.draws[target] = random.random() * 100 < fault.percent
+    if not affected:
+        return
+    delay = fault.delay_seconds()
+    if delay:
+        _sleep(delay)
+    if fault.error_rate and random.random() < fault.error_rate:
+        raise ChaosError(f"injected {target} failure")
+
+
+def inject_faults(engine) -> None:
+    """Apply the ``db`` fault before every SQL statement run on ``engine``"""
+    from sqlalchemy import event
+    from sqlalchemy.exc import OperationalError
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _inject(conn, cursor, statement, parameters, context, executemany):
+        if "db" not in _faults:
+            return
+        try:
+            inject("db")
+        except ChaosError as e:
+            raise OperationalError(statement, parameters, e) from e
+
+
+class ChaosMiddleware:
+    """Marks each HTTP request so injection points know its route; free while no fault is active"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not _faults or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request.set(_RequestChaos(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request.reset(token)
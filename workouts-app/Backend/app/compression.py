@@ -0,0 +1,241 @@
+import mimetypes
+import os
+import re
+import stat
+import zlib
+import anyio
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles
+
+# brotli is optional: without it we only negotiate gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Files without a content hash in their name can change under the same URL
+REVALIDATE_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+# name-<hash>.ext as written by the Vite build (8 url-safe base64 characters), or a hex digest
+FINGERPRINTED = re.compile(r"[.-](?:[0-9a-f]{8,32}|(?=[\w-]*\d)[\w-]{8})\.[^/]+$")
+
+
+def static_cache_control(path: str) -> str:
+    """Cache-Control for a static file: immutable only when its name is fingerprinted"""
+    return IMMUTABLE_CACHE_CONTROL if FINGERPRINTED.search(path) else REVALIDATE_CACHE_CONTROL
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def negotiate_encoding(accept_encoding: str, allow_brotli: bool = True) -> Optional[str]:
+    """Pick the best encoding we support from an Accept-Encoding header"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    candidates = ["br", "gzip"] if (allow_brotli and brotli is not None) else ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _StreamCompressor:
+    """Incremental gzip/brotli encoder that flushes after every chunk"""
+
+    def __init__(self, encoding: str, level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(chunk) + self._br.flush()
+        return self._gz.compress(chunk) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression for HTTP responses.
+
+    Small bodies (below ``minimum_size``) are sent as-is. Streaming responses
+    are compressed chunk by chunk so clients still receive data incrementally.
+    Responses that already carry a Content-Encoding are left untouched. Every
+    compressible response carries ``Vary: Accept-Encoding``, compressed or not,
+    so shared caches keep the variants apart.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None, level: Optional[int] = None,
+                 brotli_quality: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else _env_int("COMPRESSION_MIN_SIZE", 1024)
+        self.level = level if level is not None else _env_int("COMPRESSION_LEVEL", 6)
+        self.brotli_quality = brotli_quality if brotli_quality is not None else _env_int("BROTLI_QUALITY", 4)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or "no-transform" in headers.get("cache-control", "")
+                    or message["status"] in (204, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                if not passthrough:
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                    passthrough = encoding is None
+                if passthrough:
+                    await send(start_message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body:
+                    # Whole body in one message: compress only when it pays off
+                    if len(body) < self.minimum_size:
+                        await send(start_message)
+                        await send(message)
+                        return
+                    compressor = _StreamCompressor(encoding, self.level, self.brotli_quality)
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                compressor = _StreamCompressor(encoding, self.level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                await send(start_message)
+
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves ``.br``/``.gz`` siblings when the client accepts them.
+
+    Fingerprinted files (hashed names from the build) are cached as
+    immutable for a year; anything else gets a short max-age so it can be
+    replaced under the same URL.
+    """
+
+    SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+    async def get_response(self, path: str, scope):
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        if encoding and scope["method"] in ("GET", "HEAD"):
+            response = await self._precompressed_response(path, encoding, scope)
+            if response is None and encoding == "br" and negotiate_encoding(headers.get("accept-encoding", ""), allow_brotli=False):
+                response = await self._precompressed_response(path, "gzip", scope)
+            if response is not None:
+                return response
+
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = static_cache_control(path)
+        return response
+
+    async def _precompressed_response(self, path: str, encoding: str, scope):
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + self.SUFFIXES[encoding])
+        if not stat_result or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        # Serve the compressed bytes with the media type of the original asset
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        response = FileResponse(full_path, stat_result=stat_result, media_type=media_type)
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = static_cache_control(path)
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+
+def precompress_directory(directory: str, min_size: int = 256) -> int:
+    """Write .gz (and .br when available) siblings for compressible static assets"""
+    compressible_ext = (".js", ".css", ".html", ".json", ".svg", ".txt", ".map", ".xml")
+    written = 0
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(compressible_ext):
+                continue
+            src = os.path.join(root, name)
+            with open(src, "rb") as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            gz = zlib.compressobj(9, zlib.DEFLATED, 31)
+            with open(src + ".gz", "wb") as f:
+                f.write(gz.compress(data) + gz.flush())
+            written += 1
+            if brotli is not None:
+                with open(src + ".br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    import sys
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "static")
+    print(f"Precompressed {precompress_directory(target)} files in {target}")
@@ -1,6 +1,14 @@
+import hashlib
 import os
-from typing import Generator
+import threading
+import time
+from typing import Dict, Generator, Optional
+from fastapi import Depends, Request
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import SQLModel, create_engine, Session
+from .chaos import inject_faults
+from .tracing import instrument_engine
 
 
 def get_database_url() -> str:
@@ -10,33 +18,172 @@ def get_database_url() -> str:
     db_name = os.getenv("DB_NAME")
     db_user = os.getenv("DB_USER")
     db_password = os.getenv("DB_PASSWORD")
-    
+
     # If all required variables are present, construct PostgreSQL URL
     if all([db_host, db_port, db_name, db_user, db_password]):
         return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    
+
     # Fallback to DATABASE_URL if provided
     env_url = os.getenv("DATABASE_URL")
     if env_url:
         return env_url
-    
+
     # Default to local sqlite for development
     data_dir = os.getenv("DATA_DIR", ".")
     os.makedirs(data_dir, exist_ok=True)
     return f"sqlite:///{os.path.join(data_dir, 'app.db')}"
 
 
+def get_read_database_url() -> Optional[str]:
+    # Optional read replica; port/name/credentials default to the primary's
+    db_host = os.getenv("DB_READ_HOST")
+    if db_host:
+        db_port = os.getenv("DB_READ_PORT") or os.getenv("DB_PORT")
+        db_name = os.getenv("DB_READ_NAME") or os.getenv("DB_NAME")
+        db_user = os.getenv("DB_READ_USER") or os.getenv("DB_USER")
+        db_password = os.getenv("DB_READ_PASSWORD") or os.getenv("DB_PASSWORD")
+        if all([db_port, db_name, db_user, db_password]):
+            return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+    return os.getenv("READ_DATABASE_URL") or None
+
+
+def _connect_args(url: str) -> dict:
+    # For sqlite, need check_same_thread=False for threaded servers
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+
 DATABASE_URL = get_database_url()
+READ_DATABASE_URL = get_read_database_url()
+
+engine = create_engine(DATABASE_URL, echo=False, connect_args=_connect_args(DATABASE_URL))
+read_engine = (
+    create_engine(READ_DATABASE_URL, echo=False, connect_args=_connect_args(READ_DATABASE_URL))
+    if READ_DATABASE_URL else None
+)
+for _engine in (engine, read_engine):
+    if _engine is not None:
+        instrument_engine(_engine)
+        inject_faults(_engine)
+
+
+# Read-your-writes: after a user commits a mutation, their reads stay on the
+# primary for a short window so replica lag never hides their own changes.
+# The window is tracked per process; with several pods a user may briefly
+# read from a replica on a pod that did not see the write.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+_recent_writes: Dict[int, float] = {}
+_recent_writes_lock = threading.Lock()
+
+
+def mark_user_write(user_id: int) -> None:
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now + READ_YOUR_WRITES_SECONDS
+        if len(_recent_writes) > 10_000:
+            for uid in [uid for uid, until in _recent_writes.items() if until < now]:
+                del _recent_writes[uid]
+
+
+def reads_pinned_to_primary(user_id: Optional[int]) -> bool:
+    if user_id is None:
+        return False
+    until = _recent_writes.get(user_id)
+    return until is not None and until > time.monotonic()
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_orm_write(session, flush_context):
+    session.info["wrote"] = True
 
 
-# For sqlite, need check_same_thread=False for threaded servers
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
+@event.listens_for(Session, "do_orm_execute")
+def _flag_dml_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_user_write(session):
+    # require_user stores the caller's id on the request session
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        mark_user_write(session.info["user_id"])
+
+
+def schema_fingerprint(metadata) -> str:
+    """Hash of every table, column, type and index the models declare"""
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{c.name}:{c.type!r}:{c.nullable}" for c in table.columns)
+        parts.extend(sorted(f"index:{i.name}" for i in table.indexes))
+    # Schema objects managed outside the models, e.g. the search index, register a version here
+    parts.extend(f"extension:{name}:{version}" for name, version in sorted(metadata.info.get("extensions", {}).items()))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _applied_fingerprint(bind) -> Optional[str]:
+    try:
+        with bind.connect() as conn:
+            return conn.execute(text("SELECT fingerprint FROM schemaversion ORDER BY id DESC LIMIT 1")).scalar()
+    except SQLAlchemyError:
+        return None  # no schemaversion table yet
 
 
 def init_db() -> None:
-    from . import models  # ensure models are imported before create_all
+    """Create and migrate the schema, unless it was already done for the current models.
+
+    create_all and migrate_schema reflect every table, which dominates
+    startup on Postgres; a pod booting against an up-to-date database
+    only reads the stored fingerprint.
+    """
+    from . import models, search  # ensure models and the search schema are registered before create_all
+    fingerprint = schema_fingerprint(SQLModel.metadata)
+    if _applied_fingerprint(engine) == fingerprint:
+        return
     SQLModel.metadata.create_all(engine)
+    migrate_schema(engine)
+    search.ensure_search_index(engine)
+    with Session(engine) as session:
+        session.add(models.SchemaVersion(fingerprint=fingerprint))
+        session.commit()
+
+
+def migrate_schema(bind) -> None:
+    """Add columns and indexes declared on models but missing from existing tables.
+
+    create_all only creates whole tables, so a column added to an existing
+    model would otherwise never reach an existing database. New columns are
+    added as nullable with their server default, if any; foreign key
+    constraints are not retrofitted.
+    """
+    inspector = inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    with bind.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+                    conn.execute(text(
+                        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                        f"{column.type.compile(dialect=bind.dialect)}{default}"
+                    ))
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+
+
+def insert_or_ignore(bind, model, conflict_columns):
+    """INSERT for ``model`` that skips rows clashing on ``conflict_columns``, e.g. rows a concurrent writer added first"""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model).on_conflict_do_nothing(index_elements=conflict_columns)
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -44,3 +191,16 @@ def get_session() -> Generator[Session, None, None]:
         yield session
 
 
+def _request_user_id(request: Request) -> Optional[int]:
+    from .auth import decode_session_cookie  # auth imports this module
+    token = request.cookies.get("session") or request.headers.get("x-session")
+    return decode_session_cookie(token) if token else None
+
+
+def get_read_session(request: Request, primary: Session = Depends(get_session)) -> Generator[Session, None, None]:
+    """Session for read-only routes: the replica when configured, else the primary"""
+    if read_engine is None or reads_pinned_to_primary(_request_user_id(request)):
+        yield primary
+        return
+    with Session(read_engine) as session:
+        yield session
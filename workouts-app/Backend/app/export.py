@@ -0,0 +1,170 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from sqlmodel import Session, select
+from .models import Workout, Exercise, WorkoutLog, ExerciseLog
+
+
+FORMATS = ("ndjson", "csv")
+BATCH_ROWS = 1000  # rows fetched per round trip from the server-side cursor
+CHUNK_BYTES = 64 * 1024  # bytes buffered before handing a chunk to the response
+
+# One row per exercise log, flattened with its session, workout and exercise
+CSV_COLUMNS = [
+    "workout_date", "workout_title", "exercise", "actual_sets", "actual_reps", "weight",
+    "planned_sets", "planned_reps", "rest_seconds", "exercise_notes", "session_notes",
+    "workout_id", "exercise_id", "workout_log_id", "exercise_log_id",
+]
+
+
+def _batches(session: Session, statement) -> Iterator[Tuple[List[str], list]]:
+    """(column names, rows) per fetched batch.
+
+    yield_per streams from a server-side cursor where the driver supports
+    one, so memory is bounded by BATCH_ROWS however long the history is.
+    Core execution skips ORM row processing.
+    """
+    result = session.connection().execute(statement.execution_options(yield_per=BATCH_ROWS))
+    keys = list(result.keys())
+    for rows in result.partitions():
+        yield keys, rows
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _date_filters(start: Optional[date], end: Optional[date]) -> list:
+    conditions = []
+    if start is not None:
+        conditions.append(WorkoutLog.workout_date >= datetime.combine(start, datetime.min.time()))
+    if end is not None:
+        conditions.append(WorkoutLog.workout_date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return conditions
+
+
+def ndjson_batches(session: Session, user_id: int, start: Optional[date] = None,
+                   end: Optional[date] = None) -> Iterator[Tuple[str, List[str], list]]:
+    """Every workout, exercise, session and exercise log of a user, as (type, columns, rows) batches.
+
+    Workouts and exercises are always exported in full; ``start``/``end``
+    (inclusive dates) restrict the logged sessions.
+    """
+    workouts = (
+        select(Workout.id, Workout.title, Workout.notes, Workout.created_at)
+        .where(Workout.owner_id == user_id)
+        .order_by(Workout.id)
+    )
+    for keys, rows in _batches(session, workouts):
+        yield "workout", keys, rows
+
+    exercises = (
+        select(Exercise.id, Exercise.workout_id, Exercise.name, Exercise.sets, Exercise.reps,
+               Exercise.rest_seconds, Exercise.notes, Exercise.position, Exercise.created_at)
+        .join(Workout)
+        .where(Workout.owner_id == user_id)
+        .order_by(Exercise.workout_id, Exercise.position, Exercise.id)
+    )
+    for keys, rows in _batches(session, exercises):
+        yield "exercise", keys, rows
+
+    filters = _date_filters(start, end)
+    logs = (
+        select(WorkoutLog.id, WorkoutLog.workout_id, WorkoutLog.workout_date, WorkoutLog.notes,
+               WorkoutLog.created_at)
+        .join(Workout)
+        .where(Workout.owner_id == user_id, *filters)
+        .order_by(WorkoutLog.workout_date, WorkoutLog.id)
+    )
+    for keys, rows in _batches(session, logs):
+        yield "workout_log", keys, rows
+
+    exercise_logs = (
+        select(ExerciseLog.id, ExerciseLog.workout_log_id, ExerciseLog.exercise_id, ExerciseLog.actual_sets,
+               ExerciseLog.actual_reps, ExerciseLog.weight, ExerciseLog.notes, ExerciseLog.created_at)
+        .join(WorkoutLog, ExerciseLog.workout_log_id == WorkoutLog.id)
+        .join(Workout, WorkoutLog.workout_id == Workout.id)
+        .where(Workout.owner_id == user_id, *filters)
+        .order_by(WorkoutLog.workout_date, ExerciseLog.id)
+    )
+    for keys, rows in _batches(session, exercise_logs):
+        yield "exercise_log", keys, rows
+
+
+def csv_batches(session: Session, user_id: int, start: Optional[date] = None,
+                end: Optional[date] = None) -> Iterator[Tuple[List[str], list]]:
+    """Logged sets with CSV_COLUMNS as columns, oldest session first"""
+    statement = (
+        select(
+            WorkoutLog.workout_date, Workout.title.label("workout_title"), Exercise.name.label("exercise"),
+            ExerciseLog.actual_sets, ExerciseLog.actual_reps, ExerciseLog.weight,
+            Exercise.sets.label("planned_sets"), Exercise.reps.label("planned_reps"), Exercise.rest_seconds,
+            ExerciseLog.notes.label("exercise_notes"), WorkoutLog.notes.label("session_notes"),
+            Workout.id.label("workout_id"), Exercise.id.label("exercise_id"),
+            WorkoutLog.id.label("workout_log_id"), ExerciseLog.id.label("exercise_log_id"),
+        )
+        .select_from(ExerciseLog)
+        .join(WorkoutLog, ExerciseLog.workout_log_id == WorkoutLog.id)
+        .join(Workout, WorkoutLog.workout_id == Workout.id)
+        .join(Exercise, ExerciseLog.exercise_id == Exercise.id)
+        .where(Workout.owner_id == user_id, *_date_filters(start, end))
+        .order_by(WorkoutLog.workout_date, WorkoutLog.id, ExerciseLog.id)
+    )
+    return _batches(session, statement)
+
+
+def encode_ndjson(batches) -> Iterator[str]:
+    dumps = json.JSONEncoder(default=_json_default, separators=(",", ":")).encode
+    for record_type, keys, rows in batches:
+        keys = ["type", *keys]
+        yield "".join(dumps(dict(zip(keys, (record_type, *row)))) + "\n" for row in rows)
+
+
+def encode_csv(batches) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for _, rows in batches:
+        # workout_date is the first column; ISO format matches the NDJSON export
+        writer.writerows((row[0].isoformat(), *row[1:]) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(lines: Iterator[str], compress: bool = False) -> Iterator[bytes]:
+    """Group encoded text into ~CHUNK_BYTES chunks, optionally as one gzip stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending, size = [], 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            data = "".join(pending).encode("utf-8")
+            pending, size = [], 0
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                yield data
+    data = "".join(pending).encode("utf-8")
+    if compressor is not None:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def stream_export(bind, user_id: int, fmt: str, start: Optional[date] = None, end: Optional[date] = None,
+                  compress: bool = False) -> Iterator[bytes]:
+    """Export body generator owning its own session for the life of the stream"""
+    with Session(bind) as session:
+        if fmt == "csv":
+            lines = encode_csv(csv_batches(session, user_id, start, end))
+        else:
+            lines = encode_ndjson(ndjson_batches(session, user_id, start, end))
+        yield from chunked(lines, compress)
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def pool_stats(engine) -> dict:
+    """Checked-out connections against capacity, for pools that have one"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"checked_out": None, "capacity": None, "saturation": None}
+    capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    }
+
+
+class HealthChecker:
+    """Probes the database from a background thread so /readyz answers from memory.
+
+    Probes use their own unpooled connection, so a pool exhausted by real
+    traffic cannot queue them; that saturation is reported instead.
+    """
+
+    def __init__(self, engine, interval: float = 5.0, timeout: float = 2.0):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self.ok = False
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None  # time.monotonic() of the last probe
+        self.latency_ms: Optional[float] = None
+        self.pool = pool_stats(engine)
+        self._probe_engine = None
+        self._probed = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _connect_args(self) -> dict:
+        url = self.engine.url
+        if url.get_backend_name() == "sqlite":
+            return {"check_same_thread": False, "timeout": self.timeout}
+        if url.get_backend_name() == "postgresql":
+            return {"connect_timeout": max(1, int(self.timeout)), "options": f"-c statement_timeout={int(self.timeout * 1000)}"}
+        return {}
+
+    def probe(self) -> bool:
+        if self._probe_engine is None:
+            self._probe_engine = create_engine(self.engine.url, poolclass=NullPool, connect_args=self._connect_args())
+        started = time.perf_counter()
+        try:
+            with self._probe_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self.ok, self.error = True, None
+        except Exception as e:
+            self.ok, self.error = False, f"{type(e).__name__}: {e}"[:300]
+        self.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.pool = pool_stats(self.engine)
+        self.checked_at = time.monotonic()
+        self._probed.set()
+        return self.ok
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+    def start(self, wait: Optional[float] = None) -> None:
+        """Start probing in the background; ``wait`` blocks until the first probe finishes"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="db-health", daemon=True)
+            self._thread.start()
+        if wait:
+            self._probed.wait(wait)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def stale(self) -> bool:
+        # A wedged checker must not keep reporting an old success
+        return self.checked_at is None or time.monotonic() - self.checked_at > 3 * self.interval + self.timeout
+
+    @property
+    def ready(self) -> bool:
+        return self.ok and not self.stale
+
+    def snapshot(self) -> dict:
+        return {
+            "database": "ok" if self.ok else "error",
+            "error": self.error,
+            "age_seconds": None if self.checked_at is None else round(time.monotonic() - self.checked_at, 2),
+            "latency_ms": self.latency_ms,
+            "pool": self.pool,
+        }
+
+
+_checker: Optional[HealthChecker] = None
+_checker_lock = threading.Lock()
+
+
+def get_health_checker() -> HealthChecker:
+    # Started lazily so the probe thread runs in the serving process, not a preloading master
+    global _checker
+    if _checker is None:
+        with _checker_lock:
+            if _checker is None:
+                from .db import engine
+                checker = HealthChecker(
+                    engine,
+                    interval=_env_float("HEALTH_CHECK_INTERVAL", 5.0),
+                    timeout=_env_float("HEALTH_CHECK_TIMEOUT", 2.0),
+                )
+                checker.start(wait=checker.timeout)
+                _checker = checker
+    return _checker
+
+
+def set_health_checker(checker: Optional[HealthChecker]) -> None:
+    global _checker
+    _checker = checker
+
+
+class AdmissionMiddleware:
+    """Sheds load with an immediate 503 instead of letting queued requests time out.
+
+    A request is refused when this process already has ``max_in_flight``
+    requests in progress, or when every pooled connection is checked out
+    and the requests beyond the pool's capacity (those waiting for a
+    connection) reach ``max_pool_waiters``. Probes and static files are
+    always admitted. A limit of 0 disables that check.
+    """
+
+    EXEMPT_PREFIXES = ("/healthz", "/readyz", "/static/")
+
+    def __init__(self, app, max_in_flight: Optional[int] = None, max_pool_waiters: Optional[int] = None,
+                 retry_after: int = 1, engine=None):
+        self.app = app
+        self.max_in_flight = max_in_flight if max_in_flight is not None else int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "256"))
+        self.max_pool_waiters = (max_pool_waiters if max_pool_waiters is not None
+                                 else int(os.getenv("ADMISSION_MAX_POOL_WAITERS", "32")))
+        self.retry_after = retry_after
+        self._engine = engine
+        self.in_flight = 0
+        self.shed = 0
+
+    def _pool_waiters(self) -> int:
+        if self._engine is None:
+            from .db import engine
+            self._engine = engine
+        stats = pool_stats(self._engine)
+        if not stats["capacity"] or stats["checked_out"] < stats["capacity"]:
+            return 0
+        return max(0, self.in_flight - stats["capacity"])
+
+    def _overloaded(self) -> Optional[str]:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "in-flight requests"
+        if self.max_pool_waiters and self._pool_waiters() >= self.max_pool_waiters:
+            return "database pool"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        reason = self._overloaded()
+        if reason is not None:
+            self.shed += 1
+            body = json.dumps({"detail": f"Server busy ({reason}), retry shortly"}).encode()
+            await send({"type": "http.response.start", "status": 503, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+        # Middleware only runs on the event loop thread, so a plain counter is safe
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
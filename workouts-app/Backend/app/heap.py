@@ -0,0 +1,129 @@
+"""On-demand heap inspection with tracemalloc.
+
+Nothing is traced until ``start()``; tracemalloc costs nothing while
+stopped. State is per process, so with several workers every call may
+land on a different one: inspect a single-worker pod, or repeat calls
+until they reach the worker of interest (the response carries its pid).
+"""
+import gc
+import os
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Dict, List
+
+
+GROUP_BY = ("lineno", "filename", "traceback")
+MAX_SNAPSHOTS = int(os.getenv("HEAP_MAX_SNAPSHOTS", "5"))
+
+# Allocations made by the tracing machinery itself are noise
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+_next_id = 1
+_lock = threading.Lock()
+
+
+class HeapError(Exception):
+    """A heap request that cannot be served in the current state"""
+
+
+def status() -> dict:
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "pid": os.getpid(),
+        "tracing": tracemalloc.is_tracing(),
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "snapshots": list(_snapshots),
+    }
+
+
+def start(frames: int = 1) -> dict:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return status()
+
+
+def stop() -> dict:
+    # Snapshots only make sense against allocations traced in the same run
+    with _lock:
+        _snapshots.clear()
+    tracemalloc.stop()
+    return status()
+
+
+def take_snapshot() -> int:
+    global _next_id
+    if not tracemalloc.is_tracing():
+        raise HeapError("tracemalloc is not running; POST /admin/heap/start first")
+    snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+    with _lock:
+        snapshot_id, _next_id = _next_id, _next_id + 1
+        _snapshots[snapshot_id] = snapshot
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return snapshot_id
+
+
+def get_snapshot(snapshot_id: int) -> tracemalloc.Snapshot:
+    snapshot = _snapshots.get(snapshot_id)
+    if snapshot is None:
+        raise KeyError(snapshot_id)
+    return snapshot
+
+
+def _site(stat, group_by: str) -> dict:
+    frame = stat.traceback[0]
+    site = {"file": frame.filename, "line": frame.lineno if group_by != "filename" else None}
+    if group_by == "traceback":
+        site["traceback"] = [f"{f.filename}:{f.lineno}" for f in stat.traceback]
+    return site
+
+
+def top_stats(snapshot: tracemalloc.Snapshot, group_by: str = "lineno", limit: int = 20) -> List[dict]:
+    """Largest allocation sites by size"""
+    return [
+        {**_site(stat, group_by), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics(group_by)[:limit]
+    ]
+
+
+def diff_stats(base: tracemalloc.Snapshot, head: tracemalloc.Snapshot, group_by: str = "lineno",
+               limit: int = 20) -> List[dict]:
+    """Allocation sites that grew or shrank most from ``base`` to ``head``"""
+    return [
+        {**_site(stat, group_by), "size_kb": round(stat.size / 1024, 1), "size_diff_kb": round(stat.size_diff / 1024, 1),
+         "count": stat.count, "count_diff": stat.count_diff}
+        for stat in head.compare_to(base, group_by)[:limit]
+        if stat.size_diff or stat.count_diff
+    ]
+
+
+def orm_objects(limit: int = 20) -> Dict[str, object]:
+    """ORM instances held in live sessions' identity maps, and all live model instances, per model"""
+    from sqlalchemy.orm.session import _sessions
+    from sqlmodel import SQLModel
+
+    sessions = list(_sessions.values())
+    held = Counter()
+    pending = Counter()
+    for session in sessions:
+        held.update(type(obj).__name__ for obj in list(session.identity_map.values()))
+        pending.update(type(obj).__name__ for obj in list(session.new))
+    live = Counter(
+        type(obj).__name__ for obj in gc.get_objects()
+        if isinstance(obj, SQLModel) and hasattr(type(obj), "__table__")
+    )
+    return {
+        "sessions": len(sessions),
+        "held_in_sessions": dict(held.most_common(limit)),
+        "pending_in_sessions": dict(pending.most_common(limit)),
+        "live_instances": dict(live.most_common(limit)),
+    }
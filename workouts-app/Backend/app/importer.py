@@ -0,0 +1,458 @@
+import csv
+import gzip
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func, insert, update
+from sqlmodel import Session, select
+from .cache import invalidate_user_workouts
+from .canonical import normalize_exercise_name, resolve_canonical_many
+from .models import Workout, Exercise, WorkoutLog, ExerciseLog, ImportJob
+from .rollups import rebuild_user_rollups
+from .sync import stamp, touch_logs
+
+
+FORMATS = ("csv", "ndjson")
+CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", "5000"))  # rows per transaction
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))  # imports running at once per process
+# A queued or running job without progress for this long has lost its process
+IMPORT_STALE_SECONDS = int(os.getenv("IMPORT_STALE_SECONDS", "900"))
+MAX_ERRORS = 20  # rejected rows reported on the job
+DEFAULT_WORKOUT = "Imported workout"
+
+# Accepted header spellings per field, compared lowercase with "_" read as a
+# space. Covers our own CSV export and the usual tracker export layouts.
+COLUMN_ALIASES = {
+    "date": ("workout date", "date", "start time", "started at"),
+    "workout": ("workout title", "workout name", "workout", "title", "routine"),
+    "exercise": ("exercise", "exercise name", "exercise title"),
+    "sets": ("actual sets", "sets"),
+    "reps": ("actual reps", "reps"),
+    "weight": ("weight", "weight kg", "weight lbs", "weight (kg)", "weight (lbs)"),
+    "planned_sets": ("planned sets",),
+    "planned_reps": ("planned reps",),
+    "rest_seconds": ("rest seconds", "rest"),
+    "notes": ("exercise notes", "notes"),
+    "session_notes": ("session notes", "workout notes", "description"),
+}
+REQUIRED = ("date", "exercise")
+# Tried after ISO 8601
+DATE_FORMATS = ("%d %b %Y, %H:%M", "%d %b %Y", "%m/%d/%Y %H:%M", "%m/%d/%Y")
+
+_executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="import")
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return None
+
+
+def _header_key(header: str) -> str:
+    return " ".join(str(header).replace("_", " ").lower().split())
+
+
+def map_columns(headers) -> Dict[str, str]:
+    """Field -> source column for the first alias present in ``headers``"""
+    present = {}
+    for header in headers:
+        present.setdefault(_header_key(header), header)
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in present:
+                mapping[field] = present[alias]
+                break
+    missing = [field for field in REQUIRED if field not in mapping]
+    if missing:
+        raise ValueError(f"missing required column(s): {', '.join(missing)}")
+    return mapping
+
+
+def parse_date(value) -> datetime:
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+        raise ValueError(f"unrecognised date {text!r}")
+    # Stored naive in UTC, like datetime.utcnow() elsewhere
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _number(value, cast, field):
+    if value is None or value == "":
+        return None
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+
+
+def parse_row(raw: dict, mapping: Dict[str, str]) -> dict:
+    """One source row as cleaned import values; raises ValueError for rejected rows"""
+    values = {}
+    for field, column in mapping.items():
+        value = raw.get(column)
+        if isinstance(value, str):
+            value = value.strip() or None
+        values[field] = value
+    get = values.get
+
+    exercise = get("exercise")
+    if not exercise:
+        raise ValueError("exercise name is empty")
+    if get("date") is None:
+        raise ValueError("date is empty")
+    # Per-set exports have no sets column: each row is one set
+    sets = _number(get("sets"), int, "sets")
+    sets = 1 if sets is None else sets
+    reps = _number(get("reps"), int, "reps") or 0
+    planned_sets = _number(get("planned_sets"), int, "planned_sets")
+    planned_reps = _number(get("planned_reps"), int, "planned_reps")
+    rest_seconds = _number(get("rest_seconds"), int, "rest_seconds")
+    return {
+        "workout_date": parse_date(get("date")),
+        "workout": str(get("workout") or DEFAULT_WORKOUT),
+        "exercise": str(exercise),
+        "sets": sets,
+        "reps": reps,
+        "weight": _number(get("weight"), float, "weight"),
+        "planned_sets": planned_sets if planned_sets is not None else sets,
+        "planned_reps": planned_reps if planned_reps is not None else reps,
+        "rest_seconds": rest_seconds if rest_seconds is not None else 60,
+        "notes": get("notes"),
+        "session_notes": get("session_notes"),
+    }
+
+
+def _csv_records(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[dict], Optional[Dict[str, str]], Optional[str]]]:
+    reader = csv.DictReader(text)
+    mapping = map_columns(reader.fieldnames or [])
+    for raw in reader:
+        yield reader.line_num, raw, mapping, None
+
+
+def _ndjson_records(text: io.TextIOBase) -> Iterator[Tuple[int, Optional[dict], Optional[Dict[str, str]], Optional[str]]]:
+    """Flat row objects, or the typed records of our own NDJSON export.
+
+    Export records arrive parents first (workouts, exercises, sessions, then
+    exercise logs), so each exercise log is flattened from lookups of the
+    records before it.
+    """
+    mappings: Dict[tuple, Dict[str, str]] = {}
+    workouts, exercises, logs = {}, {}, {}
+    for line_num, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_num, None, None, "invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line_num, None, None, "expected a JSON object"
+            continue
+        record_type = record.get("type")
+        if record_type == "workout":
+            workouts[record.get("id")] = record.get("title")
+            continue
+        if record_type == "exercise":
+            exercises[record.get("id")] = record
+            continue
+        if record_type == "workout_log":
+            logs[record.get("id")] = record
+            continue
+        if record_type == "exercise_log":
+            exercise = exercises.get(record.get("exercise_id"))
+            log = logs.get(record.get("workout_log_id"))
+            if exercise is None or log is None:
+                yield line_num, None, None, "exercise_log references an unknown exercise or session"
+                continue
+            record = {
+                "workout_date": log.get("workout_date"),
+                "workout_title": workouts.get(log.get("workout_id")),
+                "exercise": exercise.get("name"),
+                "actual_sets": record.get("actual_sets"),
+                "actual_reps": record.get("actual_reps"),
+                "weight": record.get("weight"),
+                "planned_sets": exercise.get("sets"),
+                "planned_reps": exercise.get("reps"),
+                "rest_seconds": exercise.get("rest_seconds"),
+                "exercise_notes": record.get("notes"),
+                "session_notes": log.get("notes"),
+            }
+        keys = tuple(record)
+        mapping = mappings.get(keys)
+        if mapping is None:
+            try:
+                mapping = mappings[keys] = map_columns(keys)
+            except ValueError as e:
+                yield line_num, None, None, str(e)
+                continue
+        yield line_num, record, mapping, None
+
+
+@lru_cache(maxsize=4096)
+def _key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+@lru_cache(maxsize=4096)
+def _exercise_key(name: str) -> str:
+    return normalize_exercise_name(name) or _key(name)
+
+
+class HistoryImporter:
+    """Writes parsed rows for one user in chunked transactions.
+
+    Workouts are matched to the user's existing ones by title and exercises
+    are deduped per workout by normalized name, so a re-import extends the
+    same workouts instead of duplicating them. Rows sharing a workout and
+    timestamp become one logged session; rows of a session the account
+    already had before the import are counted as duplicates and skipped,
+    so importing the same file twice logs nothing the second time.
+    """
+
+    def __init__(self, session: Session, job: ImportJob):
+        self.session = session
+        self.job = job
+        self.user_id = job.user_id
+        self.workouts: Dict[str, int] = {}
+        self.exercises: Dict[Tuple[int, str], int] = {}
+        self.next_position: Dict[int, int] = {}
+        self.sessions: Dict[Tuple[int, datetime], int] = {}
+        self.imported_before: set = set()
+        self.canonical_ids: Dict[str, int] = {}
+        self._load_existing()
+
+    def _load_existing(self) -> None:
+        for wid, title in self.session.exec(
+            select(Workout.id, Workout.title).where(Workout.owner_id == self.user_id).order_by(Workout.id)
+        ):
+            self.workouts.setdefault(_key(title), wid)
+        for eid, wid, name, position in self.session.exec(
+            select(Exercise.id, Exercise.workout_id, Exercise.name, Exercise.position)
+            .join(Workout).where(Workout.owner_id == self.user_id).order_by(Exercise.id)
+        ):
+            self.exercises.setdefault((wid, _exercise_key(name)), eid)
+            self.next_position[wid] = max(self.next_position.get(wid, 0), (position or 0) + 1)
+        self.imported_before.update(self.session.exec(
+            select(WorkoutLog.workout_id, WorkoutLog.workout_date).join(Workout).where(Workout.owner_id == self.user_id)
+        ).all())
+
+    def write_chunk(self, rows: List[dict]) -> None:
+        """Insert one chunk with a multi-row INSERT per table and commit it with the job's progress"""
+        session = self.session
+        now = datetime.utcnow()
+        changed = stamp(session, self.user_id)
+
+        new_workouts = {}
+        for row in rows:
+            key = _key(row["workout"])
+            if key not in self.workouts and key not in new_workouts:
+                new_workouts[key] = {"title": row["workout"], "notes": None, "owner_id": self.user_id,
+                                     "created_at": now, **changed}
+        if new_workouts:
+            ids = session.scalars(
+                insert(Workout).returning(Workout.id, sort_by_parameter_order=True), list(new_workouts.values())
+            ).all()
+            self.workouts.update(zip(new_workouts, ids))
+
+        fresh = []
+        for row in rows:
+            row["workout_id"] = self.workouts[_key(row["workout"])]
+            row["session_key"] = (row["workout_id"], row["workout_date"])
+            if row["session_key"] not in self.imported_before:
+                fresh.append(row)
+        duplicates, rows = len(rows) - len(fresh), fresh
+
+        new_exercises = {}
+        for row in rows:
+            wid = row["workout_id"]
+            key = (wid, _exercise_key(row["exercise"]))
+            row["exercise_key"] = key
+            if key not in self.exercises and key not in new_exercises:
+                position = self.next_position.get(wid, 0)
+                self.next_position[wid] = position + 1
+                new_exercises[key] = {
+                    "name": row["exercise"], "sets": row["planned_sets"], "reps": row["planned_reps"],
+                    "rest_seconds": row["rest_seconds"], "notes": None, "workout_id": wid, "position": position,
+                    "created_at": now, **changed,
+                }
+        if new_exercises:
+            canonical_ids = resolve_canonical_many(session, [e["name"] for e in new_exercises.values()],
+                                                   self.canonical_ids)
+            for exercise in new_exercises.values():
+                exercise["canonical_id"] = canonical_ids[exercise["name"]]
+            ids = session.scalars(
+                insert(Exercise).returning(Exercise.id, sort_by_parameter_order=True), list(new_exercises.values())
+            ).all()
+            self.exercises.update(zip(new_exercises, ids))
+
+        new_sessions = {}
+        for row in rows:
+            key = row["session_key"]
+            if key not in self.sessions and key not in new_sessions:
+                new_sessions[key] = {"workout_id": row["workout_id"], "workout_date": row["workout_date"],
+                                     "notes": row["session_notes"], "created_at": now, **changed}
+        if new_sessions:
+            ids = session.scalars(
+                insert(WorkoutLog).returning(WorkoutLog.id, sort_by_parameter_order=True), list(new_sessions.values())
+            ).all()
+            self.sessions.update(zip(new_sessions, ids))
+        # Sessions from earlier chunks that gain exercise logs here changed too
+        extended = {self.sessions[row["session_key"]] for row in rows if row["session_key"] not in new_sessions}
+        if extended:
+            touch_logs(session, self.user_id, WorkoutLog.id.in_(extended))
+
+        # Core insert: no ORM bookkeeping for the bulk of the rows
+        if rows:
+            session.execute(insert(ExerciseLog.__table__), [
+                {"exercise_id": self.exercises[row["exercise_key"]], "workout_log_id": self.sessions[row["session_key"]],
+                 "actual_sets": row["sets"], "actual_reps": row["reps"], "weight": row["weight"], "notes": row["notes"],
+                 "created_at": now}
+                for row in rows
+            ])
+
+        self.job.rows_imported += len(rows)
+        self.job.rows_duplicate += duplicates
+        self.job.workouts_created += len(new_workouts)
+        self.job.sessions_created += len(new_sessions)
+        self._save_progress()
+
+    def reject(self, line_num: int, message: str) -> None:
+        self.job.rows_skipped += 1
+        if len(self.job.errors) < MAX_ERRORS:
+            # Reassign so the JSON column is seen as changed
+            self.job.errors = [*self.job.errors, f"line {line_num}: {message}"]
+
+    def _save_progress(self) -> None:
+        self.job.heartbeat_at = datetime.utcnow()
+        self.session.add(self.job)
+        self.session.commit()
+
+
+def _open_text(raw) -> io.TextIOBase:
+    # Exports may be uploaded gzipped; detect by magic number, not name
+    magic = raw.read(2)
+    raw.seek(0)
+    stream = gzip.GzipFile(fileobj=raw) if magic == b"\x1f\x8b" else raw
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def run_import(bind, job_id: int, path: str) -> None:
+    """Import a spooled upload for a queued job, then delete the file.
+
+    Every CHUNK_ROWS accepted rows are committed together with the job's
+    counters, so progress is visible while the import runs and a failure
+    keeps the chunks written before it. A job that is no longer queued,
+    because ``fail_orphaned_imports`` gave up on it, is left alone.
+    """
+    user_id = None
+    try:
+        with Session(bind) as session, open(path, "rb") as raw:
+            job = session.get(ImportJob, job_id)
+            if job.status != "queued":
+                return
+            user_id = job.user_id
+            session.info["user_id"] = user_id
+            job.status = "running"
+            job.heartbeat_at = datetime.utcnow()
+            job.bytes_total = os.path.getsize(path)
+            session.add(job)
+            session.commit()
+
+            importer = HistoryImporter(session, job)
+            records = _csv_records if job.format == "csv" else _ndjson_records
+            chunk: List[dict] = []
+            processed = 0  # plain counter; model attribute writes are slow per row
+            for line_num, record, mapping, problem in records(_open_text(raw)):
+                processed += 1
+                if problem is None:
+                    try:
+                        chunk.append(parse_row(record, mapping))
+                    except ValueError as e:
+                        problem = str(e)
+                if problem is not None:
+                    importer.reject(line_num, problem)
+                if len(chunk) >= CHUNK_ROWS:
+                    job.rows_processed = processed
+                    job.bytes_read = raw.tell()
+                    importer.write_chunk(chunk)
+                    chunk = []
+            job.rows_processed = processed
+            job.bytes_read = job.bytes_total
+            if chunk:
+                importer.write_chunk(chunk)
+
+            rebuild_user_rollups(session, user_id)
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+            session.add(job)
+            session.commit()
+    except Exception as e:
+        print(f"Import job {job_id} failed: {e}")
+        with Session(bind) as session:
+            job = session.get(ImportJob, job_id)
+            if job is not None:
+                # Chunks committed before the failure stay; keep rollups in step with them
+                rebuild_user_rollups(session, job.user_id)
+                job.status = "failed"
+                job.error = str(e) or type(e).__name__
+                job.finished_at = datetime.utcnow()
+                session.add(job)
+                session.commit()
+    finally:
+        os.unlink(path)
+        if user_id is not None:
+            invalidate_user_workouts(user_id)
+
+
+def submit_import(bind, job_id: int, path: str):
+    """Queue ``run_import`` on the bounded import pool"""
+    return _executor.submit(run_import, bind, job_id, path)
+
+
+def fail_orphaned_imports(bind, stale_seconds: int = IMPORT_STALE_SECONDS) -> int:
+    """Fail queued or running jobs whose process is gone, e.g. a worker that was recycled or killed.
+
+    Jobs run on a thread pool inside the worker that accepted them, so
+    nothing resumes them: a running job updates ``heartbeat_at`` with
+    every chunk, and one without progress for ``stale_seconds`` is taken
+    as lost. Its committed chunks stay and the user's rollups are rebuilt
+    to match. Called at startup; a job still waiting in a live worker's
+    queue that long is failed too and then skipped by ``run_import``.
+    """
+    now = datetime.utcnow()
+    with Session(bind) as session:
+        failed = session.execute(
+            update(ImportJob)
+            .where(ImportJob.status.in_(("queued", "running")),
+                   func.coalesce(ImportJob.heartbeat_at, ImportJob.created_at) < now - timedelta(seconds=stale_seconds))
+            .values(status="failed", error="interrupted: the server stopped while the import was running",
+                    finished_at=now)
+            .returning(ImportJob.user_id)
+        ).scalars().all()
+        user_ids = sorted(set(failed))
+        for user_id in user_ids:
+            rebuild_user_rollups(session, user_id)
+        session.commit()
+    for user_id in user_ids:
+        invalidate_user_workouts(user_id)
+    return len(failed)
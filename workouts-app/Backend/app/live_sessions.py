@@ -0,0 +1,397 @@
+"""Live workout sessions: sets streamed as they happen, written in batches.
+
+A client logging a workout over ``/api/workouts/{wid}/live`` sends each
+set when it is done. Sets are acknowledged once buffered in memory, and
+one background thread writes the buffers of every session in the
+process every LIVE_FLUSH_INTERVAL seconds: a single multi-row INSERT and
+one commit however many sessions are open, rather than a transaction per
+set, or a burst of writes when a whole form is posted at the end. A
+session is also flushed when its last connection closes and when it is
+completed. Activity rollups are refreshed, and the session's log marked
+changed for /api/sync, then rather than on every flush.
+
+Every set carries the client's sequence number. The highest one written
+is stored on the LiveSession row in the same transaction as the sets,
+guarded by its previous value. A client that reconnects, to this worker
+or another, resumes after what is durable, and a buffer overtaken by
+another connection is dropped instead of being written twice.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import case, insert, tuple_, update
+from sqlmodel import Session, select
+from .cache import invalidate_user_workouts
+from .models import Exercise, ExerciseLog, LiveSession, WorkoutLog
+from .read_models import LiveSessionRow, WorkoutLogRow, columns, owned_workout_exists
+from .rollups import refresh_rollups
+from .sync import stamp, touch_logs
+from .unit_of_work import UnitOfWork
+
+
+FLUSH_INTERVAL = float(os.getenv("LIVE_FLUSH_INTERVAL", "2"))
+# A flush starts early once this many sets are waiting across all sessions
+MAX_BUFFERED_SETS = int(os.getenv("LIVE_MAX_BUFFERED_SETS", "5000"))
+# Sessions claimed per UPDATE, keeping bound parameters well under SQLite's limit
+CLAIM_CHUNK = 1000
+
+
+class StaleSession(Exception):
+    """The session was completed, or written by another connection; the client should reconnect to resume"""
+
+
+class ActiveSession:
+    """A live session's state in this process, shared by all of its connections"""
+
+    def __init__(self, row: LiveSessionRow, workout_date: datetime, exercise_ids: Iterable[int]):
+        self.id = row.id
+        self.user_id = row.user_id
+        self.workout_id = row.workout_id
+        self.workout_log_id = row.workout_log_id
+        self.day = workout_date.date()
+        self.exercise_ids = frozenset(exercise_ids)
+        self.acked = row.sets_persisted  # highest sequence number buffered
+        self.persisted = row.sets_persisted  # highest sequence number committed
+        self.pending: List[Tuple[int, dict]] = []  # (seq, ExerciseLog row)
+        self.connections = 0
+        self.stale: Optional[str] = None  # why the session can no longer be written from here
+
+
+def parse_set(message: dict, exercise_ids) -> Tuple[int, dict]:
+    """(seq, ExerciseLog values) from a ``set`` message; ValueError when it is malformed"""
+    seq, exercise_id, reps = message.get("seq"), message.get("exercise_id"), message.get("reps", 0)
+    weight, notes = message.get("weight"), message.get("notes")
+    if type(seq) is not int or seq < 1:
+        raise ValueError("seq must be a positive integer")
+    if exercise_id not in exercise_ids:
+        raise ValueError("exercise_id is not an exercise of this workout")
+    if type(reps) is not int or reps < 0:
+        raise ValueError("reps must be a non-negative integer")
+    if weight is not None and (type(weight) not in (int, float) or weight < 0):
+        raise ValueError("weight must be a non-negative number")
+    if notes is not None and not isinstance(notes, str):
+        raise ValueError("notes must be a string")
+    return seq, {
+        "exercise_id": exercise_id,
+        "actual_sets": 1,
+        "actual_reps": reps,
+        "weight": weight,
+        "notes": notes,
+        "created_at": datetime.utcnow(),
+    }
+
+
+class LiveSessionBuffer:
+    """The live sessions open in this process and the thread that writes their sets"""
+
+    def __init__(self, engine, interval: float = FLUSH_INTERVAL, max_buffered: int = MAX_BUFFERED_SETS):
+        self.engine = engine
+        self.interval = interval
+        self.max_buffered = max_buffered
+        self.flushes = 0
+        self.sets_written = 0
+        self.error: Optional[str] = None  # last failed background flush; its sets stay buffered
+        self._sessions = {}
+        self._buffered = 0
+        self._lock = threading.Lock()  # session state
+        self._flush_lock = threading.Lock()  # one writer at a time, so each claim sees the last one committed
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="live-sessions", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and write what is still buffered"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush(refresh=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                self.error = None
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"[:300]
+
+    def _register(self, row: LiveSessionRow, workout_date: datetime, exercise_ids) -> ActiveSession:
+        with self._lock:
+            active = self._sessions.get(row.id)
+            if active is None or active.stale:
+                active = self._sessions[row.id] = ActiveSession(row, workout_date, exercise_ids)
+            active.connections += 1
+            return active
+
+    def start_session(self, user_id: int, workout_id: int) -> Optional[ActiveSession]:
+        """Open a new session on the user's workout; None when they do not own it"""
+        with Session(self.engine) as session:
+            if not owned_workout_exists(session, workout_id, user_id):
+                return None
+            uow = UnitOfWork(session)
+            log = uow.insert_one(WorkoutLogRow, workout_id=workout_id, **stamp(session, user_id))
+            row = uow.insert_one(LiveSessionRow, user_id=user_id, workout_id=workout_id, workout_log_id=log.id)
+            exercise_ids = session.exec(select(Exercise.id).where(Exercise.workout_id == workout_id)).all()
+            uow.commit()
+        return self._register(row, log.workout_date, exercise_ids)
+
+    def resume_session(self, user_id: int, workout_id: int, session_id: int) -> Optional[ActiveSession]:
+        """Join a session of the user's, loading it if no connection in this process has it open"""
+        with self._lock:
+            active = self._sessions.get(session_id)
+            if active is not None and (active.user_id, active.workout_id) == (user_id, workout_id) and not active.stale:
+                active.connections += 1
+                return active
+        with Session(self.engine) as session:
+            found = session.exec(
+                select(*columns(LiveSessionRow), WorkoutLog.workout_date)
+                .join(WorkoutLog, WorkoutLog.id == LiveSession.workout_log_id)
+                .where(LiveSession.id == session_id, LiveSession.user_id == user_id, LiveSession.workout_id == workout_id)
+            ).first()
+            if found is None:
+                return None
+            row = LiveSessionRow._make(found[:-1])
+            if row.status != "active":
+                raise StaleSession("session already completed")
+            exercise_ids = session.exec(select(Exercise.id).where(Exercise.workout_id == workout_id)).all()
+        return self._register(row, found[-1], exercise_ids)
+
+    def record(self, active: ActiveSession, seq: int, row: dict) -> bool:
+        """Buffer one set; False when ``seq`` was already received, so a resent set is acknowledged again"""
+        with self._lock:
+            if active.stale:
+                raise StaleSession(active.stale)
+            if seq <= active.acked:
+                return False
+            if seq != active.acked + 1:
+                raise ValueError(f"expected seq {active.acked + 1}")
+            active.pending.append((seq, {**row, "workout_log_id": active.workout_log_id}))
+            active.acked = seq
+            self._buffered += 1
+            full = self._buffered >= self.max_buffered
+        if full:
+            self._wake.set()
+        return True
+
+    def _take(self, sessions) -> list:
+        with self._lock:
+            return self._take_locked(sessions)
+
+    def _take_locked(self, sessions) -> list:
+        """(session, persisted, new persisted, rows) for each session with buffered sets, emptying its buffer"""
+        batches = []
+        for active in sessions:
+            if active.pending and not active.stale:
+                batches.append((active, active.persisted, active.pending[-1][0], [row for _, row in active.pending]))
+                self._buffered -= len(active.pending)
+                active.pending = []
+        return batches
+
+    def _write(self, session, batches) -> Tuple[list, list]:
+        """Claim each batch's sequence range and insert the claimed sets; returns the claimed batches
+        and the sessions whose sets named a deleted exercise.
+
+        A session is claimed by moving its ``sets_persisted`` on from the
+        value this process last wrote; one UPDATE .. RETURNING claims a
+        chunk of sessions at once. Sets of exercises deleted since they
+        were buffered are dropped, as deleting an exercise removes its logs,
+        rather than failing the shared INSERT for every session; the
+        remaining exercises are locked FOR SHARE until the sets commit.
+        """
+        referenced = sorted({row["exercise_id"] for _, _, _, rows in batches for row in rows})
+        existing = set()
+        for start in range(0, len(referenced), CLAIM_CHUNK):
+            existing.update(session.exec(
+                select(Exercise.id).where(Exercise.id.in_(referenced[start:start + CLAIM_CHUNK]))
+                .with_for_update(read=True)
+            ).all())
+        kept, dropped = [], []
+        for active, persisted, last, rows in batches:
+            live_rows = [row for row in rows if row["exercise_id"] in existing]
+            if len(live_rows) < len(rows):
+                dropped.append(active)
+            kept.append((active, persisted, last, live_rows))
+
+        claimed_ids = set()
+        for start in range(0, len(kept), CLAIM_CHUNK):
+            chunk = kept[start:start + CLAIM_CHUNK]
+            expected = [(active.id, persisted) for active, persisted, _, _ in chunk]
+            statement = (
+                update(LiveSession)
+                .where(LiveSession.status == "active", tuple_(LiveSession.id, LiveSession.sets_persisted).in_(expected))
+                .values(sets_persisted=case({active.id: last for active, _, last, _ in chunk}, value=LiveSession.id))
+                .returning(LiveSession.id)
+            )
+            claimed_ids.update(session.execute(statement, execution_options={"synchronize_session": False}).scalars())
+        claimed = [batch for batch in kept if batch[0].id in claimed_ids]
+        rows = [row for _, _, _, batch_rows in claimed for row in batch_rows]
+        if rows:
+            session.execute(insert(ExerciseLog), rows)
+        return claimed, [active for active in dropped if active.id in claimed_ids]
+
+    def _settle(self, batches, claimed, dropped=()) -> None:
+        written = {active.id: len(rows) for active, _, _, rows in claimed}
+        with self._lock:
+            for active, _, last, _ in batches:
+                if active.id in written:
+                    active.persisted = last
+                    self.sets_written += written[active.id]
+                else:
+                    self._drop_locked(active, "session was written by another connection")
+            for active in dropped:
+                # The client reconnects and resumes with the workout's current exercises
+                self._drop_locked(active, "an exercise of this workout was deleted")
+
+    def _drop_locked(self, active: ActiveSession, reason: str) -> None:
+        active.stale = reason
+        self._buffered -= len(active.pending)
+        active.pending = []
+
+    def _requeue(self, batches) -> None:
+        with self._lock:
+            for active, persisted, _, rows in batches:
+                active.pending = list(zip(range(persisted + 1, persisted + 1 + len(rows)), rows)) + active.pending
+                self._buffered += len(rows)
+
+    def flush(self, sessions: Optional[List[ActiveSession]] = None, refresh: bool = False) -> int:
+        """Write the buffered sets of ``sessions`` (default all) in one transaction; returns the sessions written.
+
+        ``refresh`` also rebuilds the sessions' activity rollups and marks their logs
+        changed for sync, in the same transaction.
+        """
+        with self._flush_lock:
+            with self._lock:
+                sessions = list(self._sessions.values()) if sessions is None else sessions
+            batches = self._take(sessions)
+            if not batches and not refresh:
+                return 0
+            try:
+                with Session(self.engine) as session:
+                    claimed, dropped = self._write(session, batches)
+                    if refresh:
+                        _publish(session, sessions)
+                    session.commit()
+            except BaseException:
+                self._requeue(batches)
+                raise
+            self._settle(batches, claimed, dropped)
+            self.flushes += 1
+        if refresh:
+            for user_id in {active.user_id for active in sessions}:
+                invalidate_user_workouts(user_id)
+        return len(claimed)
+
+    def complete(self, active: ActiveSession, notes: Optional[str] = None) -> LiveSessionRow:
+        """Write the session's remaining sets and close it, with its notes and rollups, in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                if active.stale:
+                    raise StaleSession(active.stale)
+                batches = self._take_locked([active])
+                # A set recorded after this point would be acked but never written
+                active.stale = "session is being completed"
+            try:
+                with Session(self.engine) as session:
+                    uow = UnitOfWork(session)
+                    claimed, _ = self._write(session, batches)
+                    persisted = batches[0][2] if claimed else active.persisted
+                    row = None
+                    if len(claimed) == len(batches):
+                        row = uow.update(LiveSessionRow, [
+                            LiveSession.id == active.id, LiveSession.status == "active",
+                            LiveSession.sets_persisted == persisted,
+                        ], {"status": "completed", "finished_at": datetime.utcnow()})
+                    if row is None:
+                        session.rollback()
+                        raise StaleSession("session was completed or written by another connection")
+                    values = stamp(session, active.user_id)
+                    if notes is not None:
+                        values["notes"] = notes
+                    session.execute(update(WorkoutLog).where(WorkoutLog.id == active.workout_log_id).values(**values))
+                    refresh_rollups(session, active.user_id, [active.day])
+                    uow.commit()
+            except StaleSession as e:
+                self._settle(batches, [])
+                active.stale = str(e)
+                raise
+            except BaseException:
+                with self._lock:
+                    active.stale = None
+                self._requeue(batches)
+                raise
+            self._settle(batches, claimed)
+            with self._lock:
+                active.stale = "session already completed"
+            self.flushes += 1
+        invalidate_user_workouts(active.user_id)
+        return row
+
+    def release(self, active: ActiveSession) -> None:
+        """A connection closed; the last one out writes the session's sets and refreshes its rollups"""
+        with self._lock:
+            active.connections -= 1
+            last = active.connections == 0
+            if last and self._sessions.get(active.id) is active:
+                del self._sessions[active.id]
+        if last and not active.stale:
+            self.flush([active], refresh=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "buffered_sets": self._buffered,
+                "flushes": self.flushes,
+                "sets_written": self.sets_written,
+                "error": self.error,
+            }
+
+
+def _publish(session, sessions: List[ActiveSession]) -> None:
+    """Bring the sessions' rollups and sync state up to date with the sets written"""
+    by_user = {}
+    for active in sessions:
+        by_user.setdefault(active.user_id, []).append(active)
+    # In user order, so two flushes locking the same users cannot deadlock
+    for user_id, user_sessions in sorted(by_user.items()):
+        refresh_rollups(session, user_id, {active.day for active in user_sessions})
+        touch_logs(session, user_id, WorkoutLog.id.in_([active.workout_log_id for active in user_sessions]))
+
+
+_buffer: Optional[LiveSessionBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_live_sessions() -> LiveSessionBuffer:
+    # Started lazily so the flush thread runs in the serving process, not a preloading master
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                from .db import engine
+                buffer = LiveSessionBuffer(engine)
+                buffer.start()
+                _buffer = buffer
+    return _buffer
+
+
+def set_live_sessions(buffer: Optional[LiveSessionBuffer]) -> Optional[LiveSessionBuffer]:
+    """Swap the process's buffer, e.g. for one that is not started in tests; returns the previous one"""
+    global _buffer
+    with _buffer_lock:
+        previous, _buffer = _buffer, buffer
+    return previous
+
+
+def stop_live_sessions() -> None:
+    """Write every buffered set; called at shutdown"""
+    if _buffer is not None:
+        _buffer.stop()
@@ -1,10 +1,17 @@
 import os, threading, time
-from fastapi import FastAPI, Depends, Header, HTTPException
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
-from .db import init_db, get_session
+from sqlmodel import Session
+from .db import init_db, engine
+from .auth import require_admin
+from . import chaos
+from .compression import CompressionMiddleware, PrecompressedStaticFiles
+from .health import AdmissionMiddleware, get_health_checker
+from .tracing import TracingMiddleware
+from .catalog import get_catalog
+from .workout_templates import seed_templates
 
 
 app = FastAPI(title="K8s Training App")
@@ -25,14 +32,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for large JSON payloads; tune with COMPRESSION_MIN_SIZE / COMPRESSION_LEVEL
+app.add_middleware(CompressionMiddleware)
+
+# Scopes /admin/fail/*_latency faults to the request being served
+app.add_middleware(chaos.ChaosMiddleware)
+
+# 503 early when in-flight requests or pool waiters pass ADMISSION_MAX_IN_FLIGHT / ADMISSION_MAX_POOL_WAITERS
+app.add_middleware(AdmissionMiddleware)
+
+# Outermost, so server spans include compression; configure with TRACE_EXPORTER / TRACE_SAMPLE_RATIO
+app.add_middleware(TracingMiddleware)
+
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 if os.path.isdir(static_dir):
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory=static_dir), name="static")
 
 
 @app.on_event("startup")
 def on_startup():
     init_db()
+    # Imports run inside the worker that accepted them; fail the ones a stopped worker left behind
+    from .importer import fail_orphaned_imports
+    fail_orphaned_imports(engine)
+    # Seed the exercise catalog and build its search index before serving
+    get_catalog()
+    with Session(engine) as session:
+        seed_templates(session)
+    get_health_checker()
+    # Optional always-on low-rate CPU sampling, inspected via GET /admin/profile/continuous
+    if os.getenv("PROFILER_CONTINUOUS_INTERVAL_MS"):
+        from .profiler import continuous, start_continuous
+        if continuous() is None:
+            start_continuous(float(os.getenv("PROFILER_CONTINUOUS_INTERVAL_MS")) / 1000,
+                             float(os.getenv("PROFILER_CONTINUOUS_WINDOW_SECONDS", "600")))
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    # Write the sets live sessions still hold in memory
+    from .live_sessions import stop_live_sessions
+    stop_live_sessions()
 
 
 FAIL = {
@@ -52,16 +92,16 @@ async def healthz():
 
 
 @app.get("/readyz")
-async def readyz(session=Depends(get_session)):
+async def readyz():
+    # Answered from the background health checker, so probes never wait on the pool
     if FAIL["ready_fail"]:
         return JSONResponse({"status": "not-ready"}, status_code=500)
     if FAIL["db_fail"]:
         return JSONResponse({"status": "db-fail"}, status_code=500)
-    try:
-        session.exec(text("SELECT 1"))
-    except Exception:
-        return JSONResponse({"status": "db-error"}, status_code=500)
-    return {"status": "ready"}
+    checker = get_health_checker()
+    if not checker.ready:
+        return JSONResponse({"status": "db-error", **checker.snapshot()}, status_code=500)
+    return {"status": "ready", **checker.snapshot()}
 
 
 def _cpu_spin(seconds=20):
@@ -71,10 +111,26 @@ def _cpu_spin(seconds=20):
 
 
 @app.post("/admin/fail/{mode}/{state}")
-async def set_fail_mode(mode: str, state: str, x_admin_token: str = Header(None)):
-    token = os.getenv("ADMIN_TOKEN", "changeme")
-    if x_admin_token != token:
-        raise HTTPException(403, "bad admin token")
+async def set_fail_mode(mode: str, state: str, latency_ms: float = 0, jitter_ms: float = 0,
+                        distribution: str = "fixed", error_rate: float = 0, percent: float = 100,
+                        route: Optional[str] = None, _admin=Depends(require_admin)):
+    """Toggle a failure mode in the worker that serves this request.
+
+    Modes and faults are per process: with several workers, ready_fail,
+    db_fail and liveness_fail fail only the probes that land on this
+    worker, so /readyz and /healthz flap rather than fail. Rehearse them
+    on a single-worker pod (WEB_CONCURRENCY=1).
+    """
+    if mode.endswith("_latency") and mode[:-len("_latency")] in chaos.TARGETS:
+        # e.g. /admin/fail/db_latency/on?latency_ms=200&distribution=exponential&percent=25&route=/api/workouts/history
+        fault = None
+        if state == "on":
+            fault = chaos.Fault(latency_ms, jitter_ms, distribution, error_rate, percent, route)
+        try:
+            chaos.set_fault(mode[:-len("_latency")], fault)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        return {"mode": mode, "state": state, "faults": chaos.active_faults()}
     if mode == "crash" and state == "on":
         os._exit(1)
     elif mode == "cpu_spike" and state == "on":
@@ -95,9 +151,27 @@ async def set_fail_mode(mode: str, state: str, x_admin_token: str = Header(None)
 
 from .routers.users_api import router as users_api
 from .routers.workouts_api import router as workouts_api
+from .routers.analytics_api import router as analytics_api
+from .routers.catalog_api import router as catalog_api
+from .routers.templates_api import router as templates_api
+from .routers.export_api import router as export_api
+from .routers.import_api import router as import_api
+from .routers.search_api import router as search_api
+from .routers.live_api import router as live_api
+from .routers.sync_api import router as sync_api
+from .routers.admin_api import router as admin_api
 from .routers.pages import router as pages
 app.include_router(users_api)
 app.include_router(workouts_api)
+app.include_router(analytics_api)
+app.include_router(catalog_api)
+app.include_router(templates_api)
+app.include_router(export_api)
+app.include_router(import_api)
+app.include_router(search_api)
+app.include_router(live_api)
+app.include_router(sync_api)
+app.include_router(admin_api)
 app.include_router(pages)
 
 
@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
+from sqlalchemy import Column, Index, JSON
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -9,43 +10,68 @@ class User(SQLModel, table=True):
     password_hash: str
     full_name: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Last change number handed out by app.sync for this user's workouts, exercises and logs
+    sync_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     workouts: List["Workout"] = Relationship(back_populates="owner")
 
 
 class Workout(SQLModel, table=True):
+    __table_args__ = (Index("ix_workout_owner_change", "owner_id", "change_seq"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    change_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # see app.sync
 
-    owner_id: int = Field(foreign_key="user.id")
+    owner_id: int = Field(foreign_key="user.id", index=True)
     owner: Optional[User] = Relationship(back_populates="workouts")
-    exercises: List["Exercise"] = Relationship(back_populates="workout")
+    exercises: List["Exercise"] = Relationship(
+        back_populates="workout", sa_relationship_kwargs={"order_by": lambda: [Exercise.position, Exercise.id]}
+    )
     logs: List["WorkoutLog"] = Relationship(back_populates="workout")
 
 
+class CanonicalExercise(SQLModel, table=True):
+    """One row per distinct movement; per-workout Exercise rows point here"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    key: str = Field(index=True, unique=True)  # output of app.canonical.normalize_exercise_name
+    name: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Exercise(SQLModel, table=True):
+    __table_args__ = (Index("ix_exercise_workout_change", "workout_id", "change_seq"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     sets: int
     reps: int
     rest_seconds: int = Field(default=60)  # rest time in seconds
     notes: Optional[str] = None
+    position: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # order within the workout
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    change_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
-    workout_id: int = Field(foreign_key="workout.id")
+    workout_id: int = Field(foreign_key="workout.id", index=True)
     workout: Optional[Workout] = Relationship(back_populates="exercises")
     logs: List["ExerciseLog"] = Relationship(back_populates="exercise")
+    # Shared identity across workouts; set by app.canonical.resolve_canonical
+    canonical_id: Optional[int] = Field(default=None, foreign_key="canonicalexercise.id", index=True)
 
 
 class WorkoutLog(SQLModel, table=True):
+    __table_args__ = (Index("ix_workoutlog_workout_change", "workout_id", "change_seq"),)
     id: Optional[int] = Field(default=None, primary_key=True)
-    workout_date: datetime = Field(default_factory=datetime.utcnow)
+    workout_date: datetime = Field(default_factory=datetime.utcnow, index=True)
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Also moved on when the session's exercise logs change
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    change_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
-    workout_id: int = Field(foreign_key="workout.id")
+    workout_id: int = Field(foreign_key="workout.id", index=True)
     workout: Optional[Workout] = Relationship(back_populates="logs")
     exercise_logs: List["ExerciseLog"] = Relationship(back_populates="workout_log")
 
@@ -58,9 +84,113 @@ class ExerciseLog(SQLModel, table=True):
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-    exercise_id: int = Field(foreign_key="exercise.id")
+    exercise_id: int = Field(foreign_key="exercise.id", index=True)
     exercise: Optional[Exercise] = Relationship(back_populates="logs")
-    workout_log_id: int = Field(foreign_key="workoutlog.id")
+    workout_log_id: int = Field(foreign_key="workoutlog.id", index=True)
     workout_log: Optional[WorkoutLog] = Relationship(back_populates="exercise_logs")
 
 
+class DailyActivity(SQLModel, table=True):
+    """Per-user, per-day activity rollup maintained by app.rollups"""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    sessions: int = 0
+    exercise_logs: int = 0
+    total_volume: float = 0
+    distinct_exercises: int = 0
+
+
+class WeeklyActivity(SQLModel, table=True):
+    """Per-user, per-ISO-week activity rollup maintained by app.rollups"""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    week_start: date = Field(primary_key=True)  # Monday of the ISO week
+    iso_year: int
+    iso_week: int
+    sessions: int = 0
+    exercise_logs: int = 0
+    total_volume: float = 0
+    distinct_exercises: int = 0
+
+
+class CatalogExercise(SQLModel, table=True):
+    """Reference exercise library entry, seeded from app/data/exercise_catalog.json"""
+    id: str = Field(primary_key=True)  # slug, e.g. "push-ups"
+    name: str
+    category: str
+    difficulty: str  # beginner | intermediate | advanced
+    muscle_groups: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    equipment: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    instructions: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    tips: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    variations: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    common_mistakes: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+
+
+class WorkoutTemplate(SQLModel, table=True):
+    """Reusable workout plan; built-ins have a slug and no owner"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    slug: Optional[str] = Field(default=None, index=True, unique=True)
+    name: str
+    description: str = ""
+    category: str = "Custom"
+    difficulty: str = "beginner"  # beginner | intermediate | advanced
+    duration: int = 0  # estimated minutes
+    equipment: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    tags: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    # Ordered list of {name, sets, reps, rest_seconds, notes}
+    exercises: List[dict] = Field(default_factory=list, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    owner_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
+
+
+class ImportJob(SQLModel, table=True):
+    """Background history import started via /api/import; counters are updated once per chunk"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    filename: Optional[str] = None
+    format: str  # csv | ndjson
+    status: str = "queued"  # queued | running | completed | failed
+    bytes_total: int = 0
+    bytes_read: int = 0
+    rows_processed: int = 0
+    rows_imported: int = 0
+    rows_skipped: int = 0
+    rows_duplicate: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # sessions already imported
+    workouts_created: int = 0
+    sessions_created: int = 0
+    errors: List[str] = Field(default_factory=list, sa_column=Column(JSON))  # first few rejected rows
+    error: Optional[str] = None  # why a failed job stopped
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = Field(default_factory=datetime.utcnow)  # last progress, see fail_orphaned_imports
+
+
+class LiveSession(SQLModel, table=True):
+    """Workout being logged set by set over a WebSocket; app.live_sessions buffers the sets and writes them in batches"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    workout_id: int = Field(foreign_key="workout.id", index=True)
+    workout_log_id: int = Field(foreign_key="workoutlog.id", index=True)
+    status: str = "active"  # active | completed
+    sets_persisted: int = 0  # highest client sequence number written; a reconnect resumes after it
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+
+class Tombstone(SQLModel, table=True):
+    """A deleted workout or exercise, so /api/sync can tell clients to drop their copy"""
+    __table_args__ = (Index("ix_tombstone_owner_change", "owner_id", "change_seq"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    owner_id: int = Field(foreign_key="user.id")
+    kind: str  # workout | exercise
+    row_id: int
+    change_seq: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SchemaVersion(SQLModel, table=True):
+    """Fingerprint of the models the schema was last created/migrated for; lets startup skip reflection"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    fingerprint: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
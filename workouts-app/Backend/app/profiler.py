@@ -0,0 +1,191 @@
+"""Statistical CPU profiler sampling the Python stacks of every thread.
+
+A background thread reads ``sys._current_frames()`` every interval, so
+handlers in the event loop and in the Starlette threadpool are both
+seen, with no tracing hooks on the profiled code. Samples are kept as
+per-second counts of identical stacks, which bounds memory for the
+continuous mode to the number of distinct stacks per second.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# (filename, function, line) from the outermost frame to the innermost
+Frame = Tuple[str, str, int]
+StackKey = Tuple[str, Tuple[Frame, ...]]  # (thread name, frames)
+
+MAX_DEPTH = 128
+
+# Innermost frames of threads parked on a lock, queue or selector
+IDLE_FUNCTIONS = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("socket.py", "accept"), ("socketserver.py", "serve_forever"),
+    ("_worker.py", "run"), ("thread.py", "_worker"),
+}
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _short_path(path: str) -> str:
+    if path.startswith(_APP_ROOT + os.sep):
+        return os.path.relpath(path, _APP_ROOT)
+    marker = f"{os.sep}site-packages{os.sep}"
+    if marker in path:
+        return path.split(marker, 1)[1]
+    return os.path.basename(path)
+
+
+class Sampler:
+    """Samples all threads every ``interval`` seconds, keeping ``window`` seconds of history (None keeps all)"""
+
+    def __init__(self, interval: float = 0.01, window: Optional[float] = None, include_idle: bool = False):
+        self.interval = interval
+        self.window = window
+        self.include_idle = include_idle
+        self.started_at: Optional[float] = None
+        self.samples = 0
+        self._buckets: Deque[Tuple[int, Counter]] = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "Sampler":
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="cpu-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip=own)
+
+    def sample(self, skip: Optional[int] = None) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        now = int(time.monotonic())
+        keys = []
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            frames = []
+            while frame is not None and len(frames) < MAX_DEPTH:
+                code = frame.f_code
+                frames.append((_short_path(code.co_filename), code.co_name, frame.f_lineno))
+                frame = frame.f_back
+            if not frames:
+                continue
+            leaf = frames[0]
+            if not self.include_idle and (os.path.basename(leaf[0]), leaf[1]) in IDLE_FUNCTIONS:
+                continue
+            frames.reverse()
+            keys.append((names.get(ident, f"thread-{ident}"), tuple(frames)))
+        with self._lock:
+            self.samples += 1
+            if not self._buckets or self._buckets[-1][0] != now:
+                self._buckets.append((now, Counter()))
+            self._buckets[-1][1].update(keys)
+            if self.window is not None:
+                while self._buckets and self._buckets[0][0] <= now - self.window:
+                    self._buckets.popleft()
+
+    def counts(self, seconds: Optional[float] = None) -> Counter:
+        """Stack counts over the last ``seconds``, or everything kept"""
+        since = None if seconds is None else time.monotonic() - seconds
+        total = Counter()
+        with self._lock:
+            for second, counter in self._buckets:
+                if since is None or second >= int(since):
+                    total.update(counter)
+        return total
+
+
+def collapsed(counts: Counter) -> str:
+    """Brendan Gregg's folded format, one ``thread;outer;...;inner count`` line per stack"""
+    lines = []
+    for (thread, frames), count in counts.most_common():
+        names = [thread.replace(";", ":")] + [f"{func} ({path}:{line})" for path, func, line in frames]
+        lines.append(f"{';'.join(names)} {count}")
+    return "\n".join(lines)
+
+
+def top_functions(counts: Counter, limit: int = 30) -> Tuple[List[dict], List[dict]]:
+    """(functions by self and inclusive samples, innermost lines by samples)"""
+    total = sum(counts.values()) or 1
+    own: Counter = Counter()
+    inclusive: Counter = Counter()
+    lines: Counter = Counter()
+    for (_, frames), count in counts.items():
+        path, func, line = frames[-1]
+        own[(path, func)] += count
+        lines[(path, func, line)] += count
+        for fn in {(p, f) for p, f, _ in frames}:
+            inclusive[fn] += count
+    functions = sorted(inclusive, key=lambda fn: (-own[fn], -inclusive[fn]))[:limit]
+    return (
+        [{"function": func, "file": path, "self": own[(path, func)], "total": inclusive[(path, func)],
+          "self_pct": round(100 * own[(path, func)] / total, 1), "total_pct": round(100 * inclusive[(path, func)] / total, 1)}
+         for path, func in functions],
+        [{"function": func, "file": path, "line": line, "samples": count, "pct": round(100 * count / total, 1)}
+         for (path, func, line), count in lines.most_common(limit)],
+    )
+
+
+def report(counts: Counter, limit: int = 30, **meta) -> Dict[str, object]:
+    functions, hot_lines = top_functions(counts, limit)
+    return {
+        **meta,
+        "samples": sum(counts.values()),
+        "top_functions": functions,
+        "top_lines": hot_lines,
+        "collapsed": collapsed(counts),
+    }
+
+
+_profile_lock = threading.Lock()
+
+
+def profile(seconds: float, interval: float = 0.01, include_idle: bool = False) -> Counter:
+    """Sample every thread for ``seconds``; one profile at a time per process"""
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running in this worker")
+    try:
+        sampler = Sampler(interval, include_idle=include_idle).start()
+        time.sleep(seconds)
+        sampler.stop()
+        return sampler.counts()
+    finally:
+        _profile_lock.release()
+
+
+_continuous: Optional[Sampler] = None
+
+
+def continuous() -> Optional[Sampler]:
+    return _continuous
+
+
+def start_continuous(interval: float = 0.1, window: float = 600) -> Sampler:
+    """Low-rate sampling kept for the last ``window`` seconds, for looking back after a spike"""
+    global _continuous
+    stop_continuous()
+    _continuous = Sampler(interval, window=window).start()
+    return _continuous
+
+
+def stop_continuous() -> None:
+    global _continuous
+    if _continuous is not None:
+        _continuous.stop()
+        _continuous = None
@@ -0,0 +1,162 @@
+"""Lean read models: rows selected column by column, for GET handlers.
+
+A handler that only serializes what it reads needs none of the ORM's
+identity map, change tracking or lazy loading. Selecting columns instead
+of entities skips all of it: each row is a named tuple, built without
+instance state, and garbage as soon as it has been serialized. Writes
+go through ``app.unit_of_work``, which hands back the same row types.
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Type
+from sqlmodel import select
+from .models import (
+    DailyActivity, Exercise, ExerciseLog, ImportJob, LiveSession, User, WeeklyActivity, Workout, WorkoutLog,
+    WorkoutTemplate,
+)
+
+
+class UserRow(NamedTuple):
+    id: int
+    email: str
+    full_name: Optional[str]
+
+
+class WorkoutRow(NamedTuple):
+    id: int
+    title: str
+    notes: Optional[str]
+    created_at: datetime
+    owner_id: int
+
+
+class ExerciseRow(NamedTuple):
+    id: int
+    name: str
+    sets: int
+    reps: int
+    rest_seconds: int
+    notes: Optional[str]
+    position: int
+    created_at: datetime
+    workout_id: int
+    canonical_id: Optional[int]
+
+
+class WorkoutLogRow(NamedTuple):
+    id: int
+    workout_date: datetime
+    notes: Optional[str]
+    created_at: datetime
+    workout_id: int
+
+
+class ExerciseLogRow(NamedTuple):
+    id: int
+    exercise_id: int
+    actual_sets: int
+    actual_reps: int
+    weight: Optional[float]
+    notes: Optional[str]
+    created_at: datetime
+    workout_log_id: int
+
+
+class TemplateRow(NamedTuple):
+    id: int
+    slug: Optional[str]
+    name: str
+    description: str
+    category: str
+    difficulty: str
+    duration: int
+    equipment: list
+    tags: list
+    exercises: list
+    owner_id: Optional[int]
+
+
+class ImportJobRow(NamedTuple):
+    id: int
+    user_id: int
+    filename: Optional[str]
+    format: str
+    status: str
+    bytes_total: int
+    bytes_read: int
+    rows_processed: int
+    rows_imported: int
+    rows_skipped: int
+    rows_duplicate: int
+    workouts_created: int
+    sessions_created: int
+    errors: list
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+    heartbeat_at: Optional[datetime]
+
+
+class LiveSessionRow(NamedTuple):
+    id: int
+    user_id: int
+    workout_id: int
+    workout_log_id: int
+    status: str
+    sets_persisted: int
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+
+class ActivityRow(NamedTuple):
+    period: date  # DailyActivity.day or WeeklyActivity.week_start
+    sessions: int
+    exercise_logs: int
+    total_volume: float
+    distinct_exercises: int
+
+
+ROW_MODELS = {
+    UserRow: User,
+    WorkoutRow: Workout,
+    ExerciseRow: Exercise,
+    WorkoutLogRow: WorkoutLog,
+    ExerciseLogRow: ExerciseLog,
+    TemplateRow: WorkoutTemplate,
+    ImportJobRow: ImportJob,
+    LiveSessionRow: LiveSession,
+}
+
+
+def columns(row_type: Type[NamedTuple], model=None) -> list:
+    """The columns of ``model`` (by default the row type's own) named by ``row_type``'s fields, in order"""
+    model = model if model is not None else ROW_MODELS[row_type]
+    return [getattr(model, name) for name in row_type._fields]
+
+
+def select_rows(row_type: Type[NamedTuple]):
+    return select(*columns(row_type))
+
+
+def activity_columns(model) -> list:
+    period = DailyActivity.day if model is DailyActivity else WeeklyActivity.week_start
+    return [period] + [getattr(model, name) for name in ActivityRow._fields[1:]]
+
+
+def fetch(session, row_type, statement) -> list:
+    return [row_type._make(row) for row in session.exec(statement)]
+
+
+def fetch_one(session, row_type, statement):
+    row = session.exec(statement).first()
+    return None if row is None else row_type._make(row)
+
+
+def group_by(rows: Iterable[NamedTuple], field: str) -> Dict[object, List[NamedTuple]]:
+    grouped: Dict[object, List[NamedTuple]] = {}
+    for row in rows:
+        grouped.setdefault(getattr(row, field), []).append(row)
+    return grouped
+
+
+def owned_workout_exists(session, wid: int, owner_id: int) -> bool:
+    return session.exec(select(Workout.id).where(Workout.id == wid, Workout.owner_id == owner_id)).first() is not None
@@ -0,0 +1,172 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+from .canonical import normalize_exercise_name
+from .models import User, Workout, Exercise, WorkoutLog, ExerciseLog, DailyActivity, WeeklyActivity
+
+
+def week_start(day: date) -> date:
+    """Monday of the ISO week containing ``day``"""
+    return day - timedelta(days=day.weekday())
+
+
+def _new_bucket():
+    return {"sessions": set(), "exercise_logs": 0, "total_volume": 0.0, "exercises": set()}
+
+
+def refresh_rollups(session: Session, user_id: int, days: Iterable[date]) -> None:
+    """Recompute the daily and weekly rollups covering ``days`` for one user.
+
+    Every ISO week touched by ``days`` is rebuilt from the base tables, so
+    the cost is proportional to the logs in those weeks, not the user's
+    whole history. Runs inside the caller's transaction; does not commit.
+    The user row stays locked until then, so concurrent rebuilds for one
+    user run one after the other.
+    """
+    weeks = {week_start(d) for d in days}
+    if not weeks:
+        return
+    lo = min(weeks)
+    hi = max(weeks) + timedelta(days=7)
+    _lock_user(session, user_id)
+    _rebuild_range(session, user_id, lo, hi)
+
+
+def _lock_user(session: Session, user_id: int) -> None:
+    # Taken before reading the logs: a rebuild waiting here then reads every log the one ahead of it
+    # committed, instead of both re-inserting the same rollup rows (a unique violation) or the later
+    # one overwriting the other's counts. SQLite ignores FOR UPDATE; its writers are serialized anyway.
+    session.exec(select(User.id).where(User.id == user_id).with_for_update())
+
+
+def _rebuild_range(session: Session, user_id: int, lo: date, hi: date) -> None:
+    rows = session.exec(
+        select(
+            WorkoutLog.id,
+            WorkoutLog.workout_date,
+            ExerciseLog.id,
+            Exercise.canonical_id,
+            Exercise.name,
+            ExerciseLog.actual_sets,
+            ExerciseLog.actual_reps,
+            ExerciseLog.weight,
+        )
+        .join(Workout, WorkoutLog.workout_id == Workout.id)
+        .outerjoin(ExerciseLog, ExerciseLog.workout_log_id == WorkoutLog.id)
+        .outerjoin(Exercise, ExerciseLog.exercise_id == Exercise.id)
+        .where(
+            Workout.owner_id == user_id,
+            WorkoutLog.workout_date >= datetime.combine(lo, datetime.min.time()),
+            WorkoutLog.workout_date < datetime.combine(hi, datetime.min.time()),
+        )
+    ).all()
+
+    daily = defaultdict(_new_bucket)
+    weekly = defaultdict(_new_bucket)
+    for log_id, workout_date, exercise_log_id, canonical_id, name, sets, reps, weight in rows:
+        day = workout_date.date()
+        exercise_key = canonical_id if canonical_id is not None else (normalize_exercise_name(name) if name else None)
+        for bucket in (daily[day], weekly[week_start(day)]):
+            bucket["sessions"].add(log_id)
+            if exercise_log_id is not None:
+                bucket["exercise_logs"] += 1
+                bucket["total_volume"] += (sets or 0) * (reps or 0) * (weight or 0)
+                if exercise_key:
+                    bucket["exercises"].add(exercise_key)
+
+    session.execute(delete(DailyActivity).where(
+        DailyActivity.user_id == user_id, DailyActivity.day >= lo, DailyActivity.day < hi))
+    session.execute(delete(WeeklyActivity).where(
+        WeeklyActivity.user_id == user_id, WeeklyActivity.week_start >= lo, WeeklyActivity.week_start < hi))
+    if daily:
+        session.execute(insert(DailyActivity), [
+            {"user_id": user_id, "day": day, **_counts(bucket)} for day, bucket in daily.items()
+        ])
+    if weekly:
+        session.execute(insert(WeeklyActivity), [
+            {"user_id": user_id, "week_start": start, "iso_year": start.isocalendar()[0],
+             "iso_week": start.isocalendar()[1], **_counts(bucket)}
+            for start, bucket in weekly.items()
+        ])
+
+
+def _counts(bucket) -> dict:
+    return {
+        "sessions": len(bucket["sessions"]),
+        "exercise_logs": bucket["exercise_logs"],
+        "total_volume": bucket["total_volume"],
+        "distinct_exercises": len(bucket["exercises"]),
+    }
+
+
+def workout_log_days(session: Session, workout_ids: List[int]) -> List[date]:
+    """Distinct days that have logs for the given workouts"""
+    if not workout_ids:
+        return []
+    dates = session.exec(select(WorkoutLog.workout_date).where(WorkoutLog.workout_id.in_(workout_ids))).all()
+    return sorted({d.date() for d in dates})
+
+
+def delete_user_rollups(session: Session, user_id: int) -> None:
+    session.execute(delete(DailyActivity).where(DailyActivity.user_id == user_id))
+    session.execute(delete(WeeklyActivity).where(WeeklyActivity.user_id == user_id))
+
+
+def rebuild_user_rollups(session: Session, user_id: int) -> None:
+    """Rebuild every rollup row for a user from scratch"""
+    _lock_user(session, user_id)
+    delete_user_rollups(session, user_id)
+    bounds = session.exec(
+        select(func.min(WorkoutLog.workout_date), func.max(WorkoutLog.workout_date))
+        .join(Workout).where(Workout.owner_id == user_id)
+    ).first()
+    if bounds and bounds[0] is not None:
+        _rebuild_range(session, user_id, week_start(bounds[0].date()), week_start(bounds[1].date()) + timedelta(days=7))
+
+
+def rebuild_all(user_id: Optional[int] = None) -> int:
+    """Backfill rollups for one user or everyone; commits once per user"""
+    from .db import engine, init_db
+    from .models import User
+    init_db()
+    with Session(engine) as session:
+        user_ids = [user_id] if user_id is not None else session.exec(select(User.id)).all()
+        for uid in user_ids:
+            rebuild_user_rollups(session, uid)
+            session.commit()
+    return len(user_ids)
+
+
+def current_streak(days: List[date], today: date, step: timedelta) -> int:
+    """Consecutive periods ending at ``today`` (or the one before); ``days`` sorted descending"""
+    if not days or days[0] < today - step:
+        return 0
+    streak, expected = 0, days[0]
+    for d in days:
+        if d != expected:
+            break
+        streak += 1
+        expected = d - step
+    return streak
+
+
+def longest_streak(days: List[date], step: timedelta) -> int:
+    """Longest run of consecutive periods; ``days`` sorted descending"""
+    longest = run = 0
+    previous = None
+    for d in days:
+        run = run + 1 if previous is not None and previous - d == step else 1
+        longest = max(longest, run)
+        previous = d
+    return longest
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Rebuild workout activity rollups from the base tables")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", type=int, default=None, help="only rebuild this user id")
+    args = parser.parse_args()
+    print(f"Rebuilt activity rollups for {rebuild_all(args.user)} user(s)")
@@ -0,0 +1,137 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from .. import heap, profiler
+from ..auth import require_admin
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+def _check(group_by: str, limit: int) -> None:
+    if group_by not in heap.GROUP_BY:
+        raise HTTPException(400, f"group_by must be one of: {', '.join(heap.GROUP_BY)}")
+    if limit < 1:
+        raise HTTPException(400, "limit must be >= 1")
+
+
+def _snapshot(snapshot_id: int):
+    try:
+        return heap.get_snapshot(snapshot_id)
+    except KeyError:
+        raise HTTPException(404, f"Snapshot {snapshot_id} not found")
+
+
+@router.get("/heap")
+def api_heap_status():
+    """Whether tracemalloc is running in this worker, traced memory and stored snapshot ids"""
+    return heap.status()
+
+
+@router.post("/heap/start")
+def api_heap_start(frames: int = 1):
+    """Start tracing allocations; more frames give deeper tracebacks at a higher cost"""
+    if not 1 <= frames <= 50:
+        raise HTTPException(400, "frames must be between 1 and 50")
+    return heap.start(frames)
+
+
+@router.post("/heap/stop")
+def api_heap_stop():
+    """Stop tracing and drop stored snapshots"""
+    return heap.stop()
+
+
+@router.post("/heap/snapshots")
+def api_heap_snapshot(group_by: str = "lineno", limit: int = 20):
+    """Take a snapshot and return its largest allocation sites"""
+    _check(group_by, limit)
+    try:
+        snapshot_id = heap.take_snapshot()
+    except heap.HeapError as e:
+        raise HTTPException(409, str(e))
+    return {"id": snapshot_id, **heap.status(), "top": heap.top_stats(heap.get_snapshot(snapshot_id), group_by, limit)}
+
+
+@router.get("/heap/snapshots/{snapshot_id}")
+def api_heap_snapshot_top(snapshot_id: int, group_by: str = "lineno", limit: int = 20):
+    """Largest allocation sites of a stored snapshot"""
+    _check(group_by, limit)
+    return {"id": snapshot_id, "top": heap.top_stats(_snapshot(snapshot_id), group_by, limit)}
+
+
+@router.get("/heap/diff")
+def api_heap_diff(base: int, head: Optional[int] = None, group_by: str = "lineno", limit: int = 20):
+    """Allocation growth from snapshot ``base`` to ``head``, or to a new snapshot if ``head`` is omitted"""
+    _check(group_by, limit)
+    base_snapshot = _snapshot(base)
+    if head is None:
+        try:
+            head = heap.take_snapshot()
+        except heap.HeapError as e:
+            raise HTTPException(409, str(e))
+    return {"base": base, "head": head, "diff": heap.diff_stats(base_snapshot, _snapshot(head), group_by, limit)}
+
+
+@router.get("/heap/objects")
+def api_heap_objects(limit: int = 20):
+    """ORM model instances per class: held by open sessions, pending, and alive anywhere"""
+    return heap.orm_objects(limit)
+
+
+def _profile_response(counts, format: str, limit: int, **meta):
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed(counts) + "\n")
+    return profiler.report(counts, limit, **meta)
+
+
+def _check_profile(format: str, interval_ms: float, limit: int) -> None:
+    if format not in ("json", "collapsed"):
+        raise HTTPException(400, "format must be json or collapsed")
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(400, "interval_ms must be between 1 and 1000")
+    if limit < 1:
+        raise HTTPException(400, "limit must be >= 1")
+
+
+@router.post("/profile")
+def api_profile(seconds: float = 5, interval_ms: float = 10, format: str = "json", include_idle: bool = False,
+                limit: int = 30):
+    """Sample every thread of this worker for ``seconds``; collapsed output feeds flamegraph.pl or speedscope"""
+    _check_profile(format, interval_ms, limit)
+    if not 0 < seconds <= 60:
+        raise HTTPException(400, "seconds must be between 0 and 60")
+    try:
+        counts = profiler.profile(seconds, interval_ms / 1000, include_idle)
+    except RuntimeError as e:
+        raise HTTPException(409, str(e))
+    return _profile_response(counts, format, limit, pid=os.getpid(), seconds=seconds, interval_ms=interval_ms)
+
+
+@router.post("/profile/continuous/{state}")
+def api_profile_continuous(state: str, interval_ms: float = 100, window_seconds: float = 600):
+    """Turn low-rate background sampling on or off; it keeps the last ``window_seconds``"""
+    if state == "on":
+        _check_profile("json", interval_ms, 1)
+        if not 1 <= window_seconds <= 3600:
+            raise HTTPException(400, "window_seconds must be between 1 and 3600")
+        profiler.start_continuous(interval_ms / 1000, window_seconds)
+    elif state == "off":
+        profiler.stop_continuous()
+    else:
+        raise HTTPException(400, "state must be on or off")
+    sampler = profiler.continuous()
+    return {"pid": os.getpid(), "running": sampler is not None,
+            "interval_ms": sampler.interval * 1000 if sampler else None, "window_seconds": sampler.window if sampler else None}
+
+
+@router.get("/profile/continuous")
+def api_profile_window(seconds: Optional[float] = None, format: str = "json", limit: int = 30):
+    """Profile of the last ``seconds`` (default: the whole window) from continuous sampling"""
+    _check_profile(format, 10, limit)
+    sampler = profiler.continuous()
+    if sampler is None:
+        raise HTTPException(409, "Continuous profiling is off; POST /admin/profile/continuous/on first")
+    return _profile_response(sampler.counts(seconds), format, limit, pid=os.getpid(),
+                             seconds=seconds or sampler.window, interval_ms=sampler.interval * 1000)
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from sqlmodel import select
+from ..db import get_read_session
+from ..auth import require_user
+from ..models import DailyActivity, WeeklyActivity
+from ..rollups import week_start, current_streak, longest_streak
+from ..read_models import ActivityRow, activity_columns, fetch
+
+
+router = APIRouter(prefix="/api/analytics", tags=["api:analytics"])
+
+ACTIVITY_FIELDS = ActivityRow._fields[1:]  # sessions, exercise_logs, total_volume, distinct_exercises
+
+
+@router.get("/progression")
+def api_progression(exercise: Optional[str] = None, formula: str = "epley", window: int = 5, points: int = 20,
+                    user=Depends(require_user), session=Depends(get_read_session)):
+    """Per-exercise volume, estimated 1RM, personal records and rolling trends"""
+    # numpy is imported with the first analytics request rather than at startup
+    from ..analytics import FORMULAS, load_exercise_logs, compute_progression
+    if formula not in FORMULAS:
+        raise HTTPException(400, f"formula must be one of: {', '.join(FORMULAS)}")
+    if window < 1 or points < 0:
+        raise HTTPException(400, "window must be >= 1 and points >= 0")
+    columns = load_exercise_logs(session, user.id, exercise)
+    return {"exercises": compute_progression(columns, formula=formula, window=window, points=points)}
+
+
+@router.get("/exercises")
+def api_exercise_stats(user=Depends(require_user), session=Depends(get_read_session)):
+    """Log counts, totals and bests per canonical exercise, most logged first"""
+    from ..analytics import exercise_stats
+    return {"exercises": exercise_stats(session, user.id)}
+
+
+@router.get("/activity")
+def api_activity(weeks: int = 12, user=Depends(require_user), session=Depends(get_read_session)):
+    """Daily and weekly activity from the rollup tables, plus streaks"""
+    if weeks < 1 or weeks > 520:
+        raise HTTPException(400, "weeks must be between 1 and 520")
+    today = datetime.utcnow().date()
+    first_week = week_start(today) - timedelta(weeks=weeks - 1)
+
+    weekly_rows = fetch(session, ActivityRow, select(*activity_columns(WeeklyActivity)).where(
+        WeeklyActivity.user_id == user.id, WeeklyActivity.week_start >= first_week
+    ))
+    daily_rows = fetch(session, ActivityRow, select(*activity_columns(DailyActivity)).where(
+        DailyActivity.user_id == user.id, DailyActivity.day >= first_week
+    ))
+    by_week = {row.period: row for row in weekly_rows}
+    by_day = {row.period: row for row in daily_rows}
+
+    week_list = []
+    for i in range(weeks):
+        start = first_week + timedelta(weeks=i)
+        iso = start.isocalendar()
+        week_list.append({"week_start": start.isoformat(), "iso_year": iso[0], "iso_week": iso[1],
+                          **_activity(by_week.get(start))})
+    day_list = []
+    for i in range((today - first_week).days + 1):
+        day = first_week + timedelta(days=i)
+        day_list.append({"day": day.isoformat(), **_activity(by_day.get(day))})
+
+    return {"weeks": week_list, "days": day_list, "streaks": _streaks(session, user.id, today)}
+
+
+def _activity(row) -> dict:
+    return {field: (getattr(row, field) if row else 0) for field in ACTIVITY_FIELDS}
+
+
+def _streaks(session, user_id: int, today: date) -> dict:
+    # Only active periods are stored, so these scans are O(active days/weeks)
+    active_days = session.exec(
+        select(DailyActivity.day).where(DailyActivity.user_id == user_id, DailyActivity.sessions > 0)
+        .order_by(DailyActivity.day.desc())
+    ).all()
+    active_weeks = session.exec(
+        select(WeeklyActivity.week_start).where(WeeklyActivity.user_id == user_id, WeeklyActivity.sessions > 0)
+        .order_by(WeeklyActivity.week_start.desc())
+    ).all()
+    one_day, one_week = timedelta(days=1), timedelta(weeks=1)
+    return {
+        "current_days": current_streak(active_days, today, one_day),
+        "longest_days": longest_streak(active_days, one_day),
+        "current_weeks": current_streak(active_weeks, week_start(today), one_week),
+        "longest_weeks": longest_streak(active_weeks, one_week),
+    }
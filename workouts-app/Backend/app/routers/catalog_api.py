@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Response
+from typing import Optional
+from ..catalog import get_catalog
+
+
+router = APIRouter(prefix="/api/exercises", tags=["api:exercises"])
+
+
+@router.get("/search")
+def api_search_exercises(response: Response, q: str = "", muscle_group: Optional[str] = None,
+                         equipment: Optional[str] = None, difficulty: Optional[str] = None,
+                         category: Optional[str] = None, limit: int = 20, facets: bool = False):
+    """Search the exercise catalog by name, muscle group, equipment and difficulty.
+
+    Matches prefixes and single-character typos. ``facets=true`` adds the
+    available filter values so clients never need the full catalog.
+    """
+    if limit < 1 or limit > 100:
+        raise HTTPException(400, "limit must be between 1 and 100")
+    catalog = get_catalog()
+    results = catalog.search(q, limit=limit, muscle_group=muscle_group, equipment=equipment,
+                             difficulty=difficulty, category=category)
+    # Reference data shared by all users
+    response.headers["Cache-Control"] = "public, max-age=300"
+    body = {"results": results, "count": len(results)}
+    if facets:
+        body["facets"] = catalog.facet_values()
+    return body
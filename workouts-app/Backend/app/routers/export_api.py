@@ -0,0 +1,35 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from .. import db
+from ..auth import require_user
+from ..export import FORMATS, stream_export
+
+
+router = APIRouter(prefix="/api/export", tags=["api:export"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@router.get("")
+def api_export(format: str = "ndjson", start: Optional[date] = None, end: Optional[date] = None,
+               gzip: bool = False, user=Depends(require_user)):
+    """Stream the caller's training history as NDJSON (all records) or CSV (logged sets).
+
+    ``start``/``end`` are inclusive dates limiting the exported sessions;
+    ``gzip=true`` returns a .gz attachment compressed on the fly.
+    """
+    if format not in FORMATS:
+        raise HTTPException(400, f"format must be one of: {', '.join(FORMATS)}")
+    if start and end and start > end:
+        raise HTTPException(400, "start must not be after end")
+
+    # The body outlives the request's session, so the stream opens its own
+    bind = db.read_engine if db.read_engine is not None else db.engine
+    filename = f"workouts-export.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(bind, user.id, format, start, end, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,90 @@
+import os
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from .. import db
+from ..db import get_session, get_read_session
+from ..models import ImportJob
+from ..auth import require_user
+from ..importer import FORMATS, detect_format, submit_import
+from ..read_models import ImportJobRow, fetch, fetch_one, select_rows
+from ..unit_of_work import get_unit_of_work
+
+
+router = APIRouter(prefix="/api/import", tags=["api:import"])
+
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def _serialize(job) -> dict:
+    return {
+        "id": job.id,
+        "filename": job.filename,
+        "format": job.format,
+        "status": job.status,
+        "progress": round(job.bytes_read / job.bytes_total, 3) if job.bytes_total else 0.0,
+        "rows_processed": job.rows_processed,
+        "rows_imported": job.rows_imported,
+        "rows_skipped": job.rows_skipped,
+        "rows_duplicate": job.rows_duplicate,
+        "workouts_created": job.workouts_created,
+        "sessions_created": job.sessions_created,
+        "errors": job.errors or [],
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _spool(upload: UploadFile) -> str:
+    """Copy the upload to a file the background job owns; the upload is closed with the request"""
+    fd, path = tempfile.mkstemp(prefix="workouts-import-")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := upload.file.read(COPY_CHUNK_BYTES):
+                size += len(chunk)
+                if size > IMPORT_MAX_BYTES:
+                    raise HTTPException(413, f"import files are limited to {IMPORT_MAX_BYTES} bytes")
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    if size == 0:
+        os.unlink(path)
+        raise HTTPException(400, "file is empty")
+    return path
+
+
+@router.post("", status_code=202)
+def api_start_import(file: UploadFile = File(...), format: Optional[str] = None,
+                     user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    """Queue a CSV or NDJSON history import (optionally gzipped); poll GET /api/import/{id} for progress"""
+    fmt = format or detect_format(file.filename)
+    if fmt not in FORMATS:
+        raise HTTPException(400, f"format must be one of: {', '.join(FORMATS)}")
+    path = _spool(file)
+    job = uow.insert_one(ImportJobRow, user_id=user.id, filename=file.filename, format=fmt)
+    uow.commit()
+    submit_import(db.engine, job.id, path)
+    return _serialize(job)
+
+
+@router.get("")
+def api_list_imports(user=Depends(require_user), session=Depends(get_read_session)):
+    """The caller's most recent imports, newest first"""
+    jobs = fetch(
+        session, ImportJobRow,
+        select_rows(ImportJobRow).where(ImportJob.user_id == user.id).order_by(ImportJob.id.desc()).limit(20)
+    )
+    return [_serialize(job) for job in jobs]
+
+
+@router.get("/{job_id}")
+def api_get_import(job_id: int, user=Depends(require_user), session=Depends(get_session)):
+    # Progress is written on the primary; a replica may lag behind it
+    job = fetch_one(session, ImportJobRow, select_rows(ImportJobRow).where(ImportJob.id == job_id))
+    if not job or job.user_id != user.id:
+        raise HTTPException(404)
+    return _serialize(job)
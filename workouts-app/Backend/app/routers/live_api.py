@@ -0,0 +1,92 @@
+import json
+from typing import Optional
+import anyio
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from sqlmodel import Session
+from ..auth import require_user
+from ..db import engine
+from ..live_sessions import StaleSession, get_live_sessions, parse_set
+
+
+router = APIRouter(prefix="/api/workouts", tags=["api:live"])
+
+# Application close codes, after the HTTP status they stand for
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+CLOSE_STALE = 4409
+
+
+def _user_id(websocket: WebSocket) -> int:
+    with Session(engine) as session:
+        return require_user(websocket, session).id
+
+
+async def _close(websocket: WebSocket, code: int, detail: str) -> None:
+    await websocket.send_json({"type": "error", "detail": detail})
+    await websocket.close(code)
+
+
+@router.websocket("/{wid}/live")
+async def live_session(websocket: WebSocket, wid: int, session: Optional[int] = None):
+    """Log a workout set by set; pass ``?session=<id>`` to resume one after a reconnect.
+
+    The server sends ``ready`` with the session id and the highest
+    sequence numbers it has buffered (``acked``) and written
+    (``persisted``). The client sends ``{"type": "set", "seq": n,
+    "exercise_id", "reps", "weight", "notes"}`` for each set, numbered
+    from 1, and gets an ``ack``; after a reconnect it resends every set
+    after ``persisted``. ``{"type": "complete", "notes"}`` writes what is
+    left and closes the session.
+    """
+    await websocket.accept()
+    try:
+        user_id = await anyio.to_thread.run_sync(_user_id, websocket)
+    except HTTPException as e:
+        await _close(websocket, CLOSE_UNAUTHORIZED, e.detail)
+        return
+    buffer = get_live_sessions()
+    try:
+        if session is None:
+            active = await anyio.to_thread.run_sync(buffer.start_session, user_id, wid)
+        else:
+            active = await anyio.to_thread.run_sync(buffer.resume_session, user_id, wid, session)
+    except StaleSession as e:
+        await _close(websocket, CLOSE_STALE, str(e))
+        return
+    if active is None:
+        await _close(websocket, CLOSE_NOT_FOUND, "Not Found")
+        return
+
+    try:
+        await websocket.send_json({"type": "ready", "session": active.id, "workout_log_id": active.workout_log_id,
+                                   "acked": active.acked, "persisted": active.persisted})
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                message = None
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind == "set":
+                try:
+                    seq, row = parse_set(message, active.exercise_ids)
+                    buffer.record(active, seq, row)
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "seq": message.get("seq"), "detail": str(e)})
+                    continue
+                await websocket.send_json({"type": "ack", "seq": seq, "persisted": active.persisted})
+            elif kind == "complete":
+                notes = message.get("notes")
+                completed = await anyio.to_thread.run_sync(
+                    buffer.complete, active, notes if isinstance(notes, str) else None)
+                await websocket.send_json({"type": "completed", "session": active.id,
+                                           "workout_log_id": active.workout_log_id, "sets": completed.sets_persisted})
+                await websocket.close()
+                return
+            else:
+                await websocket.send_json({"type": "error", "detail": "expected a JSON message of type set or complete"})
+    except WebSocketDisconnect:
+        pass
+    except StaleSession as e:
+        await _close(websocket, CLOSE_STALE, str(e))
+    finally:
+        await anyio.to_thread.run_sync(buffer.release, active)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ..db import get_read_session
+from ..auth import require_user
+from ..search import search
+
+
+router = APIRouter(prefix="/api/search", tags=["api:search"])
+
+
+@router.get("")
+def api_search(q: str = "", limit: int = 20, offset: int = 0, user=Depends(require_user),
+               session=Depends(get_read_session)):
+    """Search the caller's workouts, exercises and session notes.
+
+    Every word must match, as a prefix, in a title or in notes. Results
+    are ranked with titles weighted above notes; ``next_offset`` is set
+    while more results may follow.
+    """
+    if not q.strip():
+        raise HTTPException(400, "q required")
+    if limit < 1 or limit > 100:
+        raise HTTPException(400, "limit must be between 1 and 100")
+    if offset < 0:
+        raise HTTPException(400, "offset must be >= 0")
+    # One extra row tells whether there is a next page without counting every match
+    results = search(session, user.id, q, limit=limit + 1, offset=offset)
+    more = len(results) > limit
+    return {
+        "query": q,
+        "results": results[:limit],
+        "offset": offset,
+        "next_offset": offset + limit if more else None,
+    }
@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from ..db import get_read_session
+from ..auth import require_user
+from ..sync import changes
+
+
+router = APIRouter(prefix="/api/sync", tags=["api:sync"])
+
+
+@router.get("")
+def api_sync(since: Optional[str] = None, user=Depends(require_user), session=Depends(get_read_session)):
+    """The caller's workouts, exercises and logs changed since ``since``, or all of them without it.
+
+    ``since`` is the ``token`` of an earlier response. Apply ``deleted``
+    before the rows, as an id can be deleted and reused between two
+    syncs. ``reset`` means the token was not recognised and the response
+    holds everything, so the client's copy should be replaced.
+    """
+    if since and not since.isdigit():
+        raise HTTPException(400, "since must be a token from an earlier sync")
+    return changes(session, user.id, int(since) if since else None)
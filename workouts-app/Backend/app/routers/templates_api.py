@@ -0,0 +1,161 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete
+from sqlmodel import or_
+from ..db import get_session, get_read_session
+from ..models import WorkoutTemplate
+from ..auth import require_user
+from ..cache import invalidate_user_workouts
+from ..workout_templates import instantiate_template
+from ..read_models import TemplateRow, fetch, fetch_one, select_rows
+from ..unit_of_work import get_unit_of_work
+from .workouts_api import serialize_workout
+
+
+router = APIRouter(prefix="/api/templates", tags=["api:templates"])
+
+DIFFICULTIES = ("beginner", "intermediate", "advanced")
+
+
+def _serialize(template) -> dict:
+    return {
+        "id": template.id,
+        "slug": template.slug,
+        "name": template.name,
+        "description": template.description,
+        "category": template.category,
+        "difficulty": template.difficulty,
+        "duration": template.duration,
+        "equipment": template.equipment or [],
+        "tags": template.tags or [],
+        "exercises": template.exercises or [],
+        "builtin": template.owner_id is None,
+    }
+
+
+def _visible(t, user) -> bool:
+    # Built-ins are shared; custom templates are only visible to their owner
+    return t is not None and (t.owner_id is None or t.owner_id == user.id)
+
+
+def _get_visible(session, tid: int, user) -> TemplateRow:
+    t = fetch_one(session, TemplateRow, select_rows(TemplateRow).where(WorkoutTemplate.id == tid))
+    if not _visible(t, user):
+        raise HTTPException(404)
+    return t
+
+
+def _get_owned(session, tid: int, user) -> TemplateRow:
+    t = _get_visible(session, tid, user)
+    if t.owner_id is None:
+        raise HTTPException(403, "built-in templates cannot be modified")
+    return t
+
+
+def _clean_exercises(items) -> list:
+    if not isinstance(items, list) or not items:
+        raise HTTPException(400, "exercises must be a non-empty list")
+    cleaned = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise HTTPException(400, "each exercise must be an object")
+        name = (item.get("name") or "").strip()
+        sets = item.get("sets", 0)
+        reps = item.get("reps", 0)
+        if not name or not isinstance(sets, int) or not isinstance(reps, int) or sets <= 0 or reps <= 0:
+            raise HTTPException(400, "each exercise needs a name, sets and reps")
+        cleaned.append({
+            "name": name,
+            "sets": sets,
+            "reps": reps,
+            "rest_seconds": item.get("rest_seconds", 60),
+            "notes": item.get("notes") or "",
+        })
+    return cleaned
+
+
+def _changes(item: dict) -> dict:
+    """Validated column values for the fields present in ``item``"""
+    changes = {}
+    if "name" in item:
+        name = (item.get("name") or "").strip()
+        if not name:
+            raise HTTPException(400, "name required")
+        changes["name"] = name
+    if "difficulty" in item:
+        if item["difficulty"] not in DIFFICULTIES:
+            raise HTTPException(400, f"difficulty must be one of: {', '.join(DIFFICULTIES)}")
+        changes["difficulty"] = item["difficulty"]
+    if "exercises" in item:
+        changes["exercises"] = _clean_exercises(item["exercises"])
+    for field in ("description", "category"):
+        if field in item:
+            if not isinstance(item[field], str):
+                raise HTTPException(400, f"{field} must be a string")
+            changes[field] = item[field].strip()
+    if "duration" in item:
+        duration = item["duration"]
+        if not isinstance(duration, int) or isinstance(duration, bool) or duration < 0:
+            raise HTTPException(400, "duration must be a non-negative whole number of minutes")
+        changes["duration"] = duration
+    for field in ("equipment", "tags"):
+        if field in item:
+            values = item[field]
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                raise HTTPException(400, f"{field} must be a list of strings")
+            changes[field] = values
+    return changes
+
+
+@router.get("")
+def api_list_templates(user=Depends(require_user), session=Depends(get_read_session)):
+    """Built-in templates plus the caller's own"""
+    templates = fetch(
+        session, TemplateRow,
+        select_rows(TemplateRow)
+        .where(or_(WorkoutTemplate.owner_id.is_(None), WorkoutTemplate.owner_id == user.id))
+        .order_by(WorkoutTemplate.owner_id.is_(None).desc(), WorkoutTemplate.name)
+    )
+    return [_serialize(t) for t in templates]
+
+
+@router.get("/{tid}")
+def api_get_template(tid: int, user=Depends(require_user), session=Depends(get_read_session)):
+    return _serialize(_get_visible(session, tid, user))
+
+
+@router.post("")
+def api_create_template(item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    if "exercises" not in item:
+        raise HTTPException(400, "exercises required")
+    t = uow.insert_one(TemplateRow, owner_id=user.id, **_changes({**item, "name": item.get("name")}))
+    uow.commit()
+    return _serialize(t)
+
+
+@router.put("/{tid}")
+def api_update_template(tid: int, item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    t = _get_owned(uow.session, tid, user)
+    changes = _changes(item)
+    if changes:
+        t = uow.update(TemplateRow, [WorkoutTemplate.id == tid], changes)
+    uow.commit()
+    return _serialize(t)
+
+
+@router.delete("/{tid}")
+def api_delete_template(tid: int, user=Depends(require_user), session=Depends(get_session)):
+    _get_owned(session, tid, user)
+    session.execute(delete(WorkoutTemplate).where(WorkoutTemplate.id == tid))
+    session.commit()
+    return {"ok": True}
+
+
+@router.post("/{tid}/instantiate")
+def api_instantiate_template(tid: int, item: dict = None, user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    """Create a workout with all of the template's exercises in one transaction"""
+    t = _get_visible(uow.session, tid, user)
+    item = item or {}
+    workout, exercises = instantiate_template(uow, t, user.id, title=item.get("title"), notes=item.get("notes"))
+    uow.commit()
+    invalidate_user_workouts(user.id)
+    return serialize_workout(workout, exercises)
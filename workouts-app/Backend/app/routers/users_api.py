@@ -1,30 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlmodel import select
+from sqlalchemy import delete
+from sqlmodel import select, or_
 from ..db import get_session
 from ..models import User
 from ..auth import hash_password, verify_password, create_session_cookie, require_user
+from ..rollups import delete_user_rollups
+from ..read_models import UserRow
+from ..unit_of_work import get_unit_of_work
 
 
 router = APIRouter(prefix="/api/users", tags=["api:users"])
 
 
 @router.post("/register")
-def register(item: dict, response: Response, session=Depends(get_session)):
+def register(item: dict, response: Response, uow=Depends(get_unit_of_work)):
     email = (item.get("email") or "").strip().lower()
     password = item.get("password") or ""
     full_name = item.get("full_name")
     if not email or not password:
         raise HTTPException(400, "email and password required")
-    existing = session.exec(select(User).where(User.email == email)).first()
+    existing = uow.session.exec(select(User.id).where(User.email == email)).first()
     if existing:
         raise HTTPException(400, "email already registered")
-    user = User(email=email, password_hash=hash_password(password), full_name=full_name)
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    user = uow.insert_one(UserRow, email=email, password_hash=hash_password(password), full_name=full_name)
+    uow.commit()
     token = create_session_cookie(user.id)
     response.set_cookie("session", token, httponly=True, samesite="lax")
-    return {"id": user.id, "email": user.email, "full_name": user.full_name}
+    return user._asdict()
 
 
 @router.post("/login")
@@ -51,7 +53,7 @@ def me(user=Depends(require_user)):
 
 
 @router.put("/profile")
-def update_profile(item: dict, user=Depends(require_user), session=Depends(get_session)):
+def update_profile(item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
     """Update user profile information (name and email)"""
     full_name = item.get("full_name")
     email = (item.get("email") or "").strip().lower()
@@ -61,18 +63,15 @@ def update_profile(item: dict, user=Depends(require_user), session=Depends(get_s
     
     # Check if email is already taken by another user
     if email != user.email:
-        existing = session.exec(select(User).where(User.email == email)).first()
+        existing = uow.session.exec(select(User.id).where(User.email == email)).first()
         if existing:
             raise HTTPException(400, "email already taken")
     
     # Update user data
-    user.full_name = full_name
-    user.email = email
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    updated = uow.update(UserRow, [User.id == user.id], {"full_name": full_name, "email": email})
+    uow.commit()
     
-    return {"id": user.id, "email": user.email, "full_name": user.full_name}
+    return updated._asdict()
 
 
 @router.put("/password")
@@ -111,29 +110,24 @@ def update_preferences(item: dict, user=Depends(require_user), session=Depends(g
 def delete_account(user=Depends(require_user), session=Depends(get_session)):
     """Delete user account"""
     # Delete all user's workouts and related data first
-    from ..models import Workout, Exercise, WorkoutLog, ExerciseLog
+    from ..models import Workout, Exercise, WorkoutLog, ExerciseLog, WorkoutTemplate, ImportJob, LiveSession, Tombstone
     
-    # Get all workouts for this user
-    workouts = session.exec(select(Workout).where(Workout.user_id == user.id)).all()
+    # Set-based deletes, children first; the statement count is the same for any history size
+    workout_ids = select(Workout.id).where(Workout.owner_id == user.id)
+    log_ids = select(WorkoutLog.id).where(WorkoutLog.workout_id.in_(workout_ids))
+    exercise_ids = select(Exercise.id).where(Exercise.workout_id.in_(workout_ids))
+    session.execute(delete(ExerciseLog).where(
+        or_(ExerciseLog.workout_log_id.in_(log_ids), ExerciseLog.exercise_id.in_(exercise_ids))))
+    session.execute(delete(LiveSession).where(LiveSession.user_id == user.id))
+    session.execute(delete(WorkoutLog).where(WorkoutLog.workout_id.in_(workout_ids)))
+    session.execute(delete(Exercise).where(Exercise.workout_id.in_(workout_ids)))
+    session.execute(delete(Workout).where(Workout.owner_id == user.id))
     
-    for workout in workouts:
-        # Delete exercise logs
-        exercise_logs = session.exec(select(ExerciseLog).join(WorkoutLog).where(WorkoutLog.workout_id == workout.id)).all()
-        for log in exercise_logs:
-            session.delete(log)
-        
-        # Delete workout logs
-        workout_logs = session.exec(select(WorkoutLog).where(WorkoutLog.workout_id == workout.id)).all()
-        for log in workout_logs:
-            session.delete(log)
-        
-        # Delete exercises
-        exercises = session.exec(select(Exercise).where(Exercise.workout_id == workout.id)).all()
-        for exercise in exercises:
-            session.delete(exercise)
-        
-        # Delete workout
-        session.delete(workout)
+    # Delete activity rollups, custom templates, import history and sync tombstones
+    delete_user_rollups(session, user.id)
+    session.execute(delete(WorkoutTemplate).where(WorkoutTemplate.owner_id == user.id))
+    session.execute(delete(ImportJob).where(ImportJob.user_id == user.id))
+    session.execute(delete(Tombstone).where(Tombstone.owner_id == user.id))
     
     # Delete user
     session.delete(user)
@@ -1,12 +1,23 @@
 import os
+from collections import defaultdict
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import select
-from sqlalchemy.orm import selectinload
+from sqlmodel import select, or_
+from sqlalchemy import delete, func, insert, update
 from typing import List
-from ..db import get_session
-from ..models import Workout, Exercise, WorkoutLog, ExerciseLog
+from ..db import get_session, get_read_session
+from ..models import Workout, Exercise, WorkoutLog, ExerciseLog, LiveSession
 from ..auth import require_user
+from ..cache import cached_json_response, invalidate_user_workouts, user_workouts_namespace
+from ..rollups import refresh_rollups, workout_log_days
+from ..canonical import resolve_canonical, resolve_canonical_many
 from ..ai_workout_generator import AIWorkoutGenerator, AIWorkoutRequest
+from ..unit_of_work import get_unit_of_work
+from ..sync import bury, stamp, touch_logs
+from ..read_models import (
+    ExerciseLogRow, ExerciseRow, WorkoutLogRow, WorkoutRow, columns, fetch, fetch_one, group_by, owned_workout_exists,
+    select_rows,
+)
 
 
 router = APIRouter(prefix="/api/workouts", tags=["api:workouts"])
@@ -32,152 +43,141 @@ def api_test_ai():
 
 
 @router.get("")
-def api_list(user=Depends(require_user), session=Depends(get_session)):
-    # Get workouts with exercises included
-    statement = select(Workout).where(Workout.owner_id == user.id).options(selectinload(Workout.exercises)).order_by(Workout.created_at.desc())
-    ws = session.exec(statement).all()
-    
-    # Debug logging
-    print(f"API: Returning {len(ws)} workouts for user {user.id}")
-    for i, workout in enumerate(ws):
-        print(f"API: Workout {i}: {workout.title}, exercises: {len(workout.exercises) if workout.exercises else 0}")
-        if workout.exercises:
-            for j, exercise in enumerate(workout.exercises):
-                print(f"API:   Exercise {j}: {exercise.name}")
-    
-    # Convert to dict to ensure proper serialization
-    result = []
-    for workout in ws:
-        workout_dict = {
-            "id": workout.id,
-            "title": workout.title,
-            "notes": workout.notes,
-            "created_at": workout.created_at,
-            "owner_id": workout.owner_id,
-            "exercises": [
-                {
-                    "id": exercise.id,
-                    "name": exercise.name,
-                    "sets": exercise.sets,
-                    "reps": exercise.reps,
-                    "rest_seconds": exercise.rest_seconds,
-                    "notes": exercise.notes,
-                    "created_at": exercise.created_at,
-                    "workout_id": exercise.workout_id
-                }
-                for exercise in (workout.exercises or [])
-            ]
-        }
-        result.append(workout_dict)
-    
-    print(f"API: Serialized result has {len(result)} workouts")
-    for i, workout in enumerate(result):
-        print(f"API: Serialized workout {i}: {workout['title']}, exercises: {len(workout['exercises'])}")
-    
-    return result
+def api_list(user=Depends(require_user), session=Depends(get_read_session)):
+    return cached_json_response(user_workouts_namespace(user.id), "list", lambda: _list_workouts(user, session))
+
+
+def _list_workouts(user, session):
+    workouts = fetch(session, WorkoutRow, select_rows(WorkoutRow).where(Workout.owner_id == user.id).order_by(Workout.created_at.desc()))
+    exercises = group_by(fetch(
+        session, ExerciseRow,
+        select_rows(ExerciseRow).join(Workout, Exercise.workout_id == Workout.id)
+        .where(Workout.owner_id == user.id)
+        .order_by(Exercise.workout_id, Exercise.position, Exercise.id)
+    ), "workout_id")
+    return [serialize_workout(workout, exercises.get(workout.id, [])) for workout in workouts]
+
+
+def serialize_workout(workout: Workout, exercises) -> dict:
+    """Workout with its exercises as plain JSON-ready dicts"""
+    return {
+        "id": workout.id,
+        "title": workout.title,
+        "notes": workout.notes,
+        "created_at": workout.created_at,
+        "owner_id": workout.owner_id,
+        "exercises": [
+            {
+                "id": exercise.id,
+                "name": exercise.name,
+                "sets": exercise.sets,
+                "reps": exercise.reps,
+                "rest_seconds": exercise.rest_seconds,
+                "notes": exercise.notes,
+                "position": exercise.position,
+                "created_at": exercise.created_at,
+                "workout_id": exercise.workout_id,
+                "canonical_id": exercise.canonical_id
+            }
+            for exercise in exercises
+        ]
+    }
 
 
 @router.get("/history")
-def api_get_workout_history(user=Depends(require_user), session=Depends(get_session)):
+def api_get_workout_history(user=Depends(require_user), session=Depends(get_read_session)):
     """Get all workout logs for the user with full details"""
-    from ..models import WorkoutLog, ExerciseLog, Exercise
-    
-    # Get all workout logs for the user
-    workout_logs = session.exec(
-        select(WorkoutLog)
-        .join(Workout)
+    # Two queries however long the history is: sessions with their workout,
+    # then every exercise log of those sessions with its exercise
+    logs = session.exec(
+        select(*columns(WorkoutLogRow), Workout.title, Workout.notes)
+        .join(Workout, WorkoutLog.workout_id == Workout.id)
         .where(Workout.owner_id == user.id)
         .order_by(WorkoutLog.workout_date.desc())
     ).all()
-    
-    # Manually serialize the data to ensure relationships are included
-    result = []
-    for log in workout_logs:
-        print(f"Processing workout log {log.id} for workout {log.workout_id}")
-        
-        # Load the workout details
-        workout = session.get(Workout, log.workout_id)
-        print(f"  Workout: {workout.title if workout else 'None'}")
-        
-        # Load exercise logs with exercise details
-        exercise_logs = session.exec(
-            select(ExerciseLog)
-            .where(ExerciseLog.workout_log_id == log.id)
-        ).all()
-        print(f"  Found {len(exercise_logs)} exercise logs")
-        
-        # Load exercise details for each exercise log
-        exercise_logs_data = []
-        for ex_log in exercise_logs:
-            exercise = session.get(Exercise, ex_log.exercise_id)
-            exercise_logs_data.append({
-                "id": ex_log.id,
-                "sets_completed": ex_log.actual_sets,
-                "reps_completed": ex_log.actual_reps,
-                "weight_used": ex_log.weight,
-                "notes": ex_log.notes,
-                "exercise": {
-                    "id": exercise.id if exercise else 0,
-                    "name": exercise.name if exercise else "Unknown Exercise",
-                    "sets": exercise.sets if exercise else 0,
-                    "reps": exercise.reps if exercise else 0,
-                    "rest_seconds": exercise.rest_seconds if exercise else 0
-                }
-            })
-        
-        # Create the serialized log entry
-        log_data = {
+    exercise_logs = defaultdict(list)
+    for row in session.exec(
+        select(*columns(ExerciseLogRow), Exercise.id, Exercise.name, Exercise.sets, Exercise.reps, Exercise.rest_seconds)
+        .join(WorkoutLog, ExerciseLog.workout_log_id == WorkoutLog.id)
+        .join(Workout, WorkoutLog.workout_id == Workout.id)
+        .outerjoin(Exercise, ExerciseLog.exercise_id == Exercise.id)
+        .where(Workout.owner_id == user.id)
+        .order_by(ExerciseLog.id)
+    ):
+        ex_log = ExerciseLogRow._make(row[:len(ExerciseLogRow._fields)])
+        exercise_id, name, sets, reps, rest_seconds = row[len(ExerciseLogRow._fields):]
+        found = exercise_id is not None
+        exercise_logs[ex_log.workout_log_id].append({
+            "id": ex_log.id,
+            "sets_completed": ex_log.actual_sets,
+            "reps_completed": ex_log.actual_reps,
+            "weight_used": ex_log.weight,
+            "notes": ex_log.notes,
+            "exercise": {
+                "id": exercise_id if found else 0,
+                "name": name if found else "Unknown Exercise",
+                "sets": sets if found else 0,
+                "reps": reps if found else 0,
+                "rest_seconds": rest_seconds if found else 0
+            }
+        })
+
+    history = []
+    for row in logs:
+        log = WorkoutLogRow._make(row[:len(WorkoutLogRow._fields)])
+        title, notes = row[len(WorkoutLogRow._fields):]
+        history.append({
             "id": log.id,
             "workout_date": log.workout_date.isoformat() if log.workout_date else None,
             "notes": log.notes,
             "created_at": log.created_at.isoformat() if log.created_at else None,
             "workout": {
-                "id": workout.id if workout else 0,
-                "title": workout.title if workout else "Unknown Workout",
-                "notes": workout.notes if workout else ""
+                "id": log.workout_id,
+                "title": title,
+                "notes": notes
             },
-            "exercise_logs": exercise_logs_data
-        }
-        
-        result.append(log_data)
-    
-    return result
+            "exercise_logs": exercise_logs[log.id]
+        })
+    return history
 
 
 @router.get("/{wid}")
-def api_get(wid: int, user=Depends(require_user), session=Depends(get_session)):
-    # Get workout with exercises included
-    statement = select(Workout).where(Workout.id == wid, Workout.owner_id == user.id).options(selectinload(Workout.exercises))
-    w = session.exec(statement).first()
+def api_get(wid: int, user=Depends(require_user), session=Depends(get_read_session)):
+    return cached_json_response(user_workouts_namespace(user.id), str(wid), lambda: _get_workout(wid, user, session))
+
+
+def _get_workout(wid: int, user, session):
+    w = fetch_one(session, WorkoutRow, select_rows(WorkoutRow).where(Workout.id == wid, Workout.owner_id == user.id))
     if not w:
         raise HTTPException(404)
-    return w
+    return w._asdict()
 
 
 @router.post("")
-def api_create(item: dict, user=Depends(require_user), session=Depends(get_session)):
+def api_create(item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
     title = (item.get("title") or "").strip()
     notes = item.get("notes")
     if not title:
         raise HTTPException(400, "title required")
-    w = Workout(title=title, notes=notes, owner_id=user.id)
-    session.add(w)
-    session.commit()
-    session.refresh(w)
-    return w
+    w = uow.insert_one(WorkoutRow, title=title, notes=notes, owner_id=user.id, **stamp(uow.session, user.id))
+    uow.commit()
+    invalidate_user_workouts(user.id)
+    return w._asdict()
 
 
 @router.put("/{wid}")
-def api_update(wid: int, item: dict, user=Depends(require_user), session=Depends(get_session)):
-    w = session.get(Workout, wid)
-    if not w or w.owner_id != user.id:
+def api_update(wid: int, item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    owned = [Workout.id == wid, Workout.owner_id == user.id]
+    changes = {field: item[field] for field in ("title", "notes") if field in item}
+    if changes:
+        w = uow.update(WorkoutRow, owned, {**changes, **stamp(uow.session, user.id)})
+    else:
+        w = fetch_one(uow.session, WorkoutRow, select_rows(WorkoutRow).where(*owned))
+    if not w:
         raise HTTPException(404)
-    w.title = item.get("title", w.title)
-    w.notes = item.get("notes", w.notes)
-    session.add(w)
-    session.commit()
-    session.refresh(w)
-    return w
+    uow.commit()
+    invalidate_user_workouts(user.id)
+    return w._asdict()
 
 
 @router.delete("/{wid}")
@@ -187,31 +187,22 @@ def api_delete(wid: int, user=Depends(require_user), session=Depends(get_session
         raise HTTPException(404)
     
     try:
-        # First, get all exercises for this workout
-        from ..models import Exercise
-        exercises = session.exec(select(Exercise).where(Exercise.workout_id == wid)).all()
-        exercise_ids = [ex.id for ex in exercises]
-        
-        # Delete all exercise logs that reference these exercises
-        from ..models import ExerciseLog
-        if exercise_ids:
-            exercise_logs = session.exec(select(ExerciseLog).where(ExerciseLog.exercise_id.in_(exercise_ids))).all()
-            for ex_log in exercise_logs:
-                session.delete(ex_log)
-        
-        # Delete all workout logs for this workout
-        from ..models import WorkoutLog
-        workout_logs = session.exec(select(WorkoutLog).where(WorkoutLog.workout_id == wid)).all()
-        for log in workout_logs:
-            session.delete(log)
-        
-        # Delete all exercises for this workout
-        for exercise in exercises:
-            session.delete(exercise)
-        
-        # Finally delete the workout
-        session.delete(w)
+        # Days whose activity rollups change once this workout's logs are gone
+        affected_days = workout_log_days(session, [wid])
+
+        # Set-based deletes, so the statement count does not grow with the workout's history
+        exercise_ids = select(Exercise.id).where(Exercise.workout_id == wid)
+        log_ids = select(WorkoutLog.id).where(WorkoutLog.workout_id == wid)
+        session.execute(delete(ExerciseLog).where(
+            or_(ExerciseLog.exercise_id.in_(exercise_ids), ExerciseLog.workout_log_id.in_(log_ids))))
+        session.execute(delete(LiveSession).where(LiveSession.workout_id == wid))
+        session.execute(delete(WorkoutLog).where(WorkoutLog.workout_id == wid))
+        session.execute(delete(Exercise).where(Exercise.workout_id == wid))
+        session.execute(delete(Workout).where(Workout.id == wid))
+        bury(session, user.id, "workout", [wid])
+        refresh_rollups(session, user.id, affected_days)
         session.commit()
+        invalidate_user_workouts(user.id)
         return {"ok": True}
         
     except Exception as e:
@@ -222,20 +213,20 @@ def api_delete(wid: int, user=Depends(require_user), session=Depends(get_session
 
 # Exercise endpoints
 @router.get("/{wid}/exercises")
-def api_list_exercises(wid: int, user=Depends(require_user), session=Depends(get_session)):
-    w = session.get(Workout, wid)
-    if not w or w.owner_id != user.id:
+def api_list_exercises(wid: int, user=Depends(require_user), session=Depends(get_read_session)):
+    if not owned_workout_exists(session, wid, user.id):
         raise HTTPException(404)
-    exercises = session.exec(
-        select(Exercise).where(Exercise.workout_id == wid).order_by(Exercise.created_at.asc())
-    ).all()
-    return exercises
+    exercises = fetch(
+        session, ExerciseRow,
+        select_rows(ExerciseRow).where(Exercise.workout_id == wid).order_by(Exercise.position, Exercise.id)
+    )
+    return [exercise._asdict() for exercise in exercises]
 
 
 @router.post("/{wid}/exercises")
-def api_create_exercise(wid: int, item: dict, user=Depends(require_user), session=Depends(get_session)):
-    w = session.get(Workout, wid)
-    if not w or w.owner_id != user.id:
+def api_create_exercise(wid: int, item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    session = uow.session
+    if not owned_workout_exists(session, wid, user.id):
         raise HTTPException(404)
     
     name = (item.get("name") or "").strip()
@@ -247,36 +238,137 @@ def api_create_exercise(wid: int, item: dict, user=Depends(require_user), sessio
     if not name or sets <= 0 or reps <= 0:
         raise HTTPException(400, "name, sets, and reps required")
     
-    e = Exercise(
-        name=name, sets=sets, reps=reps, rest_seconds=rest_seconds, 
-        notes=notes, workout_id=wid
+    last_position = session.exec(select(func.max(Exercise.position)).where(Exercise.workout_id == wid)).one()
+    e = uow.insert_one(
+        ExerciseRow, name=name, sets=sets, reps=reps, rest_seconds=rest_seconds,
+        notes=notes, workout_id=wid, canonical_id=resolve_canonical(session, name),
+        position=0 if last_position is None else last_position + 1, **stamp(session, user.id)
+    )
+    uow.commit()
+    invalidate_user_workouts(user.id)
+    return e._asdict()
+
+
+@router.put("/{wid}/exercises")
+def api_replace_exercises(wid: int, items: List[dict], user=Depends(require_user), session=Depends(get_session)):
+    """Make the workout's exercises match ``items``, in order.
+
+    Items with an ``id`` update that exercise, items without one are
+    created, and ``{"id": ..., "delete": true}`` deletes one together with
+    its logs. Every current exercise must be listed: a list missing one
+    was built from a stale copy, e.g. before another tab added it, and is
+    refused with 409 instead of deleting it. Positions follow list order
+    unless an item gives an explicit ``position``; they must be distinct
+    integers. Applied with bulk statements and one commit.
+    """
+    w = fetch_one(session, WorkoutRow, select_rows(WorkoutRow).where(Workout.id == wid, Workout.owner_id == user.id))
+    if not w:
+        raise HTTPException(404)
+
+    current = {
+        row.id: row for row in session.exec(
+            select(Exercise.id, Exercise.name, Exercise.sets, Exercise.reps, Exercise.rest_seconds,
+                   Exercise.notes, Exercise.position, Exercise.canonical_id)
+            .where(Exercise.workout_id == wid)
+        ).all()
+    }
+    desired, seen, removed, positions = [], set(), [], set()
+    for item in items:
+        eid = item.get("id")
+        if eid is not None and (eid not in current or eid in seen):
+            raise HTTPException(400, f"unknown or duplicate exercise id {eid}")
+        seen.add(eid)
+        if item.get("delete"):
+            if eid is None:
+                raise HTTPException(400, "delete needs an exercise id")
+            removed.append(eid)
+            continue
+        position = item.get("position", len(desired))
+        if not isinstance(position, int) or isinstance(position, bool) or position < 0 or position in positions:
+            raise HTTPException(400, f"position must be a distinct non-negative integer, got {position!r}")
+        positions.add(position)
+        old = current.get(eid)
+        name = (item.get("name", old.name if old else "") or "").strip()
+        sets = item.get("sets", old.sets if old else 0)
+        reps = item.get("reps", old.reps if old else 0)
+        if not name or sets <= 0 or reps <= 0:
+            raise HTTPException(400, "name, sets, and reps required")
+        desired.append({
+            "id": eid,
+            "name": name,
+            "sets": sets,
+            "reps": reps,
+            "rest_seconds": item.get("rest_seconds", old.rest_seconds if old else 60),
+            "notes": item.get("notes", old.notes if old else None),
+            "position": position,
+        })
+    missing = sorted(set(current) - seen)
+    if missing:
+        raise HTTPException(409, f"exercises {missing} are not in the list; reload the workout and retry")
+
+    inserts, updates = [], []
+    now = datetime.utcnow()
+    for row in desired:
+        old = current.get(row["id"])
+        if old is None:
+            row.pop("id")
+            inserts.append({**row, "workout_id": wid, "created_at": now})
+        elif any(row[field] != getattr(old, field) for field in row if field != "id"):
+            updates.append({**row, "canonical_id": old.canonical_id})
+    relinked = inserts + [row for row in updates if row["name"] != current[row["id"]].name]
+    canonical_ids = resolve_canonical_many(session, [row["name"] for row in relinked])
+    for row in relinked:
+        row["canonical_id"] = canonical_ids[row["name"]]
+    if inserts or updates or removed:
+        changed = stamp(session, user.id)
+        inserts = [{**row, **changed} for row in inserts]
+        updates = [{**row, **changed} for row in updates]
+
+    if removed:
+        # Removing an exercise drops its history, so the affected rollup days change too
+        affected_dates = session.exec(
+            select(WorkoutLog.workout_date).join(ExerciseLog).where(ExerciseLog.exercise_id.in_(removed))
+        ).all()
+        touch_logs(session, user.id, WorkoutLog.id.in_(
+            select(ExerciseLog.workout_log_id).where(ExerciseLog.exercise_id.in_(removed))))
+        session.execute(delete(ExerciseLog).where(ExerciseLog.exercise_id.in_(removed)))
+        session.execute(delete(Exercise).where(Exercise.id.in_(removed)))
+        bury(session, user.id, "exercise", removed)
+        refresh_rollups(session, user.id, {d.date() for d in affected_dates})
+    if updates:
+        session.execute(update(Exercise), updates)
+    if inserts:
+        session.execute(insert(Exercise), inserts)
+
+    exercises = fetch(
+        session, ExerciseRow,
+        select_rows(ExerciseRow).where(Exercise.workout_id == wid).order_by(Exercise.position, Exercise.id)
     )
-    session.add(e)
+    result = serialize_workout(w, exercises)
     session.commit()
-    session.refresh(e)
-    return e
+    invalidate_user_workouts(user.id)
+    return result
 
 
 @router.put("/{wid}/exercises/{eid}")
-def api_update_exercise(wid: int, eid: int, item: dict, user=Depends(require_user), session=Depends(get_session)):
-    w = session.get(Workout, wid)
-    if not w or w.owner_id != user.id:
-        raise HTTPException(404)
-    
-    e = session.get(Exercise, eid)
-    if not e or e.workout_id != wid:
+def api_update_exercise(wid: int, eid: int, item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    e = fetch_one(
+        uow.session, ExerciseRow,
+        select_rows(ExerciseRow).join(Workout, Exercise.workout_id == Workout.id)
+        .where(Exercise.id == eid, Exercise.workout_id == wid, Workout.owner_id == user.id)
+    )
+    if not e:
         raise HTTPException(404)
-    
-    e.name = item.get("name", e.name)
-    e.sets = item.get("sets", e.sets)
-    e.reps = item.get("reps", e.reps)
-    e.rest_seconds = item.get("rest_seconds", e.rest_seconds)
-    e.notes = item.get("notes", e.notes)
-    
-    session.add(e)
-    session.commit()
-    session.refresh(e)
-    return e
+
+    changes = {field: item[field] for field in ("sets", "reps", "rest_seconds", "notes") if field in item}
+    if item.get("name", e.name) != e.name:
+        changes["name"] = item["name"]
+        changes["canonical_id"] = resolve_canonical(uow.session, item["name"])
+    if changes:
+        e = uow.update(ExerciseRow, [Exercise.id == eid], {**changes, **stamp(uow.session, user.id)})
+    uow.commit()
+    invalidate_user_workouts(user.id)
+    return e._asdict()
 
 
 @router.delete("/{wid}/exercises/{eid}")
@@ -289,102 +381,76 @@ def api_delete_exercise(wid: int, eid: int, user=Depends(require_user), session=
     if not e or e.workout_id != wid:
         raise HTTPException(404)
     
+    # Logs of this exercise no longer count towards distinct exercises
+    affected_dates = session.exec(
+        select(WorkoutLog.workout_date).join(ExerciseLog).where(ExerciseLog.exercise_id == eid)
+    ).all()
+    touch_logs(session, user.id, WorkoutLog.id.in_(
+        select(ExerciseLog.workout_log_id).where(ExerciseLog.exercise_id == eid)))
+    # Its logs go with it, as in the bulk replace; the ORM would try to null their exercise_id instead
+    session.execute(delete(ExerciseLog).where(ExerciseLog.exercise_id == eid))
     session.delete(e)
+    bury(session, user.id, "exercise", [eid])
+    refresh_rollups(session, user.id, {d.date() for d in affected_dates})
     session.commit()
+    invalidate_user_workouts(user.id)
     return {"ok": True}
 
 
 # Workout logging endpoints
 @router.post("/{wid}/log")
-def api_log_workout(wid: int, item: dict, user=Depends(require_user), session=Depends(get_session)):
-    w = session.get(Workout, wid)
-    if not w or w.owner_id != user.id:
+def api_log_workout(wid: int, item: dict, user=Depends(require_user), uow=Depends(get_unit_of_work)):
+    session = uow.session
+    if not owned_workout_exists(session, wid, user.id):
         raise HTTPException(404)
     
-    # Create workout log
-    workout_log = WorkoutLog(
-        workout_id=wid,
-        notes=item.get("notes")
-    )
-    session.add(workout_log)
-    session.commit()
-    session.refresh(workout_log)
+    # The session and its exercise logs are committed together
+    workout_log = uow.insert_one(WorkoutLogRow, workout_id=wid, notes=item.get("notes"), **stamp(session, user.id))
     
-    # Add exercise logs
+    # Add exercise logs with one multi-row insert
     exercise_logs = item.get("exercise_logs", [])
-    print(f"Received exercise logs: {exercise_logs}")  # Debug log
-    
-    for log_data in exercise_logs:
-        exercise_id = log_data.get("exercise_id")
-        actual_sets = log_data.get("actual_sets", 0)
-        actual_reps = log_data.get("actual_reps", 0)
-        weight = log_data.get("weight")
-        notes = log_data.get("notes")
-        
-        print(f"Processing exercise log: exercise_id={exercise_id}, sets={actual_sets}, reps={actual_reps}")  # Debug log
-        
-        # Create exercise log even if sets/reps are 0 (user might want to record notes or weight)
-        if exercise_id is not None:
-            exercise_log = ExerciseLog(
-                exercise_id=exercise_id,
-                workout_log_id=workout_log.id,
-                actual_sets=actual_sets,
-                actual_reps=actual_reps,
-                weight=weight,
-                notes=notes
-            )
-            session.add(exercise_log)
-            print(f"Added exercise log: {exercise_log}")  # Debug log
+    now = datetime.utcnow()
+    # Create exercise log even if sets/reps are 0 (user might want to record notes or weight)
+    rows = [
+        {
+            "exercise_id": log_data["exercise_id"],
+            "workout_log_id": workout_log.id,
+            "actual_sets": log_data.get("actual_sets", 0),
+            "actual_reps": log_data.get("actual_reps", 0),
+            "weight": log_data.get("weight"),
+            "notes": log_data.get("notes"),
+            "created_at": now,
+        }
+        for log_data in exercise_logs
+        if log_data.get("exercise_id") is not None
+    ]
+    if rows:
+        session.execute(insert(ExerciseLog), rows)
     
-    session.commit()
+    refresh_rollups(session, user.id, [workout_log.workout_date.date()])
+    uow.commit()
     return {"id": workout_log.id, "message": "Workout logged successfully"}
 
 
 @router.get("/{wid}/logs")
-def api_get_workout_logs(wid: int, user=Depends(require_user), session=Depends(get_session)):
-    w = session.get(Workout, wid)
-    if not w or w.owner_id != user.id:
+def api_get_workout_logs(wid: int, user=Depends(require_user), session=Depends(get_read_session)):
+    if not owned_workout_exists(session, wid, user.id):
         raise HTTPException(404)
-    
-    logs = session.exec(
-        select(WorkoutLog).where(WorkoutLog.workout_id == wid).order_by(WorkoutLog.workout_date.desc())
-    ).all()
-    
-    # Build response with explicit exercise logs
-    response_logs = []
-    for log in logs:
-        print(f"Looking for exercise logs for workout log ID: {log.id}")
-        exercise_logs = session.exec(
-            select(ExerciseLog).where(ExerciseLog.workout_log_id == log.id)
-        ).all()
-        print(f"Found {len(exercise_logs)} exercise logs for workout log {log.id}")
-        for ex_log in exercise_logs:
-            print(f"  - Exercise log: ID={ex_log.id}, exercise_id={ex_log.exercise_id}, sets={ex_log.actual_sets}, reps={ex_log.actual_reps}")
-        
-        # Create response object with explicit exercise_logs
-        log_dict = {
-            "id": log.id,
-            "workout_date": log.workout_date,
-            "notes": log.notes,
-            "created_at": log.created_at,
-            "workout_id": log.workout_id,
-            "exercise_logs": [
-                {
-                    "id": ex_log.id,
-                    "exercise_id": ex_log.exercise_id,
-                    "actual_sets": ex_log.actual_sets,
-                    "actual_reps": ex_log.actual_reps,
-                    "weight": ex_log.weight,
-                    "notes": ex_log.notes,
-                    "created_at": ex_log.created_at,
-                    "workout_log_id": ex_log.workout_log_id
-                }
-                for ex_log in exercise_logs
-            ]
-        }
-        response_logs.append(log_dict)
-    
-    return response_logs
+
+    logs = fetch(
+        session, WorkoutLogRow,
+        select_rows(WorkoutLogRow).where(WorkoutLog.workout_id == wid).order_by(WorkoutLog.workout_date.desc())
+    )
+    # All exercise logs of the workout in one query, grouped by session
+    exercise_logs = group_by(fetch(
+        session, ExerciseLogRow,
+        select_rows(ExerciseLogRow).join(WorkoutLog).where(WorkoutLog.workout_id == wid).order_by(ExerciseLog.id)
+    ), "workout_log_id")
+
+    return [
+        {**log._asdict(), "exercise_logs": [ex_log._asdict() for ex_log in exercise_logs.get(log.id, [])]}
+        for log in logs
+    ]
 
 
 # AI Workout Generation endpoint
@@ -405,44 +471,36 @@ def api_generate_ai_workout(request: AIWorkoutRequest, user=Depends(require_user
 
 
 @router.post("/ai-generate-and-save")
-def api_generate_and_save_ai_workout(request: AIWorkoutRequest, user=Depends(require_user), session=Depends(get_session)):
+def api_generate_and_save_ai_workout(request: AIWorkoutRequest, user=Depends(require_user), uow=Depends(get_unit_of_work)):
     """Generate a workout using AI and save it to the database"""
     try:
         generator = AIWorkoutGenerator()
         ai_workout = generator.generate_workout(request)
         
-        # Create the workout in the database
-        workout = Workout(
-            title=ai_workout.title,
-            notes=ai_workout.description,
-            owner_id=user.id
-        )
-        session.add(workout)
-        session.commit()
-        session.refresh(workout)
-        
-        # Add exercises to the workout
-        for exercise_data in ai_workout.exercises:
-            exercise = Exercise(
-                name=exercise_data.name,
-                sets=exercise_data.sets,
-                reps=exercise_data.reps,
-                rest_seconds=exercise_data.rest_seconds,
-                notes=exercise_data.notes,
-                workout_id=workout.id
-            )
-            session.add(exercise)
-        
-        session.commit()
-        
-        # Return the created workout with exercises
-        created_exercises = session.exec(
-            select(Exercise).where(Exercise.workout_id == workout.id).order_by(Exercise.created_at.asc())
-        ).all()
+        # The workout, then all of its exercises in one batch, in a single transaction
+        changed = stamp(uow.session, user.id)
+        workout = uow.insert_one(WorkoutRow, title=ai_workout.title, notes=ai_workout.description, owner_id=user.id,
+                                 **changed)
+        canonical_ids = resolve_canonical_many(uow.session, [exercise_data.name for exercise_data in ai_workout.exercises])
+        exercises = uow.insert(ExerciseRow, [
+            {
+                "name": exercise_data.name,
+                "sets": exercise_data.sets,
+                "reps": exercise_data.reps,
+                "rest_seconds": exercise_data.rest_seconds,
+                "notes": exercise_data.notes,
+                "workout_id": workout.id,
+                "canonical_id": canonical_ids[exercise_data.name],
+                "position": position,
+                **changed,
+            }
+            for position, exercise_data in enumerate(ai_workout.exercises)
+        ])
+        uow.commit()
+        invalidate_user_workouts(user.id)
         
-        workout.exercises = created_exercises
         return {
-            "workout": workout,
+            "workout": serialize_workout(workout, exercises),
             "ai_metadata": {
                 "estimated_duration": ai_workout.estimated_duration,
                 "difficulty": ai_workout.difficulty,
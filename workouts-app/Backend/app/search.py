@@ -0,0 +1,211 @@
+"""Full-text search over a user's workouts, exercises and logged sessions.
+
+SQLite keeps an FTS5 table, ``search_index``, in step with the source
+tables through triggers, so every write path (the API, templates,
+imports, set-based deletes) is covered without touching it. The rowid
+encodes the source row (``id * 4 + kind``), which makes trigger updates
+point lookups, and the owner is an indexed ``u<id>`` token so a query
+only walks the caller's postings.
+
+Postgres needs no copy: GIN indexes on ``to_tsvector`` expressions of
+each table are maintained by the database and used by the same
+expressions in the query.
+"""
+import re
+from typing import List
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+
+SCHEMA_VERSION = "1"
+# Lets init_db notice when the search schema changes, like any model change
+SQLModel.metadata.info.setdefault("extensions", {})["search"] = SCHEMA_VERSION
+
+KINDS = {1: "workout", 2: "exercise", 3: "log"}
+MAX_TERMS = 8
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        owner, title, body, workout_id UNINDEXED,
+        tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+    )""",
+    # Workouts: rowid id*4+1
+    """CREATE TRIGGER IF NOT EXISTS search_workout_insert AFTER INSERT ON workout BEGIN
+        INSERT INTO search_index (rowid, owner, title, body, workout_id)
+        VALUES (new.id * 4 + 1, 'u' || new.owner_id, new.title, coalesce(new.notes, ''), new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_workout_update AFTER UPDATE OF title, notes, owner_id ON workout BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+        INSERT INTO search_index (rowid, owner, title, body, workout_id)
+        VALUES (new.id * 4 + 1, 'u' || new.owner_id, new.title, coalesce(new.notes, ''), new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_workout_delete AFTER DELETE ON workout BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+    END""",
+    # Exercises: rowid id*4+2, owned through their workout
+    """CREATE TRIGGER IF NOT EXISTS search_exercise_insert AFTER INSERT ON exercise BEGIN
+        INSERT INTO search_index (rowid, owner, title, body, workout_id)
+        SELECT new.id * 4 + 2, 'u' || workout.owner_id, new.name, coalesce(new.notes, ''), new.workout_id
+        FROM workout WHERE workout.id = new.workout_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_exercise_update AFTER UPDATE OF name, notes, workout_id ON exercise BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+        INSERT INTO search_index (rowid, owner, title, body, workout_id)
+        SELECT new.id * 4 + 2, 'u' || workout.owner_id, new.name, coalesce(new.notes, ''), new.workout_id
+        FROM workout WHERE workout.id = new.workout_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_exercise_delete AFTER DELETE ON exercise BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+    END""",
+    # Logged sessions: rowid id*4+3, only those with notes
+    """CREATE TRIGGER IF NOT EXISTS search_log_insert AFTER INSERT ON workoutlog WHEN coalesce(new.notes, '') <> '' BEGIN
+        INSERT INTO search_index (rowid, owner, title, body, workout_id)
+        SELECT new.id * 4 + 3, 'u' || workout.owner_id, '', new.notes, new.workout_id
+        FROM workout WHERE workout.id = new.workout_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_log_update AFTER UPDATE OF notes, workout_id ON workoutlog BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+        INSERT INTO search_index (rowid, owner, title, body, workout_id)
+        SELECT new.id * 4 + 3, 'u' || workout.owner_id, '', new.notes, new.workout_id
+        FROM workout WHERE workout.id = new.workout_id AND coalesce(new.notes, '') <> '';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_log_delete AFTER DELETE ON workoutlog BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END""",
+]
+
+_SQLITE_FILL = [
+    """INSERT INTO search_index (rowid, owner, title, body, workout_id)
+       SELECT id * 4 + 1, 'u' || owner_id, title, coalesce(notes, ''), id FROM workout""",
+    """INSERT INTO search_index (rowid, owner, title, body, workout_id)
+       SELECT exercise.id * 4 + 2, 'u' || workout.owner_id, exercise.name, coalesce(exercise.notes, ''), exercise.workout_id
+       FROM exercise JOIN workout ON workout.id = exercise.workout_id""",
+    """INSERT INTO search_index (rowid, owner, title, body, workout_id)
+       SELECT workoutlog.id * 4 + 3, 'u' || workout.owner_id, '', workoutlog.notes, workoutlog.workout_id
+       FROM workoutlog JOIN workout ON workout.id = workoutlog.workout_id WHERE coalesce(workoutlog.notes, '') <> ''""",
+]
+
+# Weighted (title, body) columns per table; the query repeats each document expression for its index to apply
+_PG_COLUMNS = {"workout": ("title", "notes"), "exercise": ("name", "notes"), "workoutlog": (None, "notes")}
+
+
+def _pg_document(table: str, prefix: str = "") -> str:
+    title, body = _PG_COLUMNS[table]
+    document = f"setweight(to_tsvector('english'::regconfig, coalesce({prefix}{body}, '')), 'B')"
+    if title:
+        document = f"setweight(to_tsvector('english'::regconfig, coalesce({prefix}{title}, '')), 'A') || {document}"
+    return document
+
+
+def _is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(bind) -> None:
+    """Create the search index and its triggers if missing, filling it from existing rows"""
+    with bind.begin() as conn:
+        if _is_sqlite(bind):
+            created = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'search_index'")).first() is None
+            for statement in _SQLITE_SCHEMA:
+                conn.execute(text(statement))
+            if created:
+                for statement in _SQLITE_FILL:
+                    conn.execute(text(statement))
+        elif bind.dialect.name == "postgresql":
+            for table in _PG_COLUMNS:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING GIN (({_pg_document(table)}))"))
+
+
+def rebuild_search_index(bind) -> None:
+    """Refill the SQLite index from the source tables; Postgres indexes never drift"""
+    if not _is_sqlite(bind):
+        return
+    with bind.begin() as conn:
+        conn.execute(text("DELETE FROM search_index"))
+        for statement in _SQLITE_FILL:
+            conn.execute(text(statement))
+
+
+def query_terms(q: str) -> List[str]:
+    """Lowercased word tokens of ``q``, at most MAX_TERMS"""
+    return TOKEN_RE.findall(q.lower())[:MAX_TERMS]
+
+
+def _fts_match(owner_id: int, terms: List[str]) -> str:
+    # Every term as a prefix, in the title or the body; quoting keeps FTS5 syntax out of user input
+    words = " AND ".join(f'"{term}"*' for term in terms)
+    return f'owner : "u{owner_id}" AND {{title body}} : ({words})'
+
+
+def _sqlite_search(session, owner_id: int, terms: List[str], limit: int, offset: int):
+    return session.execute(text("""
+        SELECT search_index.rowid % 4 AS kind, search_index.rowid / 4 AS id, search_index.workout_id,
+               workout.title AS workout_title, search_index.title,
+               snippet(search_index, 2, '', '', '…', 16) AS snippet,
+               -bm25(search_index, 0.0, 10.0, 1.0) AS score
+        FROM search_index JOIN workout ON workout.id = search_index.workout_id
+        WHERE search_index MATCH :match
+        ORDER BY bm25(search_index, 0.0, 10.0, 1.0), search_index.rowid DESC
+        LIMIT :limit OFFSET :offset
+    """), {"match": _fts_match(owner_id, terms), "limit": limit, "offset": offset}).all()
+
+
+def _postgres_search(session, owner_id: int, terms: List[str], limit: int, offset: int):
+    # Qualified, as exercise and workoutlog are joined to workout, which has a notes column too
+    workout, exercise, log = (_pg_document(table, f"{table}.") for table in ("workout", "exercise", "workoutlog"))
+    return session.execute(text(f"""
+        WITH q AS (SELECT to_tsquery('english'::regconfig, :tsquery) AS query),
+        hits AS (
+            SELECT 1 AS kind, workout.id, workout.id AS workout_id, workout.title AS workout_title,
+                   workout.title, coalesce(workout.notes, '') AS body, ts_rank({workout}, q.query) AS score
+            FROM workout, q WHERE workout.owner_id = :owner AND {workout} @@ q.query
+            UNION ALL
+            SELECT 2, exercise.id, exercise.workout_id, workout.title, exercise.name, coalesce(exercise.notes, ''),
+                   ts_rank({exercise}, q.query)
+            FROM exercise JOIN workout ON workout.id = exercise.workout_id, q
+            WHERE workout.owner_id = :owner AND {exercise} @@ q.query
+            UNION ALL
+            SELECT 3, workoutlog.id, workoutlog.workout_id, workout.title, '', coalesce(workoutlog.notes, ''),
+                   ts_rank({log}, q.query)
+            FROM workoutlog JOIN workout ON workout.id = workoutlog.workout_id, q
+            WHERE workout.owner_id = :owner AND {log} @@ q.query
+        ),
+        page AS (SELECT * FROM hits ORDER BY score DESC, kind, id DESC LIMIT :limit OFFSET :offset)
+        SELECT page.kind, page.id, page.workout_id, page.workout_title, page.title,
+               ts_headline('english'::regconfig, page.body, q.query, 'StartSel="",StopSel="",MaxWords=24,MinWords=8') AS snippet,
+               page.score
+        FROM page, q ORDER BY page.score DESC, page.kind, page.id DESC
+    """), {"tsquery": " & ".join(f"{term}:*" for term in terms), "owner": owner_id,
+           "limit": limit, "offset": offset}).all()
+
+
+def search(session, owner_id: int, q: str, limit: int = 20, offset: int = 0) -> List[dict]:
+    """The owner's workouts, exercises and session notes matching every word of ``q``, best first"""
+    terms = query_terms(q)
+    if not terms:
+        return []
+    run = _sqlite_search if _is_sqlite(session.get_bind()) else _postgres_search
+    return [
+        {
+            "kind": KINDS[row.kind],
+            "id": row.id,
+            "workout_id": row.workout_id,
+            "workout_title": row.workout_title,
+            "title": row.title or None,
+            "snippet": row.snippet or None,
+            "score": round(row.score, 4),
+        }
+        for row in run(session, owner_id, terms, limit, offset)
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+    from .db import engine, init_db
+    parser = argparse.ArgumentParser(description="Maintain the full-text search index")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    init_db()
+    rebuild_search_index(engine)
+    print("Search index rebuilt")
@@ -0,0 +1,87 @@
+"""Production process model: gunicorn master with uvicorn workers.
+
+    python -m app.server          # or: gunicorn -c gunicorn.conf.py app.main:app
+
+Runs gunicorn with ``gunicorn.conf.py`` when it is installed, and falls
+back to ``uvicorn --workers`` otherwise. Either way the worker count
+comes from ``worker_count()``.
+"""
+import math
+import os
+import sys
+from typing import Optional
+
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> Optional[float]:
+    """CPUs allowed by the container's CFS quota (cgroup v2, then v1), or None if unlimited"""
+    cpu_max = _read(os.path.join(root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us")) or _read(os.path.join(root, "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us")) or _read(os.path.join(root, "cpu.cfs_period_us"))
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> float:
+    """The cgroup quota when set, else the CPUs this process may run on"""
+    try:
+        host = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        host = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    return min(limit, host) if limit else host
+
+
+def worker_count(root: str = CGROUP_ROOT) -> int:
+    """WEB_CONCURRENCY if set, else WORKERS_PER_CORE per available CPU, rounded up and capped at MAX_WORKERS.
+
+    Workers are async, so one per core keeps every core busy; a pod with a
+    500m limit gets a single worker rather than one per host CPU.
+    """
+    explicit = os.getenv("WEB_CONCURRENCY")
+    if explicit:
+        return max(1, int(explicit))
+    per_core = float(os.getenv("WORKERS_PER_CORE", "1"))
+    maximum = int(os.getenv("MAX_WORKERS", "8"))
+    return max(1, min(maximum, math.ceil(available_cpus(root) * per_core)))
+
+
+def dispose_engines(close: bool = True) -> None:
+    """Drop pooled connections; with ``close=False`` a forked child just forgets the parent's"""
+    from . import db
+    for engine in (db.engine, db.read_engine):
+        if engine is not None:
+            engine.dispose(close=close)
+
+
+def main() -> None:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        import uvicorn
+        uvicorn.run("app.main:app", host="0.0.0.0", port=int(os.getenv("PORT", "8000")), workers=worker_count(),
+                    timeout_graceful_shutdown=int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30")))
+        return
+    config = os.path.join(backend_dir, "gunicorn.conf.py")
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", config, "app.main:app"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Change tracking for incremental sync, served by ``GET /api/sync``.
+
+A write to a user's workouts, exercises or logs takes the user's next
+change number (``User.sync_seq``), once per transaction, and stamps it
+on the rows it creates or changes as ``change_seq``, with ``updated_at``.
+Deletes leave a Tombstone carrying it. Taking the number locks the user
+row until commit, so one user's changes commit in number order: a sync
+token, the number read before the rows, never skips a change that was
+still in flight when it was read.
+
+A logged session counts as changed when its exercise logs change. A
+deleted workout takes its exercises and logs with it, and only the
+workout gets a tombstone.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event, insert, update
+from sqlmodel import Session, select
+from .models import Exercise, ExerciseLog, Tombstone, User, Workout, WorkoutLog
+from .read_models import ExerciseLogRow, ExerciseRow, WorkoutLogRow, WorkoutRow, columns, group_by
+
+KINDS = ("workout", "exercise")
+
+
+def change_seq(session, owner_id: int) -> int:
+    """The transaction's change number for ``owner_id``, taken on first use"""
+    taken = session.info.setdefault("sync_seq", {})
+    if owner_id not in taken:
+        taken[owner_id] = session.execute(
+            update(User).where(User.id == owner_id).values(sync_seq=User.sync_seq + 1).returning(User.sync_seq),
+            execution_options={"synchronize_session": False},
+        ).scalar_one()
+    return taken[owner_id]
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_change_seq(session):
+    session.info.pop("sync_seq", None)
+
+
+def stamp(session, owner_id: int) -> dict:
+    """Values marking a row as changed by this transaction"""
+    return {"change_seq": change_seq(session, owner_id), "updated_at": datetime.utcnow()}
+
+
+def touch_logs(session, owner_id: int, *where) -> None:
+    """Mark the logged sessions matching ``where`` as changed, e.g. after their exercise logs change"""
+    session.execute(update(WorkoutLog).where(*where).values(**stamp(session, owner_id)),
+                    execution_options={"synchronize_session": False})
+
+
+def bury(session, owner_id: int, kind: str, row_ids: Iterable[int]) -> None:
+    """Record deleted rows for clients that still hold them"""
+    values = stamp(session, owner_id)
+    rows = [{"owner_id": owner_id, "kind": kind, "row_id": row_id, "change_seq": values["change_seq"],
+             "deleted_at": values["updated_at"]} for row_id in row_ids]
+    if rows:
+        session.execute(insert(Tombstone), rows)
+
+
+def current_seq(session, owner_id: int) -> int:
+    return session.exec(select(User.sync_seq).where(User.id == owner_id)).one() or 0
+
+
+def _changed(session, row_type, model, owner_id: int, since: Optional[int]) -> list:
+    """``row_type`` rows of the owner's ``model`` changed after ``since`` (all when None), with updated_at"""
+    width = len(row_type._fields)
+    statement = select(*columns(row_type), model.updated_at)
+    if model is not Workout:
+        statement = statement.join(Workout, model.workout_id == Workout.id)
+    statement = statement.where(Workout.owner_id == owner_id)
+    if since is not None:
+        statement = statement.where(model.change_seq > since)
+    return [{**row_type._make(row[:width])._asdict(), "updated_at": row[width]}
+            for row in session.exec(statement.order_by(model.id))]
+
+
+def changes(session, owner_id: int, since: Optional[int]) -> Dict[str, object]:
+    """The owner's rows changed after ``since``, every row when it is None, and the token to send next time"""
+    token = current_seq(session, owner_id)
+    reset = since is not None and since > token  # e.g. a token from before a database restore
+    if reset:
+        since = None
+    result = {"token": str(token), "reset": reset, "workouts": [], "exercises": [], "logs": [],
+              "deleted": {f"{kind}s": [] for kind in KINDS}}
+    if since == token:
+        return result
+
+    result["workouts"] = _changed(session, WorkoutRow, Workout, owner_id, since)
+    result["exercises"] = _changed(session, ExerciseRow, Exercise, owner_id, since)
+    logs = _changed(session, WorkoutLogRow, WorkoutLog, owner_id, since)
+    if logs:
+        exercise_logs = select(*columns(ExerciseLogRow)).order_by(ExerciseLog.id)
+        if since is None:
+            exercise_logs = exercise_logs.join(WorkoutLog).join(Workout, WorkoutLog.workout_id == Workout.id).where(
+                Workout.owner_id == owner_id)
+        else:
+            exercise_logs = exercise_logs.where(ExerciseLog.workout_log_id.in_([log["id"] for log in logs]))
+        by_log = group_by((ExerciseLogRow._make(row) for row in session.exec(exercise_logs)), "workout_log_id")
+        for log in logs:
+            log["exercise_logs"] = [ex_log._asdict() for ex_log in by_log.get(log["id"], [])]
+    result["logs"] = logs
+
+    if since is not None:
+        for kind, row_id in session.exec(
+            select(Tombstone.kind, Tombstone.row_id)
+            .where(Tombstone.owner_id == owner_id, Tombstone.change_seq > since).order_by(Tombstone.id)
+        ):
+            result["deleted"][f"{kind}s"].append(row_id)
+    return result
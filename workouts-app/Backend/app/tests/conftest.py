@@ -0,0 +1,94 @@
+import contextlib
+import contextvars
+import os
+import re
+import tempfile
+import uuid
+import pytest
+
+# Keep test data out of the developer's app.db unless a database is configured
+if not (os.getenv("DB_HOST") or os.getenv("DATABASE_URL")):
+    os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="workouts-tests-"))
+
+from sqlalchemy import event
+from sqlmodel import Session
+from app.db import engine, init_db
+from app.models import User
+from app.auth import create_session_cookie
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+
+
+@pytest.fixture
+def user():
+    """A fresh user inserted directly, bypassing password hashing"""
+    with Session(engine) as session:
+        u = User(email=f"test-{uuid.uuid4().hex[:12]}@example.com", password_hash="unused", full_name="Test User")
+        session.add(u)
+        session.commit()
+        session.refresh(u)
+        return u
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"x-session": create_session_cookie(user.id)}
+
+
+# Statements issued by the request being captured; contextvars follow the
+# request into FastAPI's threadpool but not into unrelated background threads
+_captured = contextvars.ContextVar("captured_statements", default=None)
+HOT_TABLES = ("workout", "workoutlog", "exerciselog")
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = _captured.get()
+    if statements is not None:
+        statements.append((statement, parameters, executemany))
+
+
+class QueryLog:
+    """Captures SQL per request and checks its plans for full scans of hot tables"""
+
+    @contextlib.contextmanager
+    def capture(self):
+        statements = []
+        token = _captured.set(statements)
+        try:
+            yield statements
+        finally:
+            _captured.reset(token)
+
+    def full_scans(self, statements) -> list:
+        """(table, statement) for each captured statement whose plan scans a hot table in full"""
+        found = []
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            sqlite = engine.dialect.name == "sqlite"
+            if not sqlite:
+                # Tiny test tables make sequential scans cheapest; only flag those with no usable index
+                cursor.execute("SET enable_seqscan = off")
+            for statement, parameters, executemany in statements:
+                if executemany or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+                    continue
+                cursor.execute(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + statement, parameters)
+                for row in cursor.fetchall():
+                    detail = row[-1] if sqlite else row[0]
+                    match = re.match(r"\s*SCAN (\w+)", detail) if sqlite else re.search(r"Seq Scan on (\w+)", detail)
+                    if match and match.group(1) in HOT_TABLES:
+                        found.append((match.group(1), statement))
+        finally:
+            raw.rollback()
+            raw.close()
+        return found
+
+
+@pytest.fixture(scope="session")
+def query_log():
+    return QueryLog()
@@ -0,0 +1,164 @@
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlmodel import Session, SQLModel
+from app.analytics import compute_progression, estimate_1rm, load_exercise_logs
+from app.main import app
+from app.models import Exercise, ExerciseLog, User, Workout, WorkoutLog
+
+client = TestClient(app)
+
+
+def _columns(codes, names, days, sets, reps, weights):
+    return {
+        "code": np.array(codes, dtype=np.int64),
+        "name": np.array(names, dtype=object),
+        "time": np.array(days, dtype=np.float64) * 86400,
+        "sets": np.array(sets, dtype=np.float64),
+        "reps": np.array(reps, dtype=np.float64),
+        "weight": np.array(weights, dtype=np.float64),
+    }
+
+
+def _best_of(runs, call) -> float:
+    """Fastest of ``runs`` timed calls, in seconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _history_db(tmp_path):
+    history = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    SQLModel.metadata.create_all(history)
+    return history
+
+
+def _add_history(session, exercises, logs, sessions=1):
+    """One user's workout with ``exercises`` ({id: name}) and ``logs`` spread over ``sessions`` logged sessions"""
+    started = datetime(2024, 1, 1)
+    session.execute(insert(User), [{"id": 1, "email": "history@example.com", "password_hash": "unused"}])
+    session.execute(insert(Workout), [{"id": 1, "title": "History", "owner_id": 1, "created_at": started}])
+    session.execute(insert(Exercise), [{"id": eid, "workout_id": 1, "name": name, "sets": 3, "reps": 5,
+                                         "created_at": started} for eid, name in exercises.items()])
+    session.execute(insert(WorkoutLog), [{"id": log_id, "workout_id": 1, "user_id": 1, "created_at": started,
+                                          "workout_date": started + timedelta(days=log_id)}
+                                         for log_id in range(1, sessions + 1)])
+    session.execute(insert(ExerciseLog), logs)
+    session.commit()
+
+
+class TestProgressionMath:
+    def test_estimate_1rm(self):
+        """Test Epley/Brzycki estimates and invalid inputs"""
+        weight = np.array([100.0, 100.0, np.nan, 100.0])
+        reps = np.array([10.0, 1.0, 5.0, 0.0])
+        epley = estimate_1rm(weight, reps, "epley")
+        brzycki = estimate_1rm(weight, reps, "brzycki")
+        assert epley[0] == pytest.approx(133.33, abs=0.01)
+        assert brzycki[0] == pytest.approx(133.33, abs=0.01)
+        assert epley[1] == 100.0
+        assert np.isnan(epley[2]) and np.isnan(epley[3])
+
+    def test_compute_progression(self):
+        """Test per-exercise volume, records and trend"""
+        columns = _columns(
+            codes=[0, 0, 0, 1, 1],
+            names=["Squat", "Plank"],
+            days=[14, 0, 7, 0, 7],
+            sets=[3, 3, 3, 3, 3],
+            reps=[5, 5, 5, 1, 1],
+            weights=[110, 100, 105, np.nan, np.nan],
+        )
+        result = {item["exercise"]: item for item in compute_progression(columns, window=2)}
+
+        squat = result["Squat"]
+        assert squat["entries"] == 3
+        assert squat["total_volume"] == 3 * 5 * (100 + 105 + 110)
+        assert squat["records"]["best_weight"] == 110
+        assert squat["records"]["best_e1rm_date"].startswith("1970-01-15")
+        assert squat["trend"]["e1rm_change_per_week"] == pytest.approx(5 * (1 + 5 / 30), abs=0.01)
+        assert squat["trend"]["rolling_e1rm"] == pytest.approx(107.5 * (1 + 5 / 30), abs=0.01)
+        assert [p["date"][:10] for p in squat["history"]] == ["1970-01-01", "1970-01-08", "1970-01-15"]
+
+        plank = result["Plank"]
+        assert plank["total_volume"] == 0
+        assert plank["records"]["best_e1rm_date"] is None
+        assert plank["trend"]["e1rm_change_per_week"] is None
+
+    @pytest.mark.slow
+    def test_compute_50k_logs(self):
+        """Test the vectorized path stays within the 50 ms target for a large history"""
+        rng = np.random.default_rng(0)
+        n = 50_000
+        columns = _columns(
+            codes=rng.integers(0, 40, n),
+            names=[f"Exercise {i}" for i in range(40)],
+            days=rng.integers(0, 2000, n),
+            sets=rng.integers(1, 6, n),
+            reps=rng.integers(1, 15, n),
+            weights=rng.uniform(20, 150, n),
+        )
+        assert len(compute_progression(columns)) == 40
+        assert _best_of(3, lambda: compute_progression(columns)) < 0.05
+
+    @pytest.mark.slow
+    def test_load_and_compute_50k_logs(self, tmp_path):
+        """Test loading and computing a 50k-log history end to end"""
+        rng = np.random.default_rng(0)
+        history = _history_db(tmp_path)
+        with Session(history) as session:
+            _add_history(session, exercises={eid: f"Exercise {eid}" for eid in range(1, 41)}, logs=[{
+                "workout_log_id": int(log_id), "exercise_id": int(eid), "actual_sets": int(sets),
+                "actual_reps": int(reps), "weight": float(weight),
+            } for log_id, eid, sets, reps, weight in zip(
+                rng.integers(1, 2001, 50_000), rng.integers(1, 41, 50_000), rng.integers(1, 6, 50_000),
+                rng.integers(1, 15, 50_000), rng.uniform(20, 150, 50_000))], sessions=2000)
+            assert len(compute_progression(load_exercise_logs(session, 1))) == 40
+            # The 50 ms target is for Postgres; SQLite here spends most of the time
+            # building 50k Python row tuples, so this only guards against regressions
+            assert _best_of(3, lambda: compute_progression(load_exercise_logs(session, 1))) < 0.5
+
+    def test_sparse_exercise_ids(self, tmp_path):
+        """Test logs are grouped by exercise without sizing anything by the largest exercise id"""
+        # A throwaway database, so the huge id does not move the shared one's id sequence
+        with Session(_history_db(tmp_path)) as session:
+            _add_history(session, exercises={1: "Squat", 10_000_000: "squats"}, logs=[
+                {"workout_log_id": 1, "exercise_id": 1, "actual_sets": 3, "actual_reps": 5, "weight": 100},
+                {"workout_log_id": 1, "exercise_id": 10_000_000, "actual_sets": 3, "actual_reps": 5, "weight": 110},
+            ])
+            columns = load_exercise_logs(session, 1)
+        assert columns["code"].tolist() == [0, 0] and columns["weight"].tolist() == [100, 110]
+        (squat,) = compute_progression(columns)
+        assert (squat["entries"], squat["records"]["best_weight"]) == (2, 110)
+
+
+class TestProgressionEndpoint:
+    def test_requires_auth(self):
+        """Test the endpoint requires authentication"""
+        assert client.get("/api/analytics/progression").status_code == 401
+
+    def test_progression_from_logs(self, auth_headers):
+        """Test logged sessions show up in progression data"""
+        workout = client.post("/api/workouts", json={"title": "Strength"}, headers=auth_headers).json()
+        exercise = client.post(f"/api/workouts/{workout['id']}/exercises",
+                               json={"name": "Deadlift", "sets": 3, "reps": 5}, headers=auth_headers).json()
+        for weight in (120, 130):
+            client.post(f"/api/workouts/{workout['id']}/log", headers=auth_headers, json={
+                "exercise_logs": [{"exercise_id": exercise["id"], "actual_sets": 3, "actual_reps": 5, "weight": weight}],
+            })
+
+        response = client.get("/api/analytics/progression", headers=auth_headers)
+        assert response.status_code == 200
+        deadlift = response.json()["exercises"][0]
+        assert deadlift["exercise"] == "Deadlift"
+        assert deadlift["entries"] == 2
+        assert deadlift["records"]["best_weight"] == 130
+        assert deadlift["total_volume"] == 15 * (120 + 130)
+
+        assert client.get("/api/analytics/progression?formula=nope", headers=auth_headers).status_code == 400
@@ -0,0 +1,61 @@
+import asyncio
+import contextlib
+import io
+import os
+import subprocess
+import sys
+from app.db import engine
+from app.ai_workout_generator import AIWorkoutGenerator
+from app.main import app, on_startup
+from benchmarks.compare import compare
+from benchmarks.run import count_queries, percentile, run_suite, stub_groq, uncovered_routes
+from benchmarks.scenarios import ENDPOINTS
+from benchmarks.seed import SeedConfig, seed
+from benchmarks.startup import by_package, parse_importtime
+
+
+class TestBenchmarks:
+    def test_every_route_has_a_scenario(self):
+        """Test new API routes get a benchmark scenario"""
+        assert uncovered_routes(app, ENDPOINTS) == []
+
+    def test_suite_smoke_run(self):
+        """Test one request per endpoint succeeds against seeded data, with queries counted"""
+        on_startup()  # built-in templates and the catalog
+        users = seed(engine, SeedConfig(users=1, workouts_per_user=2, exercises_per_workout=3, logs_per_user=4))
+        with stub_groq(), count_queries([engine]), contextlib.redirect_stdout(io.StringIO()):
+            results = asyncio.run(run_suite(app, users, ENDPOINTS, requests=1, concurrency=1))
+        assert set(results) == {endpoint.name for endpoint in ENDPOINTS}
+        api_errors = {name: r["statuses"] for name, r in results.items() if " /api/" in name and r["errors"]}
+        assert api_errors == {}
+        assert results["GET /api/workouts/{wid}"]["queries_per_request"] >= 1
+
+    def test_stub_groq_provides_a_key(self, monkeypatch):
+        """Test the stub works without GROQ_API_KEY in the environment and leaves it unset afterwards"""
+        monkeypatch.delenv("GROQ_API_KEY", raising=False)
+        with stub_groq():
+            assert AIWorkoutGenerator().client.__class__.__name__ == "StubGroq"
+        assert "GROQ_API_KEY" not in os.environ
+
+    def test_percentiles_and_compare(self):
+        """Test nearest-rank percentiles and regression detection between runs"""
+        values = [float(v) for v in range(1, 101)]
+        assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50.0, 95.0, 99.0)
+        result = lambda p95, queries: {"endpoints": {"GET /x": {
+            "latency_ms": {"p95": p95}, "rps": 100.0, "queries_per_request": queries, "errors": 0}}}
+        assert compare(result(10.0, 2), result(11.0, 2), threshold=0.2)[1] == []
+        regressions = compare(result(10.0, 2), result(15.0, 3), threshold=0.2)[1]
+        assert len(regressions) == 2
+
+    def test_heavy_imports_are_lazy(self):
+        """Test importing the app does not load Groq, numpy, Jinja2 or passlib, and the profile parses"""
+        heavy = ("groq", "numpy", "jinja2", "passlib.context")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c",
+             f"import sys, app.main; print([m for m in {heavy!r} if m in sys.modules])"],
+            capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.strip() == "[]"
+        rows = parse_importtime(result.stderr)
+        assert any(row[0] == "app.main" for row in rows)
+        assert "sqlalchemy" in by_package(rows)
@@ -0,0 +1,191 @@
+import queue
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app import cache
+from app.cache import LRUCache, RedisCache, ResponseCache
+from app.main import app
+
+client = TestClient(app)
+
+
+class FakeRedisServer:
+    """Just enough of Redis (hashes, counters, DEL, pub/sub) shared by several clients"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.counters = {}
+        self.subscribers = []
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def hset(self, *args):
+        self.calls.append(("hset", args))
+
+    def expire(self, *args):
+        self.calls.append(("expire", args))
+
+    def incr(self, *args):
+        self.calls.append(("incr", args))
+
+    def delete(self, *args):
+        self.calls.append(("delete", args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+class FakePubSub:
+    def __init__(self, server, ignore_subscribe_messages=True):
+        self.server = server
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.server.subscribers.append((channel, self.messages))
+
+    def listen(self):
+        while True:
+            yield self.messages.get()
+
+
+class FakeRedis:
+    def __init__(self, server):
+        self.server = server
+
+    def hget(self, name, key):
+        return self.server.hashes.get(name, {}).get(key)
+
+    def hset(self, name, key, value):
+        self.server.hashes.setdefault(name, {})[key] = value
+
+    def expire(self, name, ttl):
+        return True
+
+    def get(self, name):
+        value = self.server.counters.get(name)
+        return None if value is None else str(value).encode()
+
+    def incr(self, name):
+        self.server.counters[name] = self.server.counters.get(name, 0) + 1
+        return self.server.counters[name]
+
+    def delete(self, *names):
+        for name in names:
+            self.server.hashes.pop(name, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def publish(self, channel, message):
+        for subscribed, messages in self.server.subscribers:
+            if subscribed == channel:
+                messages.put({"type": "message", "data": message.encode()})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self.server, ignore_subscribe_messages)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def memory_cache():
+    response_cache = ResponseCache(LRUCache(max_entries=100), ttl=60)
+    cache.set_cache(response_cache)
+    yield response_cache
+    cache.set_cache(None)
+
+
+class TestLRUCache:
+    def test_eviction_and_invalidation(self):
+        """Test LRU evicts the oldest entry and invalidates whole namespaces"""
+        lru = LRUCache(max_entries=2)
+        lru.set("a", "1", b"x", 60)
+        lru.set("a", "2", b"y", 60)
+        lru.get("a", "1")
+        lru.set("b", "1", b"z", 60)
+        assert lru.get("a", "2") is None
+        assert lru.get("a", "1") == b"x"
+        lru.invalidate("a")
+        assert lru.get("a", "1") is None
+        assert lru.get("b", "1") == b"z"
+
+    def test_stale_fill_after_invalidation(self):
+        """Test a value set under the generation read before an invalidation is not served"""
+        response_cache = ResponseCache(LRUCache())
+        generation = response_cache.generation("a")
+        response_cache.invalidate("a")
+        response_cache.set("a", "1", b"old", generation)
+        assert response_cache.get("a", "1") is None
+        response_cache.set("a", "1", b"new")
+        assert response_cache.get("a", "1") == b"new"
+
+    def test_expiry(self):
+        """Test entries expire after their ttl"""
+        lru = LRUCache()
+        lru.set("a", "1", b"x", -1)
+        assert lru.get("a", "1") is None
+
+
+class TestSharedCache:
+    def test_invalidation_reaches_other_replicas(self):
+        """Test an invalidation on one replica clears the other's local copy"""
+        server = FakeRedisServer()
+        replica_a = ResponseCache(LRUCache(), RedisCache(FakeRedis(server)))
+        replica_b = ResponseCache(LRUCache(), RedisCache(FakeRedis(server)))
+        assert _wait_for(lambda: len(server.subscribers) == 2)
+
+        replica_a.set("workouts:1", "list", b"[1]")
+        assert replica_b.get("workouts:1", "list") == b"[1]"  # filled from the shared layer
+
+        replica_a.invalidate("workouts:1")
+        assert _wait_for(lambda: replica_b._generations.get("workouts:1") == 1)
+        assert replica_b.get("workouts:1", "list") is None
+
+    def test_fill_racing_an_invalidation_is_dropped(self):
+        """Test a value built before an invalidation on another replica is never served"""
+        server = FakeRedisServer()
+        replica_a = ResponseCache(LRUCache(), RedisCache(FakeRedis(server)))
+        replica_b = ResponseCache(LRUCache(), RedisCache(FakeRedis(server)))
+        assert _wait_for(lambda: len(server.subscribers) == 2)
+
+        generation = replica_a.generation("workouts:1")
+        replica_b.invalidate("workouts:1")  # a write commits while replica A is still building
+        assert _wait_for(lambda: replica_a._generations.get("workouts:1") == 1)
+        replica_a.set("workouts:1", "list", b"[stale]", generation)
+        assert replica_a.get("workouts:1", "list") is None
+        assert replica_b.get("workouts:1", "list") is None
+        replica_a.set("workouts:1", "list", b"[fresh]", replica_a.generation("workouts:1"))
+        assert replica_b.get("workouts:1", "list") == b"[fresh]"
+
+
+class TestCachedRoutes:
+    def test_list_is_cached_and_invalidated(self, memory_cache, user, auth_headers):
+        """Test GET /api/workouts is served from cache until a mutation"""
+        namespace = cache.user_workouts_namespace(user.id)
+        assert client.get("/api/workouts", headers=auth_headers).json() == []
+        assert memory_cache.get(namespace, "list") == b"[]"
+
+        created = client.post("/api/workouts", json={"title": "Push day"}, headers=auth_headers).json()
+        assert memory_cache.get(namespace, "list") is None
+
+        listed = client.get("/api/workouts", headers=auth_headers).json()
+        assert [w["title"] for w in listed] == ["Push day"]
+
+        detail = client.get(f"/api/workouts/{created['id']}", headers=auth_headers).json()
+        assert detail["title"] == "Push day"
+        assert memory_cache.get(namespace, str(created["id"])) is not None
+
+        client.post(f"/api/workouts/{created['id']}/exercises",
+                    json={"name": "Bench press", "sets": 3, "reps": 8}, headers=auth_headers)
+        assert memory_cache.get(namespace, str(created["id"])) is None
@@ -0,0 +1,125 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, inspect, update
+from sqlmodel import Session, select
+from app.db import engine, migrate_schema
+from app.main import app
+from app.models import CanonicalExercise, Exercise, Workout
+from app.canonical import backfill_canonical, normalize_exercise_name, resolve_canonical_many
+
+client = TestClient(app)
+
+
+def _listed_canonical_id(headers, wid):
+    workouts = client.get("/api/workouts", headers=headers).json()
+    return next(w for w in workouts if w["id"] == wid)["exercises"][0]["canonical_id"]
+
+
+class TestNormalization:
+    def test_variants_share_a_key(self):
+        """Test plurals, case, punctuation, shorthand and synonyms collapse"""
+        for name in ["Squats", " squat ", "Back Squat", "BB back squats"]:
+            assert normalize_exercise_name(name) == "squat"
+        for name in ["Push-ups", "pushups", "Press Ups"]:
+            assert normalize_exercise_name(name) == "push up"
+        assert normalize_exercise_name("DB Bench Presses") == "dumbbell bench press"
+        assert normalize_exercise_name("Front Squat") == "front squat"
+
+
+class TestCanonicalLinks:
+    def test_exercises_link_across_workouts(self, user, auth_headers):
+        """Test name variants in different workouts resolve to one canonical exercise"""
+        ids = []
+        for title, name in [("Legs A", "Squats"), ("Legs B", "Back Squat")]:
+            workout = client.post("/api/workouts", json={"title": title}, headers=auth_headers).json()
+            exercise = client.post(f"/api/workouts/{workout['id']}/exercises",
+                                   json={"name": name, "sets": 3, "reps": 5}, headers=auth_headers).json()
+            client.post(f"/api/workouts/{workout['id']}/log", headers=auth_headers, json={
+                "exercise_logs": [{"exercise_id": exercise["id"], "actual_sets": 3, "actual_reps": 5, "weight": 100}]})
+            ids.append(exercise["canonical_id"])
+        assert ids[0] is not None and ids[0] == ids[1]
+
+        stats = client.get("/api/analytics/exercises", headers=auth_headers).json()["exercises"]
+        assert len(stats) == 1
+        assert stats[0]["exercise"] == "Squat"
+        assert stats[0]["entries"] == 2
+        assert stats[0]["total_volume"] == 3000
+
+        progression = client.get("/api/analytics/progression?exercise=squats", headers=auth_headers).json()
+        assert [item["entries"] for item in progression["exercises"]] == [2]
+
+    def test_rename_relinks(self, auth_headers):
+        """Test renaming an exercise moves it to the new canonical exercise"""
+        workout = client.post("/api/workouts", json={"title": "Push"}, headers=auth_headers).json()
+        exercise = client.post(f"/api/workouts/{workout['id']}/exercises",
+                               json={"name": "Bench", "sets": 3, "reps": 5}, headers=auth_headers).json()
+        renamed = client.put(f"/api/workouts/{workout['id']}/exercises/{exercise['id']}",
+                             json={"name": "Overhead Press"}, headers=auth_headers).json()
+        assert renamed["canonical_id"] != exercise["canonical_id"]
+
+    def test_resolve_many_in_a_fixed_number_of_statements(self, query_log):
+        """Test a batch of names is resolved with one lookup and one insert, reusing existing rows"""
+        with Session(engine) as session:
+            existing = resolve_canonical_many(session, ["Goblet Squat"])["Goblet Squat"]
+            names = ["Goblet Squats", "Zercher Squat", "zercher squats", "Jefferson Curl", "  "]
+            with query_log.capture() as statements:
+                ids = resolve_canonical_many(session, names)
+            assert len(statements) == 2
+            assert ids["Goblet Squats"] == existing and ids["  "] is None
+            assert ids["Zercher Squat"] == ids["zercher squats"] != ids["Jefferson Curl"]
+            cache = {}
+            with query_log.capture() as statements:
+                assert resolve_canonical_many(session, names, cache) == ids
+                assert resolve_canonical_many(session, ["Zercher Squat"], cache) == {"Zercher Squat": ids["Zercher Squat"]}
+            assert len(statements) == 1
+            session.commit()
+
+    def test_backfill(self, user):
+        """Test the backfill links legacy rows and is idempotent"""
+        with Session(engine) as session:
+            workout = Workout(title="Legacy", owner_id=user.id)
+            session.add(workout)
+            session.flush()
+            session.add_all([Exercise(name=name, sets=3, reps=10, workout_id=workout.id)
+                             for name in ["Lunges", "lunge", "Plank"]])
+            session.commit()
+
+            assert backfill_canonical(session, batch_size=2) >= 3
+            assert backfill_canonical(session) == 0
+            rows = session.exec(
+                select(Exercise.name, CanonicalExercise.key)
+                .join(CanonicalExercise, Exercise.canonical_id == CanonicalExercise.id)
+                .where(Exercise.workout_id == workout.id)
+            ).all()
+            assert sorted(rows) == [("Lunges", "lunge"), ("Plank", "plank"), ("lunge", "lunge")]
+
+
+    def test_backfill_reaches_sync_and_cache(self, auth_headers):
+        """Test backfilled links are stamped for sync and replace cached workout responses"""
+        wid = client.post("/api/workouts", json={"title": "Relinked"}, headers=auth_headers).json()["id"]
+        eid = client.post(f"/api/workouts/{wid}/exercises", json={"name": "Hack Squats", "sets": 3, "reps": 8},
+                          headers=auth_headers).json()["id"]
+        with Session(engine) as session:
+            session.execute(update(Exercise).where(Exercise.id == eid).values(canonical_id=None))
+            session.commit()
+        token = client.get("/api/sync", headers=auth_headers).json()["token"]
+        assert _listed_canonical_id(auth_headers, wid) is None
+
+        with Session(engine) as session:
+            backfill_canonical(session)
+        delta = client.get("/api/sync", params={"since": token}, headers=auth_headers).json()
+        assert [(e["id"], e["canonical_id"] is not None) for e in delta["exercises"]] == [(eid, True)]
+        assert _listed_canonical_id(auth_headers, wid) is not None
+
+class TestMigrateSchema:
+    def test_adds_missing_column_and_index(self, tmp_path):
+        """Test columns added to a model reach tables created before them"""
+        legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        old = MetaData()
+        Table("exercise", old, Column("id", Integer, primary_key=True))
+        old.create_all(legacy)
+
+        migrate_schema(legacy)
+
+        inspector = inspect(legacy)
+        assert "canonical_id" in {c["name"] for c in inspector.get_columns("exercise")}
+        assert "ix_exercise_canonical_id" in {i["name"] for i in inspector.get_indexes("exercise")}
@@ -0,0 +1,87 @@
+import json
+import time
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.db import engine
+from app.main import app
+from app.catalog import CatalogIndex, seed_catalog, tokenize
+from app.models import CatalogExercise
+
+client = TestClient(app)
+
+
+def _entry(id, name, category="Strength", difficulty="beginner", muscle_groups=(), equipment=("None",)):
+    return {"id": id, "name": name, "category": category, "difficulty": difficulty,
+            "muscle_groups": list(muscle_groups), "equipment": list(equipment),
+            "instructions": [], "tips": [], "variations": [], "common_mistakes": []}
+
+
+INDEX = CatalogIndex([
+    _entry("bench-press", "Bench Press", "Upper Body", "intermediate", ["Chest", "Triceps"], ["Barbell", "Bench"]),
+    _entry("squats", "Squats", "Lower Body", "beginner", ["Quadriceps", "Glutes"]),
+    _entry("front-squat", "Front Squat", "Lower Body", "advanced", ["Quadriceps"], ["Barbell"]),
+    _entry("shoulder-press", "Shoulder Press", "Upper Body", "beginner", ["Shoulders"], ["Dumbbells"]),
+])
+
+
+def _ids(results):
+    return [r["id"] for r in results]
+
+
+class TestCatalogIndex:
+    def test_tokenize(self):
+        """Test tokens are lowercased and plurals stripped"""
+        assert tokenize("Push-ups & Squats") == ["push", "ups", "squat"]
+
+    def test_prefix_and_exact(self):
+        """Test prefix matches and name matches outrank other fields"""
+        assert _ids(INDEX.search("squ")) == ["front-squat", "squats"]
+        assert _ids(INDEX.search("press")) == ["bench-press", "shoulder-press"]
+        assert _ids(INDEX.search("bench pr")) == ["bench-press"]
+
+    def test_typo_tolerance(self):
+        """Test a single typo or transposition still matches"""
+        assert _ids(INDEX.search("sqaut")) == ["front-squat", "squats"]
+        assert _ids(INDEX.search("shouldr")) == ["shoulder-press"]
+        assert INDEX.search("xyzzy") == []
+
+    def test_facet_filters(self):
+        """Test muscle group, equipment and difficulty filters combine with search"""
+        assert _ids(INDEX.search("", muscle_group="quadriceps")) == ["front-squat", "squats"]
+        assert _ids(INDEX.search("squat", equipment="Barbell")) == ["front-squat"]
+        assert _ids(INDEX.search("", difficulty="beginner", category="upper body")) == ["shoulder-press"]
+        assert INDEX.facet_values()["equipment"] == ["Barbell", "Bench", "Dumbbells", "None"]
+
+    def test_lookup_is_fast(self):
+        """Test lookups stay sub-millisecond on a large catalog"""
+        index = CatalogIndex(
+            _entry(f"ex-{i}", f"Movement{i} Variant{i % 97}", muscle_groups=[f"group{i % 13}"]) for i in range(5000)
+        )
+        start = time.perf_counter()
+        for _ in range(100):
+            index.search("variant4", muscle_group="group3", limit=20)
+        assert (time.perf_counter() - start) / 100 < 0.001 * 5  # generous for slow CI machines
+
+
+class TestCatalogAPI:
+    def test_search_endpoint(self):
+        """Test the seeded catalog is searchable over HTTP"""
+        response = client.get("/api/exercises/search", params={"q": "push-up", "facets": "true"})
+        assert response.status_code == 200
+        data = response.json()
+        assert "push-ups" in _ids(data["results"])
+        assert "Chest" in data["facets"]["muscle_group"]
+        assert "public" in response.headers["cache-control"]
+
+    def test_invalid_limit(self):
+        """Test out of range limits are rejected"""
+        assert client.get("/api/exercises/search?limit=0").status_code == 400
+
+    def test_seed_skips_entries_inserted_concurrently(self, tmp_path):
+        """Test seeding ignores entries another worker inserted after this one looked, instead of failing"""
+        path = tmp_path / "catalog.json"
+        path.write_text(json.dumps([_entry("seed-race-curl", "Seed Race Curl")] * 2))
+        with Session(engine) as session:
+            assert seed_catalog(session, str(path)) == 1
+            assert seed_catalog(session, str(path)) == 0
+            assert session.get(CatalogExercise, "seed-race-curl").name == "Seed Race Curl"
@@ -0,0 +1,78 @@
+import random
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app import chaos
+from app.auth import USE_BCRYPT
+from app.main import app
+from benchmarks.run import stub_groq
+
+client = TestClient(app, raise_server_exceptions=False)
+ADMIN = {"x-admin-token": "changeme"}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(chaos, "_sleep", calls.append)
+    yield calls
+    chaos.clear()
+
+
+class TestChaos:
+    def test_db_latency_scoped_to_route(self, sleeps, auth_headers):
+        """Test DB latency applies to every statement of the targeted route only"""
+        response = client.post("/admin/fail/db_latency/on", headers=ADMIN,
+                               params={"latency_ms": 40, "route": "/api/workouts/{wid}"})
+        assert response.status_code == 200
+        assert response.json()["faults"]["db"]["latency_ms"] == 40
+        assert client.get("/api/workouts", headers=auth_headers).status_code == 200
+        assert sleeps == []
+        client.get("/api/workouts/123456", headers=auth_headers)
+        assert sleeps and set(sleeps) == {0.04}
+
+    def test_percent_of_requests(self, sleeps, auth_headers):
+        """Test percent selects whole requests: none at 0, every statement of a request at 100"""
+        chaos.set_fault("db", chaos.Fault(latency_ms=10, percent=0))
+        client.get("/api/workouts", headers=auth_headers)
+        assert sleeps == []
+        chaos.set_fault("db", chaos.Fault(latency_ms=10, percent=100))
+        client.get("/api/workouts", headers=auth_headers)
+        assert sleeps and set(sleeps) == {0.01}
+
+    def test_db_errors(self, sleeps, auth_headers):
+        """Test injected DB failures surface as server errors on the targeted route"""
+        chaos.set_fault("db", chaos.Fault(error_rate=1.0, route="/api/workouts/history"))
+        assert client.get("/api/workouts/history", headers=auth_headers).status_code == 500
+        assert client.get("/api/workouts", headers=auth_headers).status_code == 200
+
+    @pytest.mark.skipif(not USE_BCRYPT, reason="bcrypt not installed")
+    def test_bcrypt_latency(self, sleeps):
+        """Test bcrypt faults delay and fail password hashing"""
+        chaos.set_fault("bcrypt", chaos.Fault(latency_ms=300, error_rate=1.0))
+        email = f"chaos-{uuid.uuid4().hex[:8]}@example.com"
+        response = client.post("/api/users/register", json={"email": email, "password": "secret123"})
+        assert response.status_code == 500
+        assert sleeps == [0.3]
+
+    def test_groq_latency(self, sleeps, auth_headers):
+        """Test Groq latency is injected around the completion call"""
+        client.post("/admin/fail/groq_latency/on", headers=ADMIN, params={"latency_ms": 2000})
+        with stub_groq():
+            response = client.post("/api/workouts/ai-generate", json={}, headers=auth_headers)
+        assert response.status_code == 200
+        assert sleeps == [2.0]
+        client.post("/admin/fail/groq_latency/off", headers=ADMIN)
+        assert chaos.active_faults() == {}
+
+    def test_validation_and_distributions(self, sleeps):
+        """Test bad fault parameters are rejected and distributions sample around the mean"""
+        bad = client.post("/admin/fail/db_latency/on", headers=ADMIN, params={"distribution": "zipf"})
+        assert bad.status_code == 400
+        assert client.post("/admin/fail/db_latency/on", headers=ADMIN, params={"error_rate": 2}).status_code == 400
+        assert client.post("/admin/fail/db_latency/on", params={"latency_ms": 5}).status_code == 403
+        rng = random.Random(1)
+        samples = [chaos.Fault(100, distribution="exponential").delay_seconds(rng) for _ in range(2000)]
+        assert 0.09 < sum(samples) / len(samples) < 0.11
+        uniform = [chaos.Fault(100, 50, "uniform").delay_seconds(rng) for _ in range(200)]
+        assert all(0.05 <= s <= 0.15 for s in uniform)
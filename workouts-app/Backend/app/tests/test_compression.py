@@ -0,0 +1,121 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.compression import CompressionMiddleware, PrecompressedStaticFiles, negotiate_encoding, precompress_directory
+
+
+def _make_app(**kwargs):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **kwargs)
+
+    @app.get("/big")
+    def big():
+        return {"items": [{"title": "Upper body", "sets": 3, "reps": 10}] * 500}
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        def gen():
+            for i in range(50):
+                yield f'{{"row": {i}, "padding": "{"x" * 100}"}}\n'
+        return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+    @app.get("/binary")
+    def binary():
+        return PlainTextResponse("x" * 5000, media_type="application/octet-stream")
+
+    return app
+
+
+class TestCompression:
+    def test_negotiate_encoding(self):
+        """Test Accept-Encoding negotiation honours q-values"""
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding("gzip;q=0, identity") is None
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("br, gzip", allow_brotli=False) == "gzip"
+
+    def test_large_json_is_gzipped(self):
+        """Test large JSON bodies are compressed above the size threshold"""
+        client = TestClient(_make_app(minimum_size=500))
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()["items"]) == 500
+
+    def test_small_json_not_compressed(self):
+        """Test bodies below the threshold are sent uncompressed"""
+        client = TestClient(_make_app(minimum_size=500))
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    def test_uncompressed_variants_vary(self):
+        """Test responses left uncompressed still tell shared caches they depend on Accept-Encoding"""
+        client = TestClient(_make_app(minimum_size=500))
+        for path, accept in (("/small", "gzip"), ("/big", "identity")):
+            response = client.get(path, headers={"Accept-Encoding": accept})
+            assert "content-encoding" not in response.headers
+            assert "Accept-Encoding" in response.headers["vary"]
+        assert "vary" not in client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers
+
+    def test_streaming_response_compressed(self):
+        """Test streaming responses are compressed chunk by chunk"""
+        client = TestClient(_make_app(minimum_size=500))
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert len(response.text.splitlines()) == 50
+
+    def test_non_compressible_type_untouched(self):
+        """Test binary content types pass through"""
+        client = TestClient(_make_app(minimum_size=500))
+        response = client.get("/binary", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_brotli_when_available(self):
+        """Test brotli is preferred when the client and server support it"""
+        pytest.importorskip("brotli")
+        client = TestClient(_make_app(minimum_size=500))
+        response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+
+
+class TestPrecompressedStatic:
+    def test_serves_precompressed_asset(self, tmp_path):
+        """Test .gz siblings are served with immutable cache headers"""
+        (tmp_path / "app-B3xk9LqZ.js").write_text("console.log('hello');\n" * 100)
+        assert precompress_directory(str(tmp_path)) >= 1
+
+        app = FastAPI()
+        app.mount("/static", PrecompressedStaticFiles(directory=str(tmp_path)), name="static")
+        client = TestClient(app)
+
+        response = client.get("/static/app-B3xk9LqZ.js", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "javascript" in response.headers["content-type"]
+        assert "immutable" in response.headers["cache-control"]
+        assert response.text.startswith("console.log")
+
+        plain = client.get("/static/app-B3xk9LqZ.js", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert "immutable" in plain.headers["cache-control"]
+        assert plain.content == (tmp_path / "app-B3xk9LqZ.js").read_bytes()
+
+    def test_unfingerprinted_files_revalidate(self, tmp_path):
+        """Test files without a content hash in their name get a short max-age"""
+        for name in ("favicon.svg", "my-component2.js", "main.0a1b2c3d.css", "index-Ab3_-x9Z.js.map"):
+            (tmp_path / name).write_text("x" * 10)
+        app = FastAPI()
+        app.mount("/static", PrecompressedStaticFiles(directory=str(tmp_path)), name="static")
+        client = TestClient(app)
+        cache = {name: client.get(f"/static/{name}").headers["cache-control"]
+                 for name in ("favicon.svg", "my-component2.js", "main.0a1b2c3d.css", "index-Ab3_-x9Z.js.map")}
+        assert "immutable" not in cache["favicon.svg"] and "max-age=300" in cache["my-component2.js"]
+        assert "immutable" in cache["main.0a1b2c3d.css"] and "immutable" in cache["index-Ab3_-x9Z.js.map"]
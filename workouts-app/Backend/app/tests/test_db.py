@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, create_engine
+from app import cache, db
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """An empty schema-only database standing in for a lagging read replica"""
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(replica_engine)
+    monkeypatch.setattr(db, "read_engine", replica_engine)
+    yield replica_engine
+    replica_engine.dispose()
+
+
+class TestReadReplicaRouting:
+    def test_read_url_from_env(self, monkeypatch):
+        """Test DB_READ_HOST builds a replica URL reusing primary credentials"""
+        for key, value in {"DB_READ_HOST": "replica", "DB_PORT": "5432", "DB_NAME": "app",
+                           "DB_USER": "u", "DB_PASSWORD": "p"}.items():
+            monkeypatch.setenv(key, value)
+        assert db.get_read_database_url() == "postgresql://u:p@replica:5432/app"
+
+    def test_read_url_absent(self, monkeypatch):
+        """Test no replica is configured by default"""
+        monkeypatch.delenv("DB_READ_HOST", raising=False)
+        monkeypatch.delenv("READ_DATABASE_URL", raising=False)
+        assert db.get_read_database_url() is None
+
+    def test_reads_stay_on_primary_after_write(self, replica, user, auth_headers):
+        """Test read-your-writes pins reads to the primary after a mutation"""
+        response = client.post("/api/workouts", json={"title": "Leg day"}, headers=auth_headers)
+        assert response.status_code == 200
+        assert db.reads_pinned_to_primary(user.id)
+
+        listed = client.get("/api/workouts", headers=auth_headers).json()
+        assert [w["title"] for w in listed] == ["Leg day"]
+
+        # Once the window has passed, reads go to the (empty) replica
+        db._recent_writes.pop(user.id, None)
+        cache.invalidate_user_workouts(user.id)
+        assert client.get("/api/workouts", headers=auth_headers).json() == []
+
+
+class TestSchemaVersion:
+    def test_init_db_skips_up_to_date_schema(self, monkeypatch):
+        """Test startup only reads the stored fingerprint when the models have not changed"""
+        db.init_db()
+        monkeypatch.setattr(db, "migrate_schema", lambda bind: pytest.fail("schema should not be reflected"))
+        db.init_db()
+
+    def test_init_db_migrates_changed_models(self, monkeypatch):
+        """Test a changed fingerprint runs the migration and records the new version"""
+        calls = []
+        monkeypatch.setattr(db, "schema_fingerprint", lambda metadata: "changed-models")
+        monkeypatch.setattr(db, "migrate_schema", calls.append)
+        db.init_db()
+        assert calls == [db.engine]
+        assert db._applied_fingerprint(db.engine) == "changed-models"
+        monkeypatch.undo()
+        db.init_db()
+        assert db._applied_fingerprint(db.engine) == db.schema_fingerprint(SQLModel.metadata)
@@ -0,0 +1,89 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.db import engine
+from app.main import app
+
+client = TestClient(app)
+
+
+def _workout_with(auth_headers, names):
+    workout = client.post("/api/workouts", json={"title": "Bulk"}, headers=auth_headers).json()
+    ids = [client.post(f"/api/workouts/{workout['id']}/exercises", json={"name": n, "sets": 3, "reps": 10},
+                       headers=auth_headers).json()["id"] for n in names]
+    return workout["id"], ids
+
+
+class TestBulkExercises:
+    def test_positions_assigned_on_create(self, auth_headers):
+        """Test exercises added one by one are appended in order"""
+        wid, ids = _workout_with(auth_headers, ["Squat", "Bench", "Row"])
+        listed = client.get(f"/api/workouts/{wid}/exercises", headers=auth_headers).json()
+        assert [(e["id"], e["position"]) for e in listed] == [(ids[0], 0), (ids[1], 1), (ids[2], 2)]
+
+    def test_replace_creates_updates_deletes_and_reorders(self, auth_headers):
+        """Test one PUT applies the full diff in a single commit"""
+        wid, (squat, bench, row) = _workout_with(auth_headers, ["Squat", "Bench", "Row"])
+        client.post(f"/api/workouts/{wid}/log", headers=auth_headers, json={
+            "exercise_logs": [{"exercise_id": row, "actual_sets": 3, "actual_reps": 10, "weight": 40}]})
+
+        commits = []
+        listener = lambda conn: commits.append(1)
+        event.listen(engine, "commit", listener)
+        try:
+            response = client.put(f"/api/workouts/{wid}/exercises", headers=auth_headers, json=[
+                {"id": bench, "sets": 5, "reps": 5},
+                {"name": "Pull-ups", "sets": 3, "reps": 8},
+                {"id": row, "delete": True},
+                {"id": squat},
+            ])
+        finally:
+            event.remove(engine, "commit", listener)
+        assert response.status_code == 200
+        assert len(commits) == 1
+
+        exercises = response.json()["exercises"]
+        assert [e["name"] for e in exercises] == ["Bench", "Pull-ups", "Squat"]
+        assert [e["position"] for e in exercises] == [0, 1, 2]
+        assert (exercises[0]["sets"], exercises[0]["reps"]) == (5, 5)
+        assert exercises[1]["canonical_id"] is not None
+        listed = client.get(f"/api/workouts/{wid}/exercises", headers=auth_headers).json()
+        assert [e["name"] for e in listed] == ["Bench", "Pull-ups", "Squat"]
+        logs = client.get(f"/api/workouts/{wid}/logs", headers=auth_headers).json()
+        assert all(not log["exercise_logs"] for log in logs)
+
+    def test_rejects_foreign_ids(self, auth_headers):
+        """Test ids from another workout are rejected without changes"""
+        wid, ids = _workout_with(auth_headers, ["Squat"])
+        other, other_ids = _workout_with(auth_headers, ["Bench"])
+        response = client.put(f"/api/workouts/{wid}/exercises", headers=auth_headers,
+                              json=[{"id": other_ids[0]}])
+        assert response.status_code == 400
+        assert len(client.get(f"/api/workouts/{other}/exercises", headers=auth_headers).json()) == 1
+
+    def test_stale_list_is_refused(self, auth_headers):
+        """Test a reorder built before another exercise was added is refused instead of deleting it"""
+        wid, (squat, bench) = _workout_with(auth_headers, ["Squat", "Bench"])
+        added = client.post(f"/api/workouts/{wid}/exercises", json={"name": "Row", "sets": 3, "reps": 10},
+                            headers=auth_headers).json()["id"]
+        client.post(f"/api/workouts/{wid}/log", headers=auth_headers, json={
+            "exercise_logs": [{"exercise_id": added, "actual_sets": 3, "actual_reps": 10}]})
+        response = client.put(f"/api/workouts/{wid}/exercises", headers=auth_headers,
+                              json=[{"id": bench}, {"id": squat}])
+        assert response.status_code == 409
+        listed = client.get(f"/api/workouts/{wid}/exercises", headers=auth_headers).json()
+        assert [e["id"] for e in listed] == [squat, bench, added]
+        logs = client.get(f"/api/workouts/{wid}/logs", headers=auth_headers).json()
+        assert [len(log["exercise_logs"]) for log in logs] == [1]
+
+    def test_rejects_bad_positions(self, auth_headers):
+        """Test positions must be distinct non-negative integers"""
+        wid, (squat, bench) = _workout_with(auth_headers, ["Squat", "Bench"])
+        for items in ([{"id": squat, "position": "first"}, {"id": bench}],
+                      [{"id": squat, "position": 1}, {"id": bench}],
+                      [{"id": squat, "position": 1.5}, {"id": bench}],
+                      [{"id": squat, "position": True}, {"id": bench, "position": 3}],
+                      [{"delete": True}, {"id": squat}, {"id": bench}]):
+            assert client.put(f"/api/workouts/{wid}/exercises", headers=auth_headers, json=items).status_code == 400
+        response = client.put(f"/api/workouts/{wid}/exercises", headers=auth_headers,
+                              json=[{"id": squat, "position": 5}, {"id": bench, "position": 2}])
+        assert [(e["id"], e["position"]) for e in response.json()["exercises"]] == [(bench, 2), (squat, 5)]
@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.db import engine
+from app.main import app
+from app.models import Workout, Exercise, WorkoutLog, ExerciseLog
+
+client = TestClient(app)
+
+
+def _history(user_id):
+    with Session(engine) as session:
+        workout = Workout(title="Legs", owner_id=user_id)
+        session.add(workout)
+        session.flush()
+        squat = Exercise(name="Squat", sets=5, reps=5, workout_id=workout.id)
+        session.add(squat)
+        session.flush()
+        for day in (datetime(2024, 1, 10), datetime(2024, 3, 5)):
+            log = WorkoutLog(workout_id=workout.id, workout_date=day, notes="felt good")
+            session.add(log)
+            session.flush()
+            session.add(ExerciseLog(exercise_id=squat.id, workout_log_id=log.id, actual_sets=5, actual_reps=5,
+                                    weight=100, notes="belt"))
+        session.commit()
+
+
+class TestExport:
+    def test_ndjson_export(self, user, auth_headers):
+        """Test NDJSON export streams every record type"""
+        _history(user.id)
+        response = client.get("/api/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "attachment" in response.headers["content-disposition"]
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["type"] for r in records] == ["workout", "exercise", "workout_log", "workout_log",
+                                               "exercise_log", "exercise_log"]
+        assert records[2]["workout_date"].startswith("2024-01-10")
+
+    def test_csv_with_date_range(self, user, auth_headers):
+        """Test CSV export flattens logged sets and honours the date range"""
+        _history(user.id)
+        response = client.get("/api/export?format=csv&start=2024-03-01&end=2024-03-31", headers=auth_headers)
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["exercise"] == "Squat"
+        assert rows[0]["workout_title"] == "Legs"
+        assert rows[0]["weight"] == "100.0"
+        assert rows[0]["workout_date"].startswith("2024-03-05")
+
+    def test_gzip_attachment(self, user, auth_headers):
+        """Test gzip=true returns a gzip file of the same export"""
+        _history(user.id)
+        plain = client.get("/api/export", headers=auth_headers).content
+        response = client.get("/api/export?gzip=true", headers=auth_headers)
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+        assert gzip.decompress(response.content) == plain
+
+    def test_invalid_parameters(self, auth_headers):
+        """Test unknown formats and inverted ranges are rejected"""
+        assert client.get("/api/export?format=xml", headers=auth_headers).status_code == 400
+        assert client.get("/api/export?start=2024-02-01&end=2024-01-01", headers=auth_headers).status_code == 400
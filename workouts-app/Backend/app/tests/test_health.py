@@ -0,0 +1,91 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import create_engine
+from app.health import AdmissionMiddleware, HealthChecker, set_health_checker
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def checker():
+    yield
+    set_health_checker(None)
+
+
+def _fake_engine(checked_out, size=1, overflow=0):
+    pool = SimpleNamespace(size=lambda: size, checkedout=lambda: checked_out, _max_overflow=overflow)
+    return SimpleNamespace(pool=pool)
+
+
+class TestReadiness:
+    def test_readyz_answers_from_cached_probe(self, checker):
+        """Test /readyz reports the last background probe with pool saturation"""
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ready" and body["database"] == "ok"
+        assert body["pool"]["capacity"] >= 1
+
+    def test_unreachable_database_is_not_ready(self, checker, tmp_path):
+        """Test a failing probe makes /readyz fail with the error"""
+        broken = HealthChecker(create_engine(f"sqlite:///{tmp_path / 'missing' / 'app.db'}"))
+        assert broken.probe() is False
+        set_health_checker(broken)
+        response = client.get("/readyz")
+        assert response.status_code == 500
+        assert response.json()["database"] == "error"
+
+    def test_stale_probe_is_not_ready(self, checker):
+        """Test a checker that stopped probing stops reporting ready"""
+        from app.db import engine
+        stuck = HealthChecker(engine, interval=1, timeout=1)
+        assert stuck.probe() and stuck.ready
+        stuck.checked_at = time.monotonic() - 10
+        assert not stuck.ready
+
+
+class TestAdmission:
+    def _app(self, release, **kwargs):
+        inner = FastAPI()
+
+        @inner.get("/slow")
+        async def slow():
+            await release.wait()
+            return {"ok": True}
+
+        @inner.get("/healthz")
+        async def healthz():
+            return {"status": "ok"}
+
+        inner.add_middleware(AdmissionMiddleware, **kwargs)
+        return inner
+
+    async def _overload(self, release, paths, **kwargs):
+        transport = httpx.ASGITransport(app=self._app(release, **kwargs))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            held = [asyncio.create_task(c.get("/slow")) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            extra = [await c.get(path) for path in paths]
+            release.set()
+            return [r.status_code for r in await asyncio.gather(*held)], extra
+
+    def test_sheds_past_in_flight_limit(self):
+        """Test requests past the in-flight limit get an immediate 503 while probes still pass"""
+        held, (shed, probe) = asyncio.run(self._overload(
+            asyncio.Event(), ["/slow", "/healthz"], max_in_flight=2, max_pool_waiters=0, engine=_fake_engine(0)))
+        assert held == [200, 200]
+        assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+        assert probe.status_code == 200
+
+    def test_sheds_when_pool_waiters_pile_up(self):
+        """Test requests are refused once the pool is exhausted and others already wait for it"""
+        held, (shed,) = asyncio.run(self._overload(
+            asyncio.Event(), ["/slow"], max_in_flight=0, max_pool_waiters=1, engine=_fake_engine(checked_out=1)))
+        assert held == [200, 200]
+        assert shed.status_code == 503 and "pool" in shed.json()["detail"]
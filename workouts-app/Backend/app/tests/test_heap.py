@@ -0,0 +1,60 @@
+import tracemalloc
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from app.db import engine
+from app.main import app
+from app.models import Workout
+
+client = TestClient(app)
+ADMIN = {"x-admin-token": "changeme"}
+
+
+@pytest.fixture
+def tracing():
+    yield
+    client.post("/admin/heap/stop", headers=ADMIN)
+
+
+def _allocate():
+    return [f"retained-{n}" * 10 for n in range(5000)]
+
+
+class TestHeap:
+    def test_requires_admin_token(self):
+        """Test heap endpoints reject requests without the admin token"""
+        assert client.post("/admin/heap/start").status_code == 403
+        assert client.get("/admin/heap/objects", headers={"x-admin-token": "wrong"}).status_code == 403
+
+    def test_off_by_default(self):
+        """Test tracemalloc is not running until started, and snapshots need it"""
+        assert client.get("/admin/heap", headers=ADMIN).json()["tracing"] is False
+        assert not tracemalloc.is_tracing()
+        assert client.post("/admin/heap/snapshots", headers=ADMIN).status_code == 409
+
+    def test_snapshot_diff_finds_growth(self, tracing):
+        """Test a diff between snapshots points at the line that allocated"""
+        assert client.post("/admin/heap/start", headers=ADMIN).json()["tracing"] is True
+        base = client.post("/admin/heap/snapshots", headers=ADMIN).json()
+        assert base["top"] and {"file", "line", "size_kb", "count"} <= set(base["top"][0])
+        retained = _allocate()
+        diff = client.get("/admin/heap/diff", params={"base": base["id"]}, headers=ADMIN).json()
+        growth = [d for d in diff["diff"] if d["file"].endswith("test_heap.py")]
+        assert growth and growth[0]["size_diff_kb"] > 100 and growth[0]["count_diff"] >= 5000
+        by_file = client.get(f"/admin/heap/snapshots/{diff['head']}", params={"group_by": "filename"},
+                             headers=ADMIN).json()
+        assert all(site["line"] is None for site in by_file["top"])
+        assert client.get("/admin/heap/snapshots/999", headers=ADMIN).status_code == 404
+        assert client.get("/admin/heap/diff", params={"base": base["id"], "group_by": "x"},
+                          headers=ADMIN).status_code == 400
+        del retained
+
+    def test_orm_objects(self, user):
+        """Test ORM instances held in open sessions are counted per model"""
+        with Session(engine) as session:
+            session.add(Workout(title="Held", owner_id=user.id))
+            session.commit()
+            held = session.exec(select(Workout).where(Workout.owner_id == user.id)).all()
+            body = client.get("/admin/heap/objects", headers=ADMIN).json()
+            assert body["held_in_sessions"]["Workout"] >= len(held)
+            assert body["live_instances"]["Workout"] >= len(held)
@@ -0,0 +1,164 @@
+import gzip
+import time
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from app.db import engine
+from app.main import app
+from app.importer import fail_orphaned_imports
+from app.models import Workout, Exercise, WorkoutLog, ExerciseLog, DailyActivity, ImportJob
+
+client = TestClient(app)
+
+STRONG_CSV = """Date,Workout Name,Exercise Name,Set Order,Weight,Reps,Notes,Workout Notes
+2024-01-10 07:30:00,Legs,Squat (Barbell),1,100,5,,early
+2024-01-10 07:30:00,Legs,Squat (Barbell),2,100,5,belt,early
+2024-01-10 07:30:00,Legs,Leg Press,1,180,10,,early
+2024-01-12 18:00:00,Legs,squat (barbell),1,105,5,,
+2024-01-12 18:00:00,Legs,Leg Press,1,not-a-number,10,,
+"""
+
+
+def _upload(headers, content: bytes, filename: str, **params):
+    return client.post("/api/import", params=params, files={"file": (filename, content)}, headers=headers)
+
+
+def _wait(job_id, headers, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/import/{job_id}", headers=headers).json()
+        if job["status"] in ("completed", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+class TestImport:
+    def test_csv_import(self, user, auth_headers):
+        """Test a per-set tracker CSV becomes deduped workouts, exercises and sessions"""
+        response = _upload(auth_headers, STRONG_CSV.encode(), "strong.csv")
+        assert response.status_code == 202
+        job = _wait(response.json()["id"], auth_headers)
+        assert job["status"] == "completed"
+        assert job["rows_processed"] == 5
+        assert job["rows_imported"] == 4
+        assert job["rows_skipped"] == 1
+        assert "weight" in job["errors"][0]
+        assert job["workouts_created"] == 1
+        assert job["sessions_created"] == 2
+        assert job["progress"] == 1.0
+
+        with Session(engine) as session:
+            workouts = session.exec(select(Workout).where(Workout.owner_id == user.id)).all()
+            assert [w.title for w in workouts] == ["Legs"]
+            exercises = session.exec(
+                select(Exercise).where(Exercise.workout_id == workouts[0].id).order_by(Exercise.position)
+            ).all()
+            assert [e.name for e in exercises] == ["Squat (Barbell)", "Leg Press"]
+            assert all(e.canonical_id is not None for e in exercises)
+            logs = session.exec(select(WorkoutLog).where(WorkoutLog.workout_id == workouts[0].id)).all()
+            assert sorted(l.workout_date for l in logs) == [datetime(2024, 1, 10, 7, 30), datetime(2024, 1, 12, 18)]
+            sets = session.exec(select(ExerciseLog).join(WorkoutLog).where(WorkoutLog.workout_id == workouts[0].id)).all()
+            assert len(sets) == 4
+            assert {s.actual_sets for s in sets} == {1}
+            rollups = session.exec(select(DailyActivity).where(DailyActivity.user_id == user.id)).all()
+            assert sum(r.sessions for r in rollups) == 2
+
+    def test_reimport_extends_existing_workout(self, user, auth_headers):
+        """Test workouts are matched by title and exercises per workout by normalized name"""
+        with Session(engine) as session:
+            workout = Workout(title="legs", owner_id=user.id)
+            session.add(workout)
+            session.flush()
+            session.add(Exercise(name="Squats", sets=5, reps=5, workout_id=workout.id))
+            session.commit()
+            wid = workout.id
+        csv_text = "workout_date,workout_title,exercise,actual_sets,actual_reps,weight\n2024-02-01,Legs,squat,5,5,100\n"
+        job = _wait(_upload(auth_headers, csv_text.encode(), "history.csv").json()["id"], auth_headers)
+        assert job["status"] == "completed"
+        assert job["workouts_created"] == 0
+        with Session(engine) as session:
+            assert len(session.exec(select(Exercise).where(Exercise.workout_id == wid)).all()) == 1
+
+    def test_same_file_twice_logs_once(self, user, auth_headers):
+        """Test sessions already in the account are skipped as duplicates instead of logged again"""
+        first = _wait(_upload(auth_headers, STRONG_CSV.encode(), "strong.csv").json()["id"], auth_headers)
+        extra = STRONG_CSV + "2024-01-14 08:00:00,Legs,Leg Press,1,190,8,,\n"
+        second = _wait(_upload(auth_headers, extra.encode(), "strong.csv").json()["id"], auth_headers)
+        assert (first["rows_imported"], first["rows_duplicate"]) == (4, 0)
+        assert (second["status"], second["rows_imported"], second["rows_duplicate"]) == ("completed", 1, 4)
+        assert (second["sessions_created"], second["workouts_created"]) == (1, 0)
+        with Session(engine) as session:
+            sets = session.exec(select(ExerciseLog).join(WorkoutLog).join(Workout).where(Workout.owner_id == user.id)).all()
+            assert len(sets) == 5
+            rollups = session.exec(select(DailyActivity).where(DailyActivity.user_id == user.id)).all()
+            assert sum(r.exercise_logs for r in rollups) == 5
+
+    def test_orphaned_jobs_are_failed(self, user, auth_headers):
+        """Test jobs left queued or running by a stopped worker are failed, and recent ones are kept"""
+        stale = datetime.utcnow() - timedelta(hours=1)
+        with Session(engine) as session:
+            jobs = [ImportJob(user_id=user.id, format="csv", status=status, heartbeat_at=heartbeat)
+                    for status, heartbeat in (("running", stale), ("queued", stale), ("running", datetime.utcnow()),
+                                              ("completed", stale))]
+            session.add_all(jobs)
+            session.commit()
+            ids = [job.id for job in jobs]
+        assert fail_orphaned_imports(engine) == 2
+        statuses = [client.get(f"/api/import/{job_id}", headers=auth_headers).json() for job_id in ids]
+        assert [job["status"] for job in statuses] == ["failed", "failed", "running", "completed"]
+        assert "interrupted" in statuses[0]["error"]
+
+    def test_ndjson_export_roundtrip(self, user, auth_headers):
+        """Test our own gzipped NDJSON export imports back into a fresh account"""
+        with Session(engine) as session:
+            workout = Workout(title="Push", owner_id=user.id)
+            session.add(workout)
+            session.flush()
+            bench = Exercise(name="Bench Press", sets=3, reps=8, workout_id=workout.id)
+            session.add(bench)
+            session.flush()
+            log = WorkoutLog(workout_id=workout.id, workout_date=datetime(2024, 3, 1, 9))
+            session.add(log)
+            session.flush()
+            session.add(ExerciseLog(exercise_id=bench.id, workout_log_id=log.id, actual_sets=3, actual_reps=8, weight=60))
+            session.commit()
+        exported = client.get("/api/export?gzip=true", headers=auth_headers).content
+
+        client.delete("/api/users/account", headers=auth_headers)
+        from app.auth import create_session_cookie
+        from app.models import User
+        with Session(engine) as session:
+            other = User(email=f"roundtrip-{user.id}@example.com", password_hash="unused")
+            session.add(other)
+            session.commit()
+            headers = {"x-session": create_session_cookie(other.id)}
+            other_id = other.id
+
+        job = _wait(_upload(headers, exported, "workouts-export.ndjson.gz").json()["id"], headers)
+        assert job["status"] == "completed"
+        assert job["rows_imported"] == 1
+        with Session(engine) as session:
+            row = session.exec(
+                select(Workout.title, Exercise.name, Exercise.sets, ExerciseLog.weight, WorkoutLog.workout_date)
+                .join(Exercise, Exercise.workout_id == Workout.id)
+                .join(ExerciseLog, ExerciseLog.exercise_id == Exercise.id)
+                .join(WorkoutLog, ExerciseLog.workout_log_id == WorkoutLog.id)
+                .where(Workout.owner_id == other_id)
+            ).one()
+            assert tuple(row) == ("Push", "Bench Press", 3, 60.0, datetime(2024, 3, 1, 9))
+
+    def test_missing_columns_fail_the_job(self, auth_headers):
+        """Test a file without date/exercise columns fails with a reason"""
+        job = _wait(_upload(auth_headers, b"foo,bar\n1,2\n", "x.csv").json()["id"], auth_headers)
+        assert job["status"] == "failed"
+        assert "date" in job["error"]
+
+    def test_invalid_requests(self, user, auth_headers):
+        """Test unknown formats, empty files and other users' jobs are rejected"""
+        assert _upload(auth_headers, b"data", "notes.txt").status_code == 400
+        assert _upload(auth_headers, b"", "empty.csv").status_code == 400
+        job_id = _upload(auth_headers, gzip.compress(STRONG_CSV.encode()), "data.bin", format="csv").json()["id"]
+        assert _wait(job_id, auth_headers)["status"] == "completed"
+        assert client.get(f"/api/import/{job_id}").status_code == 401
+        assert client.get("/api/import/999999", headers=auth_headers).status_code == 404
+        assert [j["id"] for j in client.get("/api/import", headers=auth_headers).json()] == [job_id]
@@ -0,0 +1,185 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+from starlette.websockets import WebSocketDisconnect
+from app.db import engine
+from app.live_sessions import LiveSessionBuffer, StaleSession, parse_set, set_live_sessions
+from app.main import app
+from app.models import ExerciseLog
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def live():
+    """A buffer whose thread is not started, so sets are only written when a test flushes"""
+    buffer = LiveSessionBuffer(engine, interval=3600)
+    previous = set_live_sessions(buffer)
+    yield buffer
+    set_live_sessions(previous)
+
+
+def _workout(headers):
+    wid = client.post("/api/workouts", json={"title": "Live"}, headers=headers).json()["id"]
+    eid = client.post(f"/api/workouts/{wid}/exercises", json={"name": "Squat", "sets": 3, "reps": 5},
+                      headers=headers).json()["id"]
+    return wid, eid
+
+
+def _written(workout_log_id):
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(ExerciseLog)
+                            .where(ExerciseLog.workout_log_id == workout_log_id)).one()
+
+
+def _send_sets(ws, eid, seqs):
+    for seq in seqs:
+        ws.send_json({"type": "set", "seq": seq, "exercise_id": eid, "reps": 5, "weight": 100})
+        assert ws.receive_json()["type"] == "ack"
+
+
+class TestLiveSessions:
+    def test_sets_are_buffered_and_flushed_together(self, live, user, auth_headers, query_log):
+        """Test sets wait in memory, then every session's sets go out in one INSERT and one commit"""
+        wid, eid = _workout(auth_headers)
+        with client.websocket_connect(f"/api/workouts/{wid}/live", headers=auth_headers) as first, \
+                client.websocket_connect(f"/api/workouts/{wid}/live", headers=auth_headers) as second:
+            ready = [first.receive_json(), second.receive_json()]
+            assert [(r["type"], r["acked"], r["persisted"]) for r in ready] == [("ready", 0, 0)] * 2
+            _send_sets(first, eid, [1, 2, 3])
+            _send_sets(second, eid, [1, 2])
+            assert _written(ready[0]["workout_log_id"]) == 0
+            with query_log.capture() as statements:
+                assert live.flush() == 2
+            inserts = [s for s, _, _ in statements if s.lstrip().upper().startswith("INSERT")]
+            assert len(inserts) == 1 and "exerciselog" in inserts[0]
+            assert [_written(r["workout_log_id"]) for r in ready] == [3, 2]
+            first.send_json({"type": "set", "seq": 4, "exercise_id": eid, "reps": 5})
+            assert first.receive_json() == {"type": "ack", "seq": 4, "persisted": 3}
+        # The last connection out writes what is left
+        assert _written(ready[0]["workout_log_id"]) == 4
+        assert live.snapshot()["sessions"] == 0
+
+    def test_resume_after_reconnect_and_complete(self, live, user, auth_headers):
+        """Test a reconnect resumes after the written sets, resends are ignored and completion closes the session"""
+        wid, eid = _workout(auth_headers)
+        with client.websocket_connect(f"/api/workouts/{wid}/live", headers=auth_headers) as ws:
+            session_id = ws.receive_json()["session"]
+            _send_sets(ws, eid, [1, 2, 3])
+        url = f"/api/workouts/{wid}/live?session={session_id}"
+        with client.websocket_connect(url, headers=auth_headers) as ws:
+            ready = ws.receive_json()
+            assert (ready["session"], ready["acked"], ready["persisted"]) == (session_id, 3, 3)
+            _send_sets(ws, eid, [3, 4])
+            ws.send_json({"type": "complete", "notes": "felt strong"})
+            done = ws.receive_json()
+            assert (done["type"], done["sets"]) == ("completed", 4)
+        logs = client.get(f"/api/workouts/{wid}/logs", headers=auth_headers).json()
+        assert [(log["notes"], len(log["exercise_logs"])) for log in logs] == [("felt strong", 4)]
+        activity = client.get("/api/analytics/activity", headers=auth_headers).json()
+        assert activity["days"][-1]["exercise_logs"] == 4
+        with client.websocket_connect(url, headers=auth_headers) as ws:
+            assert ws.receive_json()["detail"] == "session already completed"
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 4409
+
+    def test_overtaken_buffer_is_not_written_twice(self, live, user, auth_headers):
+        """Test a worker whose session was resumed and written elsewhere drops its buffer"""
+        wid, eid = _workout(auth_headers)
+        other_worker = LiveSessionBuffer(engine, interval=3600)
+        stale = live.start_session(user.id, wid)
+        for seq in (1, 2):
+            live.record(stale, *parse_set({"seq": seq, "exercise_id": eid, "reps": 5}, stale.exercise_ids))
+        resumed = other_worker.resume_session(user.id, wid, stale.id)
+        for seq in (1, 2, 3):
+            other_worker.record(resumed, *parse_set({"seq": seq, "exercise_id": eid, "reps": 5}, resumed.exercise_ids))
+        assert other_worker.flush() == 1
+        assert live.flush() == 0
+        with pytest.raises(StaleSession):
+            live.record(stale, *parse_set({"seq": 3, "exercise_id": eid}, stale.exercise_ids))
+        assert _written(stale.workout_log_id) == 3
+
+    def test_deleted_exercise_does_not_block_other_sessions(self, live, user, auth_headers):
+        """Test sets of a deleted exercise are dropped and its session made stale while other sessions still flush"""
+        wid, kept = _workout(auth_headers)
+        removed = client.post(f"/api/workouts/{wid}/exercises", json={"name": "Lunge", "sets": 3, "reps": 8},
+                              headers=auth_headers).json()["id"]
+        other_wid, other_eid = _workout(auth_headers)
+        active = live.start_session(user.id, wid)
+        other = live.start_session(user.id, other_wid)
+        for seq, eid in enumerate([kept, removed, kept], start=1):
+            live.record(active, *parse_set({"seq": seq, "exercise_id": eid, "reps": 5}, active.exercise_ids))
+        live.record(other, *parse_set({"seq": 1, "exercise_id": other_eid, "reps": 5}, other.exercise_ids))
+        assert client.delete(f"/api/workouts/{wid}/exercises/{removed}", headers=auth_headers).status_code == 200
+
+        assert live.flush() == 2
+        assert (_written(active.workout_log_id), _written(other.workout_log_id)) == (2, 1)
+        with Session(engine) as session:
+            assert session.exec(select(func.count()).select_from(ExerciseLog)
+                                .where(ExerciseLog.exercise_id == removed)).one() == 0
+        with pytest.raises(StaleSession):
+            live.record(active, *parse_set({"seq": 4, "exercise_id": kept}, active.exercise_ids))
+        assert live.snapshot()["buffered_sets"] == 0
+        resumed = live.resume_session(user.id, wid, active.id)
+        assert (resumed.persisted, resumed.exercise_ids) == (3, frozenset([kept]))
+        live.record(other, *parse_set({"seq": 2, "exercise_id": other_eid, "reps": 5}, other.exercise_ids))
+        assert live.flush() == 1 and _written(other.workout_log_id) == 2
+
+    def test_sets_recorded_during_completion_are_refused(self, live, user, auth_headers, monkeypatch):
+        """Test a set arriving while the session is being completed is refused, not acked and lost"""
+        wid, eid = _workout(auth_headers)
+        active = live.start_session(user.id, wid)
+        live.record(active, *parse_set({"seq": 1, "exercise_id": eid, "reps": 5}, active.exercise_ids))
+        write, refused = live._write, []
+
+        def write_then_record(session, batches):
+            try:
+                live.record(active, *parse_set({"seq": 2, "exercise_id": eid, "reps": 5}, active.exercise_ids))
+            except StaleSession as e:
+                refused.append(str(e))
+            return write(session, batches)
+
+        monkeypatch.setattr(live, "_write", write_then_record)
+        live.complete(active)
+        assert refused == ["session is being completed"]
+        assert _written(active.workout_log_id) == 1 and live.snapshot()["buffered_sets"] == 0
+
+    def test_failed_completion_keeps_the_session_open(self, live, user, auth_headers, monkeypatch):
+        """Test a completion that fails on the database requeues its sets and accepts new ones"""
+        wid, eid = _workout(auth_headers)
+        active = live.start_session(user.id, wid)
+        live.record(active, *parse_set({"seq": 1, "exercise_id": eid, "reps": 5}, active.exercise_ids))
+
+        def broken_write(session, batches):
+            raise RuntimeError("database went away")
+
+        monkeypatch.setattr(live, "_write", broken_write)
+        with pytest.raises(RuntimeError):
+            live.complete(active)
+        monkeypatch.undo()
+        live.record(active, *parse_set({"seq": 2, "exercise_id": eid, "reps": 5}, active.exercise_ids))
+        live.complete(active)
+        assert _written(active.workout_log_id) == 2
+
+    def test_rejects_bad_connections_and_messages(self, live, user, auth_headers):
+        """Test authentication and ownership close the socket, and bad sets are answered with errors"""
+        wid, eid = _workout(auth_headers)
+        with TestClient(app).websocket_connect(f"/api/workouts/{wid}/live") as ws:
+            ws.receive_json()
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 4401
+        with client.websocket_connect("/api/workouts/0/live", headers=auth_headers) as ws:
+            ws.receive_json()
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 4404
+        with client.websocket_connect(f"/api/workouts/{wid}/live", headers=auth_headers) as ws:
+            ws.receive_json()
+            ws.send_json({"type": "set", "seq": 2, "exercise_id": eid})
+            assert ws.receive_json()["detail"] == "expected seq 1"
+            ws.send_json({"type": "set", "seq": 1, "exercise_id": -1})
+            assert ws.receive_json()["detail"] == "exercise_id is not an exercise of this workout"
+            ws.send_text("not json")
+            assert ws.receive_json()["type"] == "error"
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import Counter
+import pytest
+from fastapi.testclient import TestClient
+from app import profiler
+from app.main import app
+
+client = TestClient(app)
+ADMIN = {"x-admin-token": "changeme"}
+
+
+def _burn(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=_burn, args=(stop,), name="burner", daemon=True)
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+class TestProfiler:
+    def test_profile_finds_hot_function(self, busy_thread):
+        """Test a one-shot profile attributes samples to the spinning thread's function"""
+        response = client.post("/admin/profile", params={"seconds": 0.3, "interval_ms": 5}, headers=ADMIN)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["samples"] > 0
+        hot = {f["function"] for f in body["top_functions"][:5]} | {f["function"] for f in body["top_lines"][:5]}
+        assert hot & {"_burn", "<genexpr>"}
+        assert any(line.startswith("burner;") and "_burn (" in line for line in body["collapsed"].splitlines())
+
+    def test_collapsed_format(self, busy_thread):
+        """Test collapsed output is one 'frames count' line per stack"""
+        response = client.post("/admin/profile", params={"seconds": 0.2, "format": "collapsed"}, headers=ADMIN)
+        assert response.headers["content-type"].startswith("text/plain")
+        for line in response.text.strip().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert ";" in stack and int(count) > 0
+
+    def test_continuous_window(self, busy_thread):
+        """Test continuous sampling keeps a rolling window that can be read back"""
+        assert client.get("/admin/profile/continuous", headers=ADMIN).status_code == 409
+        on = client.post("/admin/profile/continuous/on", params={"interval_ms": 5, "window_seconds": 60}, headers=ADMIN)
+        assert on.json()["running"] is True
+        try:
+            time.sleep(0.2)
+            body = client.get("/admin/profile/continuous", params={"seconds": 30}, headers=ADMIN).json()
+            assert body["samples"] > 0
+            assert "burner" in body["collapsed"]
+        finally:
+            off = client.post("/admin/profile/continuous/off", headers=ADMIN)
+        assert off.json()["running"] is False
+
+    def test_validation_and_auth(self):
+        """Test profile parameters are bounded and the admin token is required"""
+        assert client.post("/admin/profile", params={"seconds": 0.1}).status_code == 403
+        assert client.post("/admin/profile", params={"seconds": 120}, headers=ADMIN).status_code == 400
+        assert client.post("/admin/profile", params={"seconds": 1, "format": "svg"}, headers=ADMIN).status_code == 400
+
+    def test_window_eviction_and_top_functions(self):
+        """Test old seconds leave the window and self/total counts are per function"""
+        sampler = profiler.Sampler(window=2)
+        stack = ("main", (("app/a.py", "outer", 1), ("app/a.py", "inner", 5)))
+        sampler._buckets.extend([(int(time.monotonic()) - 10, Counter({stack: 3})), (int(time.monotonic()), Counter({stack: 1}))])
+        sampler.sample()
+        assert sampler.counts()[stack] == 1  # the bucket from 10s ago was evicted
+        functions, lines = profiler.top_functions(Counter({stack: 3}))
+        assert functions[0]["function"] == "inner" and functions[0]["self"] == 3
+        assert {f["function"]: f["total"] for f in functions} == {"inner": 3, "outer": 3}
+        assert lines[0]["line"] == 5
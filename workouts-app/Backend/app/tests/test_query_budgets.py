@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+import io
+import httpx
+import pytest
+from app.db import engine
+from app.main import app, on_startup
+from benchmarks.run import stub_groq
+from benchmarks.scenarios import Context, ENDPOINTS
+from benchmarks.seed import SeedConfig, seed
+
+
+# Upper bound on SQL statements per request, for any amount of user data.
+# Raise a budget only together with the change that needs it.
+QUERY_BUDGETS = {
+    "GET /readyz": 0,
+    "POST /api/users/register": 2,
+    "POST /api/users/login": 1,
+    "POST /api/users/logout": 0,
+    "GET /api/users/me": 1,
+    "PUT /api/users/profile": 2,
+    "PUT /api/users/password": 2,
+    "PUT /api/users/preferences": 1,
+    "DELETE /api/users/account": 13,
+    "GET /api/workouts/ai-test": 0,
+    "GET /api/workouts": 3,
+    "GET /api/workouts/history": 3,
+    "GET /api/workouts/{wid}": 2,
+    "POST /api/workouts": 4,
+    "PUT /api/workouts/{wid}": 4,
+    "DELETE /api/workouts/{wid}": 11,
+    "GET /api/workouts/{wid}/exercises": 3,
+    "POST /api/workouts/{wid}/exercises": 8,  # includes creating a new canonical exercise
+    "PUT /api/workouts/{wid}/exercises": 7,
+    "PUT /api/workouts/{wid}/exercises/{eid}": 5,
+    "DELETE /api/workouts/{wid}/exercises/{eid}": 11,
+    "POST /api/workouts/{wid}/log": 11,
+    "GET /api/workouts/{wid}/logs": 4,
+    "POST /api/workouts/ai-generate": 1,
+    "POST /api/workouts/ai-generate-and-save": 7,
+    "GET /api/analytics/progression": 3,
+    "GET /api/analytics/exercises": 2,
+    "GET /api/analytics/activity": 5,
+    "GET /api/exercises/search": 0,
+    "GET /api/search": 2,
+    "GET /api/sync": 6,
+    "GET /api/templates": 2,
+    "GET /api/templates/{tid}": 2,
+    "POST /api/templates": 2,
+    "PUT /api/templates/{tid}": 3,
+    "DELETE /api/templates/{tid}": 3,
+    "POST /api/templates/{tid}/instantiate": 8,  # includes creating the template's canonical exercises
+    "GET /api/export": 5,
+    "POST /api/import": 2,
+    "GET /api/import": 2,
+    "GET /api/import/{job_id}": 2,
+}
+
+# Server-rendered pages and probes, not data routes
+UNBUDGETED = {"GET /", "GET /login", "GET /signup", "GET /workouts", "GET /healthz"}
+
+SMALL = SeedConfig(users=1, workouts_per_user=1, exercises_per_workout=2, logs_per_user=1)
+LARGE = SeedConfig(users=1, workouts_per_user=4, exercises_per_workout=6, logs_per_user=40)
+
+
+async def _capture_all(query_log, users):
+    """{endpoint name: [statements per user]} with one request per endpoint and user"""
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        ctx = Context(client=client, transport=transport, users=users)
+        templates = (await client.get("/api/templates", headers=ctx.auth(users[0]))).json()
+        ctx.template_id = next(t["id"] for t in templates if t["builtin"])
+        captured = {}
+        for endpoint in ENDPOINTS:
+            if endpoint.name in UNBUDGETED:
+                continue
+            captured[endpoint.name] = []
+            for user in users:
+                url, kwargs = await endpoint.build(ctx, user)
+                with query_log.capture() as statements:
+                    if endpoint.isolated:
+                        async with ctx.isolated_client() as isolated:
+                            response = await isolated.request(endpoint.method, url, **kwargs)
+                    else:
+                        response = await client.request(endpoint.method, url, **kwargs)
+                assert response.status_code < 400, (endpoint.name, response.status_code, response.text[:200])
+                captured[endpoint.name].append(statements)
+            if endpoint.after is not None:
+                await endpoint.after(ctx)
+        return captured
+
+
+@pytest.fixture(scope="module")
+def captured(query_log):
+    on_startup()
+    users = seed(engine, SMALL) + seed(engine, LARGE)
+    # Without GROQ_API_KEY, as in CI: the gate must not depend on the developer's environment
+    with pytest.MonkeyPatch.context() as env:
+        env.delenv("GROQ_API_KEY", raising=False)
+        with stub_groq(), contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(_capture_all(query_log, users))
+
+
+class TestQueryBudgets:
+    def test_every_route_has_a_budget(self, captured):
+        """Test each benchmarked data route declares a query budget"""
+        assert sorted(set(captured) - set(QUERY_BUDGETS)) == []
+
+    def test_query_counts_within_budget(self, captured):
+        """Test no route exceeds its budget or issues more queries for a larger history"""
+        counts = {name: [len(statements) for statements in runs] for name, runs in captured.items()}
+        over = {name: c for name, c in counts.items() if max(c) > QUERY_BUDGETS.get(name, 0)}
+        assert over == {}
+        grows = {name: c for name, c in counts.items() if c[1] > c[0]}
+        assert grows == {}
+
+    def test_no_full_scans_of_hot_tables(self, captured, query_log):
+        """Test captured statements use indexes on workout, workoutlog and exerciselog"""
+        scans = {}
+        for name, runs in captured.items():
+            for table, statement in query_log.full_scans(runs[-1]):
+                scans.setdefault(name, []).append(f"{table}: {' '.join(statement.split())[:160]}")
+        assert scans == {}
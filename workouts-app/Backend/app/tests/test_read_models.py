@@ -0,0 +1,75 @@
+import contextlib
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+from app.db import engine
+from app.main import app
+from app.models import Workout
+from app.read_models import WorkoutRow, columns, fetch, fetch_one, group_by, select_rows
+from benchmarks.read_models import run
+from benchmarks.seed import SeedConfig, seed
+
+client = TestClient(app)
+
+
+@contextlib.contextmanager
+def loaded_entities():
+    """Names of the models the ORM materializes while the block runs"""
+    loaded = []
+    listener = lambda session, instance: loaded.append(type(instance).__name__)
+    event.listen(OrmSession, "loaded_as_persistent", listener)
+    try:
+        yield loaded
+    finally:
+        event.remove(OrmSession, "loaded_as_persistent", listener)
+
+
+class TestReadModels:
+    def test_rows_follow_the_model_columns(self, user):
+        """Test a row type selects exactly its fields, in order, as a named tuple"""
+        assert [c.key for c in columns(WorkoutRow)] == list(WorkoutRow._fields)
+        with Session(engine) as session:
+            session.add(Workout(title="Rows", owner_id=user.id))
+            session.commit()
+            rows = fetch(session, WorkoutRow, select_rows(WorkoutRow).where(Workout.owner_id == user.id))
+            assert [(r.title, r.owner_id) for r in rows] == [("Rows", user.id)]
+            assert len(session.identity_map) == 0
+            assert fetch_one(session, WorkoutRow, select_rows(WorkoutRow).where(Workout.id == -1)) is None
+        assert group_by(rows, "owner_id") == {user.id: rows}
+
+    def test_get_routes_load_no_entities(self, user, auth_headers):
+        """Test GET handlers read plain rows; only the session's user is an ORM instance"""
+        wid = client.post("/api/workouts", json={"title": "Lean"}, headers=auth_headers).json()["id"]
+        client.post(f"/api/workouts/{wid}/exercises", json={"name": "Squat", "sets": 3, "reps": 5}, headers=auth_headers)
+        eid = client.get(f"/api/workouts/{wid}/exercises", headers=auth_headers).json()[0]["id"]
+        client.post(f"/api/workouts/{wid}/log", json={"exercises": [
+            {"exercise_id": eid, "actual_sets": 3, "actual_reps": 5, "weight": 100}]}, headers=auth_headers)
+        paths = ["/api/workouts", "/api/workouts/history", f"/api/workouts/{wid}", f"/api/workouts/{wid}/exercises",
+                 f"/api/workouts/{wid}/logs", "/api/templates", "/api/import", "/api/analytics/activity"]
+        with loaded_entities() as loaded:
+            for path in paths:
+                assert client.get(path, headers=auth_headers).status_code == 200, path
+        assert loaded and set(loaded) <= {"User"}
+
+    def test_responses_keep_their_shape(self, user, auth_headers):
+        """Test row-based responses carry the same fields the ORM-based ones did"""
+        wid = client.post("/api/workouts", json={"title": "Shape", "notes": "n"}, headers=auth_headers).json()["id"]
+        client.post(f"/api/workouts/{wid}/exercises", json={"name": "Row", "sets": 4, "reps": 8}, headers=auth_headers)
+        workout = client.get(f"/api/workouts/{wid}", headers=auth_headers).json()
+        assert workout["title"] == "Shape" and set(workout) == {"id", "title", "notes", "created_at", "owner_id"}
+        listed = client.get("/api/workouts", headers=auth_headers).json()[0]
+        assert [e["name"] for e in listed["exercises"]] == ["Row"]
+        assert set(listed["exercises"][0]) == {"id", "name", "sets", "reps", "rest_seconds", "notes", "position",
+                                               "created_at", "workout_id", "canonical_id"}
+        assert client.get(f"/api/workouts/{wid}/logs", headers=auth_headers).json() == []
+        assert client.get("/api/workouts/0/exercises", headers=auth_headers).status_code == 404
+
+    def test_benchmark_compares_both_paths(self):
+        """Test the read-model benchmark measures every case on the same rows both ways"""
+        user = seed(engine, SeedConfig(users=1, workouts_per_user=1, exercises_per_workout=2, logs_per_user=3))[0]
+        results = run(engine, user.id, repeat=1)
+        assert set(results) == {"workout logs", "exercise logs", "exercise logs with exercise"}
+        for case in results.values():
+            assert case["orm"]["rows"] == case["rows"]["rows"] > 0
+            assert case["rows"]["peak_kb_per_1k"] > 0
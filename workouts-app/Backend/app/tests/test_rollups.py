@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from app.db import engine
+from app.main import app
+from app.models import Workout, Exercise, WorkoutLog, ExerciseLog, DailyActivity, WeeklyActivity
+from app.rollups import current_streak, longest_streak, rebuild_user_rollups, week_start
+
+client = TestClient(app)
+
+
+def _rollups(user_id):
+    with Session(engine) as session:
+        daily = session.exec(select(DailyActivity).where(DailyActivity.user_id == user_id)).all()
+        weekly = session.exec(select(WeeklyActivity).where(WeeklyActivity.user_id == user_id)).all()
+        return daily, weekly
+
+
+class TestStreaks:
+    def test_streak_helpers(self):
+        """Test current and longest streaks over descending periods"""
+        today = date(2026, 3, 10)
+        days = [today, today - timedelta(days=1), today - timedelta(days=2), today - timedelta(days=5),
+                today - timedelta(days=6)]
+        assert current_streak(days, today, timedelta(days=1)) == 3
+        assert longest_streak(days, timedelta(days=1)) == 3
+        assert current_streak(days[3:], today, timedelta(days=1)) == 0
+        assert current_streak([], today, timedelta(days=1)) == 0
+        assert week_start(date(2026, 3, 12)) == date(2026, 3, 9)
+
+
+class TestRollups:
+    def test_log_and_delete_maintain_rollups(self, user, auth_headers):
+        """Test logging a session updates rollups and deleting the workout clears them"""
+        workout = client.post("/api/workouts", json={"title": "Full body"}, headers=auth_headers).json()
+        squat = client.post(f"/api/workouts/{workout['id']}/exercises",
+                            json={"name": "Squat", "sets": 3, "reps": 5}, headers=auth_headers).json()
+        row = client.post(f"/api/workouts/{workout['id']}/exercises",
+                          json={"name": "Row", "sets": 3, "reps": 10}, headers=auth_headers).json()
+        client.post(f"/api/workouts/{workout['id']}/log", headers=auth_headers, json={"exercise_logs": [
+            {"exercise_id": squat["id"], "actual_sets": 3, "actual_reps": 5, "weight": 100},
+            {"exercise_id": row["id"], "actual_sets": 3, "actual_reps": 10, "weight": None},
+        ]})
+
+        daily, weekly = _rollups(user.id)
+        assert len(daily) == 1 and len(weekly) == 1
+        assert daily[0].day == datetime.utcnow().date()
+        assert (daily[0].sessions, daily[0].exercise_logs, daily[0].distinct_exercises) == (1, 2, 2)
+        assert daily[0].total_volume == 1500
+        assert weekly[0].week_start == week_start(daily[0].day)
+
+        activity = client.get("/api/analytics/activity?weeks=2", headers=auth_headers).json()
+        assert len(activity["weeks"]) == 2
+        assert activity["weeks"][-1]["sessions"] == 1
+        assert activity["days"][-1]["exercise_logs"] == 2
+        assert activity["streaks"]["current_days"] == 1
+        assert activity["streaks"]["current_weeks"] == 1
+
+        assert client.delete(f"/api/workouts/{workout['id']}", headers=auth_headers).status_code == 200
+        assert _rollups(user.id) == ([], [])
+
+    def test_rebuild_from_history(self, user):
+        """Test the backfill rebuilds buckets for historic logs"""
+        with Session(engine) as session:
+            workout = Workout(title="Old", owner_id=user.id)
+            session.add(workout)
+            session.flush()
+            bench = Exercise(name="Bench", sets=3, reps=8, workout_id=workout.id)
+            session.add(bench)
+            session.flush()
+            for days_ago in (0, 1, 14):
+                log = WorkoutLog(workout_id=workout.id, workout_date=datetime(2025, 6, 20) - timedelta(days=days_ago))
+                session.add(log)
+                session.flush()
+                session.add(ExerciseLog(exercise_id=bench.id, workout_log_id=log.id, actual_sets=3, actual_reps=8, weight=50))
+            session.commit()
+
+            rebuild_user_rollups(session, user.id)
+            session.commit()
+
+        daily, weekly = _rollups(user.id)
+        assert sorted(d.day for d in daily) == [date(2025, 6, 6), date(2025, 6, 19), date(2025, 6, 20)]
+        assert sorted((w.week_start, w.sessions) for w in weekly) == [(date(2025, 6, 2), 1), (date(2025, 6, 16), 2)]
+        assert all(w.total_volume == w.sessions * 1200 for w in weekly)
@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+from app.db import engine
+from app.main import app
+from app.search import query_terms, rebuild_search_index
+
+client = TestClient(app)
+
+
+def _search(headers, q, **params):
+    response = client.get("/api/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _hits(headers, q, **params):
+    return [(r["kind"], r["title"]) for r in _search(headers, q, **params)["results"]]
+
+
+def _workout(headers, title, notes=None, exercises=()):
+    wid = client.post("/api/workouts", json={"title": title, "notes": notes}, headers=headers).json()["id"]
+    for name, notes in exercises:
+        client.post(f"/api/workouts/{wid}/exercises", json={"name": name, "sets": 3, "reps": 8, "notes": notes},
+                    headers=headers)
+    return wid
+
+
+class TestSearch:
+    def test_finds_workouts_exercises_and_session_notes(self, user, auth_headers):
+        """Test titles, exercise names and logged notes all match, by prefix and word stem"""
+        wid = _workout(auth_headers, "Leg Day", "heavy squats", [("Bulgarian Split Squat", "slow eccentric")])
+        client.post(f"/api/workouts/{wid}/log", json={"notes": "knee felt great today"}, headers=auth_headers)
+        assert set(_hits(auth_headers, "squat")) == {("workout", "Leg Day"), ("exercise", "Bulgarian Split Squat")}
+        assert _hits(auth_headers, "bulg spl") == [("exercise", "Bulgarian Split Squat")]
+        log = _search(auth_headers, "knee")["results"]
+        assert [(r["kind"], r["workout_id"], r["workout_title"]) for r in log] == [("log", wid, "Leg Day")]
+        assert "knee felt great" in log[0]["snippet"]
+
+    def test_results_are_private_and_ranked(self, user, auth_headers):
+        """Test other users' data never matches and title hits rank above notes hits"""
+        _workout(auth_headers, "Morning run", "deadlift next time")
+        _workout(auth_headers, "Deadlift focus")
+        assert _hits(auth_headers, "deadlift") == [("workout", "Deadlift focus"), ("workout", "Morning run")]
+        # A client of its own, so the new user's cookie does not stick to the shared one
+        other = TestClient(app).post("/api/users/register", json={"email": f"other-{user.id}@example.com", "password": "secret1"})
+        assert _hits({"x-session": other.cookies["session"]}, "deadlift") == []
+
+    def test_index_follows_updates_and_deletes(self, user, auth_headers):
+        """Test triggers keep the index in step with renames, exercise edits and deletes"""
+        wid = _workout(auth_headers, "Push", exercises=[("Bench Press", None)])
+        eid = client.get(f"/api/workouts/{wid}/exercises", headers=auth_headers).json()[0]["id"]
+        client.put(f"/api/workouts/{wid}", json={"title": "Chest"}, headers=auth_headers)
+        client.put(f"/api/workouts/{wid}/exercises/{eid}", json={"name": "Incline Press"}, headers=auth_headers)
+        assert _hits(auth_headers, "push") == []
+        assert _hits(auth_headers, "incline") == [("exercise", "Incline Press")]
+        assert _hits(auth_headers, "bench") == []
+        client.delete(f"/api/workouts/{wid}", headers=auth_headers)
+        assert _hits(auth_headers, "chest") == _hits(auth_headers, "incline") == []
+
+    def test_pagination(self, user, auth_headers):
+        """Test limit and offset page through matches with next_offset until the last page"""
+        for n in range(5):
+            _workout(auth_headers, f"Circuit {n}")
+        first = _search(auth_headers, "circuit", limit=2)
+        assert len(first["results"]) == 2 and first["next_offset"] == 2
+        last = _search(auth_headers, "circuit", limit=2, offset=4)
+        assert len(last["results"]) == 1 and last["next_offset"] is None
+        pages = [r["id"] for offset in (0, 2, 4) for r in _search(auth_headers, "circuit", limit=2, offset=offset)["results"]]
+        assert len(set(pages)) == 5
+
+    def test_rebuild_and_query_syntax(self, user, auth_headers):
+        """Test a rebuilt index gives the same results and query operators are taken as words"""
+        _workout(auth_headers, "Kettlebell swings")
+        before = _hits(auth_headers, "kettle")
+        rebuild_search_index(engine)
+        assert _hits(auth_headers, "kettle") == before == [("workout", "Kettlebell swings")]
+        assert _hits(auth_headers, '"kettle* OR NEAR(') == []
+        assert query_terms("Kettle-Bell  SWINGS!") == ["kettle", "bell", "swings"]
+
+    def test_validation(self, auth_headers):
+        """Test a query is required and limits are bounded"""
+        assert client.get("/api/search", params={"q": " "}, headers=auth_headers).status_code == 400
+        assert client.get("/api/search", params={"q": "a", "limit": 0}, headers=auth_headers).status_code == 400
+        assert client.get("/api/search", params={"q": "a", "offset": -1}, headers=auth_headers).status_code == 400
+        assert TestClient(app).get("/api/search", params={"q": "a"}).status_code == 401
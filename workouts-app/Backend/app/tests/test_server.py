@@ -0,0 +1,60 @@
+import os
+import runpy
+import pytest
+from app import db, server
+
+
+@pytest.fixture
+def cgroup(tmp_path):
+    def write(relative, content):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path, write
+
+
+class TestServer:
+    def test_cgroup_v2_quota(self, cgroup):
+        """Test cpu.max quotas are read as CPUs, and 'max' means unlimited"""
+        root, write = cgroup
+        write("cpu.max", "150000 100000\n")
+        assert server.cgroup_cpu_limit(str(root)) == 1.5
+        write("cpu.max", "max 100000\n")
+        assert server.cgroup_cpu_limit(str(root)) is None
+
+    def test_cgroup_v1_quota(self, cgroup):
+        """Test the v1 CFS quota is used when there is no cpu.max"""
+        root, write = cgroup
+        write("cpu/cpu.cfs_quota_us", "50000")
+        write("cpu/cpu.cfs_period_us", "100000")
+        assert server.cgroup_cpu_limit(str(root)) == 0.5
+        write("cpu/cpu.cfs_quota_us", "-1")
+        assert server.cgroup_cpu_limit(str(root)) is None
+
+    def test_worker_count(self, cgroup, monkeypatch):
+        """Test workers follow the quota, rounded up and capped, unless WEB_CONCURRENCY is set"""
+        root, write = cgroup
+        monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+        monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+        write("cpu.max", "50000 100000")
+        assert server.worker_count(str(root)) == 1
+        write("cpu.max", "250000 100000")
+        assert server.worker_count(str(root)) == 3
+        write("cpu.max", "max 100000")
+        assert server.worker_count(str(root)) == 8
+        monkeypatch.setenv("WEB_CONCURRENCY", "5")
+        assert server.worker_count(str(root)) == 5
+
+    def test_gunicorn_config(self, monkeypatch):
+        """Test the gunicorn config reads overrides and disposes pooled connections after fork"""
+        monkeypatch.setenv("WEB_CONCURRENCY", "3")
+        monkeypatch.setenv("GUNICORN_MAX_REQUESTS", "500")
+        monkeypatch.setenv("GUNICORN_PRELOAD", "false")
+        config = runpy.run_path(os.path.join(os.path.dirname(server.__file__), "..", "gunicorn.conf.py"))
+        assert (config["workers"], config["max_requests"], config["preload_app"]) == (3, 500, False)
+        assert config["worker_class"] == "uvicorn_worker.UvicornWorker"
+
+        disposed = []
+        monkeypatch.setattr(db.engine, "dispose", lambda close=True: disposed.append(close))
+        config["post_fork"](None, None)
+        assert disposed == [False]
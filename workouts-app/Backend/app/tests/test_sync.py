@@ -0,0 +1,87 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from app.db import engine
+from app.main import app
+from app.models import Exercise, User
+
+client = TestClient(app)
+
+
+def _sync(headers, since=None):
+    response = client.get("/api/sync", params={} if since is None else {"since": since}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _ids(rows):
+    return [row["id"] for row in rows]
+
+
+def _workout(headers, title, exercises=("Squat",)):
+    wid = client.post("/api/workouts", json={"title": title}, headers=headers).json()["id"]
+    eids = [client.post(f"/api/workouts/{wid}/exercises", json={"name": name, "sets": 3, "reps": 5},
+                        headers=headers).json()["id"] for name in exercises]
+    return wid, eids
+
+
+class TestSync:
+    def test_full_then_incremental(self, user, auth_headers):
+        """Test a sync without a token returns everything, then only what changed after the token"""
+        wid, (eid,) = _workout(auth_headers, "Legs")
+        log_id = client.post(f"/api/workouts/{wid}/log", json={"notes": "ok", "exercise_logs": [
+            {"exercise_id": eid, "actual_sets": 3, "actual_reps": 5}]}, headers=auth_headers).json()["id"]
+        full = _sync(auth_headers)
+        assert (_ids(full["workouts"]), _ids(full["exercises"]), _ids(full["logs"])) == ([wid], [eid], [log_id])
+        assert len(full["logs"][0]["exercise_logs"]) == 1 and full["workouts"][0]["updated_at"]
+
+        unchanged = _sync(auth_headers, full["token"])
+        assert unchanged["token"] == full["token"]
+        assert unchanged["workouts"] == unchanged["exercises"] == unchanged["logs"] == []
+
+        client.put(f"/api/workouts/{wid}", json={"title": "Leg day"}, headers=auth_headers)
+        other, _ = _workout(auth_headers, "Arms", exercises=())
+        delta = _sync(auth_headers, full["token"])
+        assert [(w["id"], w["title"]) for w in delta["workouts"]] == [(wid, "Leg day"), (other, "Arms")]
+        assert delta["exercises"] == delta["logs"] == [] and int(delta["token"]) > int(full["token"])
+        assert _sync(auth_headers, delta["token"])["workouts"] == []
+
+    def test_deletes_leave_tombstones(self, user, auth_headers):
+        """Test deleted exercises and workouts are reported, and logs that lost exercise logs count as changed"""
+        wid, (kept, dropped) = _workout(auth_headers, "Push", exercises=("Bench", "Dips"))
+        log_id = client.post(f"/api/workouts/{wid}/log", json={"exercise_logs": [
+            {"exercise_id": kept, "actual_sets": 3}, {"exercise_id": dropped, "actual_sets": 3}]},
+            headers=auth_headers).json()["id"]
+        token = _sync(auth_headers)["token"]
+        client.delete(f"/api/workouts/{wid}/exercises/{dropped}", headers=auth_headers)
+        delta = _sync(auth_headers, token)
+        assert delta["deleted"] == {"workouts": [], "exercises": [dropped]}
+        assert [(log["id"], len(log["exercise_logs"])) for log in delta["logs"]] == [(log_id, 1)]
+        client.delete(f"/api/workouts/{wid}", headers=auth_headers)
+        delta = _sync(auth_headers, delta["token"])
+        assert delta["deleted"] == {"workouts": [wid], "exercises": []} and delta["workouts"] == []
+
+    def test_every_write_path_is_tracked(self, user, auth_headers):
+        """Test bulk edits and template instances show up, each transaction taking one change number"""
+        wid, (eid,) = _workout(auth_headers, "Full body")
+        token = _sync(auth_headers)["token"]
+        replaced = client.put(f"/api/workouts/{wid}/exercises", headers=auth_headers,
+                              json=[{"id": eid, "reps": 8}, {"name": "Row", "sets": 3, "reps": 10}]).json()
+        with Session(engine) as session:
+            assert session.get(User, user.id).sync_seq == int(token) + 1
+            stamped = session.exec(select(Exercise.change_seq).where(Exercise.workout_id == wid)).all()
+            assert set(stamped) == {int(token) + 1}
+        template = client.post("/api/templates", json={"name": "Mine", "exercises": [
+            {"name": "Deadlift", "sets": 5, "reps": 3}, {"name": "Pull-up", "sets": 3, "reps": 8}]}, headers=auth_headers).json()
+        created = client.post(f"/api/templates/{template['id']}/instantiate", json={}, headers=auth_headers).json()
+        delta = _sync(auth_headers, token)
+        assert _ids(delta["workouts"]) == [created["id"]]
+        assert _ids(delta["exercises"]) == _ids(replaced["exercises"]) + _ids(created["exercises"])
+
+    def test_tokens(self, user, auth_headers):
+        """Test malformed tokens are rejected and unknown ones reset the client to a full copy"""
+        wid, _ = _workout(auth_headers, "Reset")
+        assert client.get("/api/sync", params={"since": "abc"}, headers=auth_headers).status_code == 400
+        reset = _sync(auth_headers, "999999")
+        assert reset["reset"] is True and _ids(reset["workouts"]) == [wid]
+        assert _sync(auth_headers)["reset"] is False
+        assert client.get("/api/sync").status_code == 401
@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+from app.db import engine
+from app.main import app
+from app.workout_templates import seed_templates
+
+client = TestClient(app)
+
+
+def _builtin(auth_headers, slug="full-body-beginner"):
+    with Session(engine) as session:
+        seed_templates(session)
+    templates = client.get("/api/templates", headers=auth_headers).json()
+    return next(t for t in templates if t["slug"] == slug)
+
+
+class TestTemplates:
+    def test_builtins_listed(self, auth_headers):
+        """Test seeded built-in templates are served"""
+        template = _builtin(auth_headers)
+        assert template["builtin"] is True
+        assert len(template["exercises"]) == 5
+        assert client.get(f"/api/templates/{template['id']}", headers=auth_headers).json()["name"] == template["name"]
+
+    def test_instantiate_single_commit(self, auth_headers):
+        """Test instantiating creates the workout and every exercise in one transaction"""
+        template = _builtin(auth_headers)
+        commits = []
+        listener = lambda conn: commits.append(1)
+        event.listen(engine, "commit", listener)
+        try:
+            response = client.post(f"/api/templates/{template['id']}/instantiate", json={"title": "Monday"},
+                                   headers=auth_headers)
+        finally:
+            event.remove(engine, "commit", listener)
+        assert response.status_code == 200
+        assert len(commits) == 1
+        workout = response.json()
+        assert workout["title"] == "Monday"
+        assert [e["name"] for e in workout["exercises"]] == [e["name"] for e in template["exercises"]]
+        assert all(e["id"] and e["canonical_id"] for e in workout["exercises"])
+
+        listed = client.get("/api/workouts", headers=auth_headers).json()
+        assert any(w["id"] == workout["id"] and len(w["exercises"]) == 5 for w in listed)
+
+    def test_instantiate_cost_does_not_grow_with_exercises(self, auth_headers, query_log):
+        """Test a template's exercises, new canonical names included, cost the same statements however many"""
+        counts = []
+        for size in (2, 10):
+            exercises = [{"name": f"Cable Move {size}-{i}", "sets": 3, "reps": 10} for i in range(size)]
+            template = client.post("/api/templates", json={"name": f"Cables {size}", "exercises": exercises},
+                                   headers=auth_headers).json()
+            with query_log.capture() as statements:
+                response = client.post(f"/api/templates/{template['id']}/instantiate", json={}, headers=auth_headers)
+            assert len(response.json()["exercises"]) == size
+            counts.append(len(statements))
+        assert counts[0] == counts[1]
+
+    def test_custom_template_crud(self, auth_headers):
+        """Test users can create, update and delete their own templates but not built-ins"""
+        body = {"name": "Mine", "difficulty": "advanced",
+                "exercises": [{"name": "Deadlift", "sets": 5, "reps": 3}]}
+        created = client.post("/api/templates", json=body, headers=auth_headers).json()
+        assert created["builtin"] is False
+        tid = created["id"]
+
+        updated = client.put(f"/api/templates/{tid}", json={"name": "Mine v2"}, headers=auth_headers).json()
+        assert updated["name"] == "Mine v2"
+        assert client.post("/api/templates", json={"name": "Bad", "exercises": [{"name": "x"}]},
+                           headers=auth_headers).status_code == 400
+
+        builtin = _builtin(auth_headers)
+        assert client.delete(f"/api/templates/{builtin['id']}", headers=auth_headers).status_code == 403
+        assert client.delete(f"/api/templates/{tid}", headers=auth_headers).status_code == 200
+        assert client.get(f"/api/templates/{tid}", headers=auth_headers).status_code == 404
+
+    def test_invalid_fields_rejected(self, auth_headers):
+        """Test malformed or null optional fields return 400 instead of a database error"""
+        body = {"name": "Checked", "exercises": [{"name": "Row", "sets": 3, "reps": 8}]}
+        tid = client.post("/api/templates", json={**body, "duration": 40, "tags": ["pull"]},
+                          headers=auth_headers).json()["id"]
+        for bad in ({"description": None}, {"category": 3}, {"duration": "abc"}, {"duration": -5},
+                    {"duration": True}, {"equipment": None}, {"tags": "pull"}, {"tags": [1]}):
+            assert client.post("/api/templates", json={**body, **bad}, headers=auth_headers).status_code == 400, bad
+            assert client.put(f"/api/templates/{tid}", json=bad, headers=auth_headers).status_code == 400, bad
+        template = client.get(f"/api/templates/{tid}", headers=auth_headers).json()
+        assert (template["duration"], template["tags"], template["description"]) == (40, ["pull"], "")
@@ -0,0 +1,93 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.tracing import (FileExporter, InMemoryExporter, Tracer, parse_traceparent, set_tracer, SERVER,
+                         STATUS_ERROR)
+from benchmarks.run import stub_groq
+
+client = TestClient(app)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def spans():
+    exporter = InMemoryExporter()
+    set_tracer(Tracer(exporter))
+    yield exporter
+    set_tracer(None)
+
+
+class TestTracing:
+    def test_parse_traceparent(self):
+        """Test W3C traceparent parsing rejects malformed and all-zero ids"""
+        parent = parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01")
+        assert (parent.trace_id, parent.span_id, parent.sampled) == (TRACE_ID, PARENT_ID, True)
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00").sampled is False
+        assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+        assert parse_traceparent(f"ff-{TRACE_ID}-{PARENT_ID}-01") is None
+        assert parse_traceparent("garbage") is None
+
+    def test_request_spans_continue_incoming_trace(self, spans, auth_headers):
+        """Test a request yields a server span with auth and SQL children in the caller's trace"""
+        response = client.get("/api/workouts", headers={**auth_headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+        assert response.status_code == 200
+        [server] = [s for s in spans.spans if s.kind == SERVER]
+        assert server.name == "GET /api/workouts"
+        assert server.parent_id == PARENT_ID
+        assert server.attributes["http.response.status_code"] == 200
+        [auth] = spans.find("auth.require_user")
+        assert auth.parent_id == server.span_id
+        queries = [s for s in spans.spans if s.name.startswith("db.")]
+        assert queries and all(s.attributes["db.statement"] for s in queries)
+        assert {s.parent_id for s in queries} <= {server.span_id, auth.span_id}
+        assert {s.trace_id for s in spans.spans} == {TRACE_ID}
+
+    def test_route_template_and_errors(self, spans, auth_headers):
+        """Test server spans are named by route template and auth failures are marked as errors"""
+        client.get("/api/workouts/999999", headers=auth_headers)
+        client.get("/api/workouts")
+        names = [s.name for s in spans.spans if s.kind == SERVER]
+        assert names == ["GET /api/workouts/{wid}", "GET /api/workouts"]
+        [failed] = [s for s in spans.find("auth.require_user") if s.status == STATUS_ERROR]
+        assert "Authentication required" in failed.status_message
+
+    def test_sampling(self, auth_headers):
+        """Test ratio sampling drops new traces but honours a sampled parent"""
+        exporter = InMemoryExporter()
+        set_tracer(Tracer(exporter, sample_ratio=0.0))
+        try:
+            client.get("/api/workouts", headers=auth_headers)
+            assert len(exporter.spans) == 0
+            client.get("/api/workouts", headers={**auth_headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+            assert exporter.find("GET /api/workouts")
+        finally:
+            set_tracer(None)
+
+    def test_ai_generate_and_save_breakdown(self, spans, auth_headers):
+        """Test AI generation records Groq, parsing and insert spans"""
+        with stub_groq():
+            response = client.post("/api/workouts/ai-generate-and-save", json={"workout_type": "strength"},
+                                   headers=auth_headers)
+        assert response.status_code == 200
+        [generate] = spans.find("ai.generate_workout")
+        [groq] = spans.find("groq.chat.completions")
+        [parse] = spans.find("ai.parse_response")
+        assert groq.parent_id == generate.span_id and parse.parent_id == generate.span_id
+        assert spans.find("db.insert")
+
+    def test_file_exporter_writes_otlp_json(self, tmp_path):
+        """Test the file exporter writes OTLP/JSON resource spans"""
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(FileExporter(str(path), service_name="test"))
+        with tracer.span("outer", {"n": 1}):
+            with tracer.span("inner"):
+                pass
+        batches = [json.loads(line) for line in path.read_text().splitlines()]
+        exported = [s for b in batches for s in b["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+        assert [s["name"] for s in exported] == ["inner", "outer"]
+        assert exported[0]["parentSpanId"] == exported[1]["spanId"]
+        assert exported[1]["attributes"] == [{"key": "n", "value": {"intValue": "1"}}]
+        assert batches[0]["resourceSpans"][0]["resource"]["attributes"][0]["value"] == {"stringValue": "test"}
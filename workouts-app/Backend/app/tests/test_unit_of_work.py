@@ -0,0 +1,86 @@
+import contextlib
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+from app.db import engine
+from app.main import app
+from app.models import Workout
+from app.read_models import ExerciseRow, WorkoutRow
+from app.unit_of_work import UnitOfWork, model_defaults
+
+client = TestClient(app)
+
+
+@contextlib.contextmanager
+def commits():
+    """Number of session commits while the block runs"""
+    count = []
+    listener = lambda session: count.append(1)
+    event.listen(OrmSession, "after_commit", listener)
+    try:
+        yield count
+    finally:
+        event.remove(OrmSession, "after_commit", listener)
+
+
+class TestUnitOfWork:
+    def test_defaults_fill_what_core_statements_skip(self):
+        """Test Python-side defaults are applied, required fields and the primary key left out"""
+        row = model_defaults(Workout, {"title": "t", "owner_id": 1})
+        assert row["notes"] is None and row["created_at"] is not None
+        assert "id" not in row
+
+    def test_batch_insert_returns_rows_in_order(self, user, query_log):
+        """Test a multi-row insert is one statement whose rows come back in parameter order"""
+        with Session(engine) as session:
+            uow = UnitOfWork(session)
+            workout = uow.insert_one(WorkoutRow, title="Batch", owner_id=user.id)
+            names = [f"Move {n}" for n in range(5)]
+            with query_log.capture() as statements:
+                exercises = uow.insert(ExerciseRow, [
+                    {"name": name, "sets": 3, "reps": 8, "workout_id": workout.id, "position": n}
+                    for n, name in enumerate(names)
+                ])
+            uow.commit()
+        assert len(statements) == 1 and "RETURNING" in statements[0][0]
+        assert [e.name for e in exercises] == names
+        assert all(e.id and e.rest_seconds == 60 and e.created_at for e in exercises)
+        assert UnitOfWork(None).insert(ExerciseRow, []) == []
+
+    def test_update_returns_the_new_row(self, user):
+        """Test UPDATE .. RETURNING gives the changed row, or None when nothing matched"""
+        with Session(engine) as session:
+            uow = UnitOfWork(session)
+            workout = uow.insert_one(WorkoutRow, title="Before", owner_id=user.id)
+            updated = uow.update(WorkoutRow, [Workout.id == workout.id], {"title": "After"})
+            assert (updated.id, updated.title, updated.created_at) == (workout.id, "After", workout.created_at)
+            assert uow.update(WorkoutRow, [Workout.id == workout.id, Workout.owner_id == -1], {"title": "x"}) is None
+            uow.commit()
+
+    def test_writes_commit_once_without_reading_back(self, user, auth_headers, query_log):
+        """Test logging a workout is one transaction with no SELECT of the rows it created"""
+        wid = client.post("/api/workouts", json={"title": "Once"}, headers=auth_headers).json()["id"]
+        eid = client.post(f"/api/workouts/{wid}/exercises", json={"name": "Squat", "sets": 3, "reps": 5},
+                          headers=auth_headers).json()["id"]
+        with commits() as count, query_log.capture() as statements:
+            response = client.post(f"/api/workouts/{wid}/log", json={"notes": "ok", "exercise_logs": [
+                {"exercise_id": eid, "actual_sets": 3, "actual_reps": 5}]}, headers=auth_headers)
+        assert response.status_code == 200
+        assert len(count) == 1
+        assert not [s for s, _, _ in statements if s.lstrip().upper().startswith("SELECT") and "FROM workoutlog" in s
+                    and "WHERE workoutlog.id" in s]
+        logs = client.get(f"/api/workouts/{wid}/logs", headers=auth_headers).json()
+        assert [(log["id"], log["notes"], len(log["exercise_logs"])) for log in logs] == [(response.json()["id"], "ok", 1)]
+
+    def test_update_keeps_unsent_fields(self, user, auth_headers):
+        """Test partial updates only change the fields sent, and unknown ids are 404"""
+        wid = client.post("/api/workouts", json={"title": "Keep", "notes": "mine"}, headers=auth_headers).json()["id"]
+        updated = client.put(f"/api/workouts/{wid}", json={"title": "Kept"}, headers=auth_headers).json()
+        assert (updated["title"], updated["notes"]) == ("Kept", "mine")
+        assert client.put(f"/api/workouts/{wid}", json={}, headers=auth_headers).json()["title"] == "Kept"
+        assert client.put("/api/workouts/0", json={"title": "x"}, headers=auth_headers).status_code == 404
+        eid = client.post(f"/api/workouts/{wid}/exercises", json={"name": "Row", "sets": 3, "reps": 8},
+                          headers=auth_headers).json()["id"]
+        exercise = client.put(f"/api/workouts/{wid}/exercises/{eid}", json={"reps": 10}, headers=auth_headers).json()
+        assert (exercise["name"], exercise["sets"], exercise["reps"]) == ("Row", 3, 10)
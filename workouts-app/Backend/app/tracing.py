@@ -0,0 +1,475 @@
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from starlette.datastructures import Headers
+
+
+# OTLP span kinds and status codes
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+MAX_STATEMENT_LENGTH = 1000
+
+_current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation; ended spans are handed to the tracer's exporter"""
+    recording = True
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "sampled", "kind",
+                 "attributes", "events", "status", "status_message", "start_ns", "end_ns")
+
+    def __init__(self, tracer, name: str, trace_id: str, span_id: str, parent_id: Optional[str],
+                 kind: int = INTERNAL, attributes: Optional[dict] = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.sampled = True
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.events: List[Tuple[str, int, dict]] = []
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.events.append(("exception", time.time_ns(), {
+            "exception.type": type(exc).__name__,
+            "exception.message": str(exc)[:500],
+        }))
+        self.set_error(f"{type(exc).__name__}: {exc}"[:500])
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer._export(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+class NonRecordingSpan:
+    """Carries trace context for unsampled requests; records nothing"""
+    recording = False
+    name = None
+
+    def __init__(self, trace_id: Optional[str] = None, span_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_error(self, message):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+    def end(self):
+        pass
+
+    @property
+    def traceparent(self) -> Optional[str]:
+        return f"00-{self.trace_id}-{self.span_id}-00" if self.trace_id else None
+
+
+NOOP_SPAN = NonRecordingSpan()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[NonRecordingSpan]:
+    """Remote parent from a W3C ``traceparent`` header, or None if absent or malformed"""
+    if not value:
+        return None
+    match = TRACEPARENT_RE.match(value.strip().lower())
+    if not match:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    parent = NonRecordingSpan(trace_id, span_id)
+    parent.sampled = bool(int(flags, 16) & 0x01)
+    return parent
+
+
+def current_span():
+    return _current.get()
+
+
+class InMemoryExporter:
+    """Keeps the most recent spans in memory, for tests and debugging"""
+
+    def __init__(self, max_spans: int = 10_000):
+        self.spans = deque(maxlen=max_spans)
+
+    def export(self, spans: Iterable[Span]) -> None:
+        self.spans.extend(spans)
+
+    def find(self, name: str) -> List[Span]:
+        return [s for s in list(self.spans) if s.name == name]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> List[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp_json(spans: Iterable[Span], service_name: str) -> dict:
+    """Spans as an OTLP/JSON ExportTraceServiceRequest"""
+    encoded = []
+    for s in spans:
+        span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": s.kind,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": _otlp_attributes(s.attributes),
+            "status": {"code": s.status, **({"message": s.status_message} if s.status_message else {})},
+        }
+        if s.parent_id:
+            span["parentSpanId"] = s.parent_id
+        if s.events:
+            span["events"] = [{"name": name, "timeUnixNano": str(ts), "attributes": _otlp_attributes(attrs)}
+                              for name, ts, attrs in s.events]
+        encoded.append(span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+        "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": encoded}],
+    }]}
+
+
+class FileExporter:
+    """Appends one OTLP/JSON request per batch to a file, as read by the collector's otlpjsonfile receiver"""
+
+    def __init__(self, path: str, service_name: str = "workouts-backend"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: Iterable[Span]) -> None:
+        line = json.dumps(to_otlp_json(spans, self.service_name), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OTLPHttpExporter:
+    """POSTs OTLP/JSON to a collector; failures are reported once and the batch dropped"""
+
+    def __init__(self, endpoint: str, service_name: str = "workouts-backend", timeout: float = 5.0,
+                 headers: Optional[Dict[str, str]] = None):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self._warned = False
+
+    def export(self, spans: Iterable[Span]) -> None:
+        body = json.dumps(to_otlp_json(spans, self.service_name), separators=(",", ":")).encode("utf-8")
+        request = urllib.request.Request(self.endpoint, data=body, headers=self.headers, method="POST")
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            if not self._warned:
+                self._warned = True
+                print(f"WARNING: trace export to {self.endpoint} failed: {e}", file=sys.stderr)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchExporter:
+    """Queues spans and exports them from a background thread, so requests never wait on I/O.
+
+    Spans beyond ``max_queue`` are dropped rather than blocking the caller.
+    """
+
+    def __init__(self, exporter, max_queue: int = 4096, batch_size: int = 512, interval: float = 2.0):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, spans: Iterable[Span]) -> None:
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+
+    def _drain(self) -> List[Span]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> None:
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                print(f"WARNING: trace export failed: {e}", file=sys.stderr)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self.flush()
+        self.exporter.shutdown()
+
+
+class Tracer:
+    """Creates spans and hands finished, sampled ones to ``exporter``.
+
+    With no exporter every span is a no-op. Sampling is parent-based: a
+    sampled flag from an incoming ``traceparent`` is honoured, and new
+    traces are kept with probability ``sample_ratio``.
+    """
+
+    def __init__(self, exporter=None, sample_ratio: float = 1.0, service_name: str = "workouts-backend"):
+        self.exporter = exporter
+        self.sample_ratio = max(0.0, min(1.0, sample_ratio))
+        self.service_name = service_name
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _sample(self, trace_id: str) -> bool:
+        # Derived from the trace id so every service keeps or drops the same traces
+        return int(trace_id[16:], 16) < self.sample_ratio * (1 << 64)
+
+    def start_span(self, name: str, attributes: Optional[dict] = None, kind: int = INTERNAL, parent=None):
+        """Start a span under ``parent``, or the current span; the caller must end it"""
+        if self.exporter is None:
+            return NOOP_SPAN
+        if parent is None:
+            parent = _current.get()
+        if parent is not None and parent.trace_id:
+            if not parent.sampled:
+                return parent if isinstance(parent, NonRecordingSpan) else NonRecordingSpan(parent.trace_id, parent.span_id)
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            if not self._sample(trace_id):
+                return NonRecordingSpan(trace_id, f"{random.getrandbits(64):016x}")
+        return Span(self, name, trace_id, f"{random.getrandbits(64):016x}", parent_id, kind, attributes)
+
+    @contextlib.contextmanager
+    def span(self, name: str, attributes: Optional[dict] = None, kind: int = INTERNAL, parent=None):
+        """Run the block inside a new current span, recording any exception on it"""
+        span = self.start_span(name, attributes, kind, parent)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current.reset(token)
+            span.end()
+
+    def _export(self, span: Span) -> None:
+        try:
+            self.exporter.export((span,))
+        except Exception as e:
+            print(f"WARNING: trace export failed: {e}", file=sys.stderr)
+
+
+def build_tracer() -> Tracer:
+    """Tracer configured from TRACE_EXPORTER (none, memory, file or otlp) and TRACE_SAMPLE_RATIO"""
+    service_name = os.getenv("TRACE_SERVICE_NAME", "workouts-backend")
+    try:
+        ratio = float(os.getenv("TRACE_SAMPLE_RATIO", "1.0"))
+    except ValueError:
+        ratio = 1.0
+    kind = os.getenv("TRACE_EXPORTER", "none").lower()
+    if kind == "memory":
+        exporter = InMemoryExporter()
+    elif kind == "file":
+        path = os.getenv("TRACE_FILE") or os.path.join(os.getenv("DATA_DIR", "."), "traces.jsonl")
+        exporter = BatchExporter(FileExporter(path, service_name))
+    elif kind == "otlp":
+        endpoint = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+        exporter = BatchExporter(OTLPHttpExporter(endpoint, service_name))
+    elif kind in ("", "none"):
+        exporter = None
+    else:
+        raise RuntimeError(f"Unknown TRACE_EXPORTER {kind!r}; expected none, memory, file or otlp")
+    return Tracer(exporter, ratio, service_name)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    # Built lazily so the exporter thread starts in the serving process
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = build_tracer()
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def span(name: str, attributes: Optional[dict] = None, kind: int = INTERNAL):
+    """``with span("name"):`` on the configured tracer"""
+    return get_tracer().span(name, attributes, kind)
+
+
+def traced(name: str):
+    """Decorator wrapping every call of a function in a span"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_engine(engine) -> None:
+    """Record a client span for every SQL statement run on ``engine``"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        parent = _current.get()
+        if parent is None or not parent.recording:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        span = parent.tracer.start_span(f"db.{operation.lower() or 'query'}", {
+            "db.system": conn.dialect.name,
+            "db.operation": operation,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            "db.executemany": executemany,
+        }, CLIENT, parent)
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            span = spans.pop()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            span = spans.pop()
+            span.record_exception(exception_context.original_exception)
+            span.end()
+
+
+class TracingMiddleware:
+    """Wraps each HTTP request in a server span, continuing the caller's W3C trace context.
+
+    The span is renamed to the matched route template once routing has run,
+    so ``GET /api/workouts/{wid}`` groups every workout id together.
+    """
+
+    def __init__(self, app, tracer: Optional[Tracer] = None):
+        self.app = app
+        self._tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        tracer = self._tracer or get_tracer()
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        parent = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        attributes = {"http.request.method": method, "url.path": scope["path"]}
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        # An unsampled remote parent keeps the whole request unsampled
+        with tracer.span(f"{method} {scope['path']}", attributes, SERVER, parent) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if span.recording and getattr(route, "path", None):
+                    span.name = f"{method} {route.path}"
+                    span.set_attribute("http.route", route.path)
+                if status is not None:
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_error(f"HTTP {status}")
@@ -0,0 +1,64 @@
+"""Write path: statements that return what the handler needs, and one commit.
+
+The ORM way to create a row is add, commit, refresh: the INSERT, a
+COMMIT that expires every loaded attribute, and a SELECT to read the
+row back. ``UnitOfWork`` issues ``INSERT ... RETURNING`` and
+``UPDATE ... RETURNING`` instead (Postgres, and SQLite 3.35+), so ids
+and defaults come back with the statement that created them, as the
+row types of ``app.read_models``. Multi-row inserts go out as one
+batch, and the request commits once at the end.
+"""
+from typing import Iterable, List, NamedTuple, Optional, Type
+from fastapi import Depends
+from sqlalchemy import insert, update
+from sqlmodel import Session
+from .db import get_session
+from .read_models import ROW_MODELS, columns
+
+
+def model_defaults(model, values: dict) -> dict:
+    """``values`` completed with the model's Python-side defaults, which Core statements do not apply"""
+    row = {}
+    for name, field in model.model_fields.items():
+        if name in values:
+            row[name] = values[name]
+        elif not field.is_required() and name not in model.__table__.primary_key.columns:
+            row[name] = field.get_default(call_default_factory=True)
+    return row
+
+
+class UnitOfWork:
+    """The request's writes, on its session; nothing is visible to others until ``commit()``"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def insert(self, row_type: Type[NamedTuple], rows: Iterable[dict]) -> List[NamedTuple]:
+        """Insert ``rows`` in one batch; the created rows come back in the same order"""
+        model = ROW_MODELS[row_type]
+        params = [model_defaults(model, row) for row in rows]
+        if not params:
+            return []
+        # sort_by_parameter_order would make SQLite send one INSERT per row; a single
+        # multi-row INSERT hands out autoincrement ids in VALUES order, so sort by id instead
+        statement = insert(model).returning(*columns(row_type))
+        created = [row_type._make(row) for row in self.session.execute(statement, params)]
+        return sorted(created, key=lambda row: row.id)
+
+    def insert_one(self, row_type: Type[NamedTuple], **values) -> NamedTuple:
+        return self.insert(row_type, [values])[0]
+
+    def update(self, row_type: Type[NamedTuple], where: list, values: dict) -> Optional[NamedTuple]:
+        """Apply ``values`` to the single row matching ``where``; None when nothing matched"""
+        model = ROW_MODELS[row_type]
+        statement = update(model).where(*where).values(**values).returning(*columns(row_type))
+        row = self.session.execute(statement, execution_options={"synchronize_session": False}).first()
+        return None if row is None else row_type._make(row)
+
+    def commit(self) -> None:
+        self.session.commit()
+
+
+def get_unit_of_work(session=Depends(get_session)) -> UnitOfWork:
+    # Same session as require_user, so writes still pin the user's reads to the primary
+    return UnitOfWork(session)
@@ -0,0 +1,59 @@
+import json
+import os
+from typing import List, Optional, Tuple
+from sqlmodel import Session, select
+from .canonical import resolve_canonical_many
+from .models import WorkoutTemplate
+from .read_models import ExerciseRow, WorkoutRow
+from .sync import stamp
+from .db import insert_or_ignore
+from .unit_of_work import UnitOfWork, model_defaults
+
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), "data", "workout_templates.json")
+
+
+def seed_templates(session: Session, path: str = TEMPLATES_PATH) -> int:
+    """Insert built-in templates from the JSON data file that are not in the table yet.
+
+    Safe to run from several processes at once, like ``seed_catalog``.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    existing = set(session.exec(select(WorkoutTemplate.slug).where(WorkoutTemplate.slug.is_not(None))).all())
+    missing = [model_defaults(WorkoutTemplate, item) for item in data if item["slug"] not in existing]
+    if not missing:
+        return 0
+    added = session.execute(
+        insert_or_ignore(session.get_bind(), WorkoutTemplate, ["slug"]).returning(WorkoutTemplate.id), missing).all()
+    session.commit()
+    return len(added)
+
+
+def instantiate_template(uow: UnitOfWork, template, owner_id: int, title: Optional[str] = None,
+                         notes: Optional[str] = None) -> Tuple[WorkoutRow, List[ExerciseRow]]:
+    """Create a workout and all of its exercises from a template.
+
+    The exercises' canonical ids are resolved together, the workout's
+    INSERT .. RETURNING gives its id, then every exercise goes in with one
+    multi-row INSERT .. RETURNING. Does not commit.
+    """
+    changed = stamp(uow.session, owner_id)
+    workout = uow.insert_one(WorkoutRow, title=title or template.name,
+                             notes=template.description if notes is None else notes, owner_id=owner_id, **changed)
+    canonical_ids = resolve_canonical_many(uow.session, [item["name"] for item in template.exercises])
+    exercises = uow.insert(ExerciseRow, [
+        {
+            "name": item["name"],
+            "sets": item["sets"],
+            "reps": item["reps"],
+            "rest_seconds": item.get("rest_seconds", 60),
+            "notes": item.get("notes"),
+            "workout_id": workout.id,
+            "canonical_id": canonical_ids[item["name"]],
+            "position": position,
+            **changed,
+        }
+        for position, item in enumerate(template.exercises)
+    ])
+    return workout, exercises
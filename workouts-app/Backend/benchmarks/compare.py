@@ -0,0 +1,71 @@
+"""Compare two benchmark result files, e.g. from the base and head commits of a change.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.2
+
+Exits non-zero when an endpoint's p95 latency grows by more than the
+threshold, its throughput drops by more than the threshold, or it
+issues more queries per request than before.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional, Tuple
+
+
+def _change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before
+
+
+def compare(base: dict, head: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """(report lines, regressions) for endpoints present in both results"""
+    lines = [f"{'endpoint':<48} {'p95 base':>9} {'p95 head':>9} {'Δp95':>7} {'Δrps':>7} {'queries':>11}"]
+    regressions = []
+    for name, after in head["endpoints"].items():
+        before = base["endpoints"].get(name)
+        if before is None:
+            lines.append(f"{name:<48} {'(new)':>9}")
+            continue
+        p95_change = _change(before["latency_ms"]["p95"], after["latency_ms"]["p95"])
+        rps_change = _change(before["rps"], after["rps"])
+        q_before, q_after = before["queries_per_request"], after["queries_per_request"]
+        pct = lambda value: "-" if value is None else f"{value:+.0%}"
+        lines.append(f"{name:<48} {before['latency_ms']['p95']:>9.2f} {after['latency_ms']['p95']:>9.2f} "
+                     f"{pct(p95_change):>7} {pct(rps_change):>7} {q_before!s:>5}→{q_after!s:<5}")
+        if p95_change is not None and p95_change > threshold:
+            regressions.append(f"{name}: p95 {pct(p95_change)}")
+        if rps_change is not None and rps_change < -threshold:
+            regressions.append(f"{name}: throughput {pct(rps_change)}")
+        if q_before is not None and q_after is not None and q_after > q_before:
+            regressions.append(f"{name}: queries per request {q_before} → {q_after}")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} → {after['errors']}")
+    return lines, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative latency/throughput change")
+    args = parser.parse_args(argv)
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    print(f"base {base['meta'].get('commit')}  head {head['meta'].get('commit')}")
+    for key in ("database", "requests", "concurrency", "seed"):
+        if base["meta"].get(key) != head["meta"].get(key):
+            print(f"warning: runs differ in {key}: {base['meta'].get(key)} vs {head['meta'].get(key)}")
+    lines, regressions = compare(base, head, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Writes needed to log live sessions set by set: a transaction per set against the buffer.
+
+Usage, from Backend/:
+
+    python -m benchmarks.live_sessions                     # fresh SQLite database
+    python -m benchmarks.live_sessions --sessions 5000 --sets 20 --output live.json
+
+Every session logs ``--sets`` sets, and in each round every open session
+finishes one set. ``per set`` writes each set in its own transaction as
+it arrives. ``buffered`` records the sets in ``app.live_sessions`` and
+flushes after every round, which is the worst case for the buffer, as
+each flush then holds a set from every session. Opening and completing a
+session is one transaction in either design and is left out of the
+counts.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from typing import Dict
+
+from .run import configure_database
+from .seed import SeedConfig, seed
+
+
+@contextlib.contextmanager
+def counted(engine):
+    """Statements and commits sent through ``engine`` while the block runs"""
+    from sqlalchemy import event
+    counts = {"statements": 0, "commits": 0}
+
+    def statement(*args):
+        counts["statements"] += 1
+
+    def commit(conn):
+        counts["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", statement)
+    event.listen(engine, "commit", commit)
+    started = time.perf_counter()
+    try:
+        yield counts
+    finally:
+        counts["seconds"] = round(time.perf_counter() - started, 3)
+        event.remove(engine, "before_cursor_execute", statement)
+        event.remove(engine, "commit", commit)
+
+
+def per_set(engine, user_id: int, workout_id: int, exercise_id: int, sessions: int, sets: int) -> dict:
+    from sqlmodel import Session
+    from app.read_models import ExerciseLogRow, WorkoutLogRow
+    from app.unit_of_work import UnitOfWork
+    with Session(engine) as session:
+        uow = UnitOfWork(session)
+        logs = uow.insert(WorkoutLogRow, [{"workout_id": workout_id} for _ in range(sessions)])
+        uow.commit()
+        with counted(engine) as counts:
+            for _ in range(sets):
+                for log in logs:
+                    uow.insert_one(ExerciseLogRow, exercise_id=exercise_id, workout_log_id=log.id,
+                                   actual_sets=1, actual_reps=5, weight=100.0)
+                    uow.commit()
+    return counts
+
+
+def buffered(engine, user_id: int, workout_id: int, exercise_id: int, sessions: int, sets: int) -> dict:
+    from app.live_sessions import LiveSessionBuffer, parse_set
+    buffer = LiveSessionBuffer(engine, interval=3600, max_buffered=sessions * sets + 1)
+    active = [buffer.start_session(user_id, workout_id) for _ in range(sessions)]
+    with counted(engine) as counts:
+        for seq in range(1, sets + 1):
+            for session in active:
+                buffer.record(session, *parse_set({"seq": seq, "exercise_id": exercise_id, "reps": 5, "weight": 100.0},
+                                                  session.exercise_ids))
+            buffer.flush()
+    return counts
+
+
+def run(engine, user, sessions: int, sets: int) -> Dict[str, dict]:
+    workout_id = user.workout_ids[0]
+    exercise_id = user.exercise_ids[workout_id][0]
+    results = {
+        "per set": per_set(engine, user.id, workout_id, exercise_id, sessions, sets),
+        "buffered": buffered(engine, user.id, workout_id, exercise_id, sessions, sets),
+    }
+    before, after = results["per set"], results["buffered"]
+    results["commits_saved_pct"] = round(100 * (1 - after["commits"] / before["commits"]), 1)
+    results["statements_saved_pct"] = round(100 * (1 - after["statements"] / before["statements"]), 1)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare per-set transactions with buffered live session writes")
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--sessions", type=int, default=1000, help="concurrent live sessions")
+    parser.add_argument("--sets", type=int, default=10, help="sets logged per session")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    args = parser.parse_args(argv)
+
+    configure_database(args.database_url)
+    from app.db import engine, init_db
+    init_db()
+    user = seed(engine, SeedConfig(users=1, workouts_per_user=1, exercises_per_workout=1, logs_per_user=0))[0]
+    results = run(engine, user, args.sessions, args.sets)
+
+    print(f"{'mode':<10} {'statements':>11} {'commits':>8} {'seconds':>8}")
+    for mode in ("per set", "buffered"):
+        r = results[mode]
+        print(f"{mode:<10} {r['statements']:>11} {r['commits']:>8} {r['seconds']:>8}")
+    print(f"\ncommits saved {results['commits_saved_pct']}%, statements saved {results['statements_saved_pct']}%")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"sessions": args.sessions, "sets": args.sets, **results}, f, indent=2)
+        print(f"\nWrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""ORM entities against column-only read rows, per 1,000 rows fetched and serialized.
+
+Usage, from Backend/:
+
+    python -m benchmarks.read_models                      # fresh SQLite database
+    python -m benchmarks.read_models --logs 2000 --repeat 20 --output read_models.json
+
+Each case runs the same query two ways, the way GET handlers used to
+(``select(Model)``, instances held in the session's identity map) and the
+way they do now (``app.read_models``), and turns every row into a dict.
+CPU time is the median over ``--repeat`` runs; peak memory is measured
+in a separate run under tracemalloc, which would otherwise skew timing.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from .run import configure_database
+from .seed import SeedConfig, seed
+
+
+def _readers(engine, user_id: int) -> Dict[str, Tuple[Callable[[], List[dict]], Callable[[], List[dict]]]]:
+    """case -> (ORM reader, read-row reader), each returning the serialized rows"""
+    from sqlmodel import Session, select
+    from app.models import Exercise, ExerciseLog, Workout, WorkoutLog
+    from app.read_models import ExerciseLogRow, WorkoutLogRow, columns, fetch, select_rows
+
+    def owned(statement):
+        return statement.join(Workout, WorkoutLog.workout_id == Workout.id).where(Workout.owner_id == user_id)
+
+    def owned_exercise_logs(statement):
+        return owned(statement.join(WorkoutLog, ExerciseLog.workout_log_id == WorkoutLog.id))
+
+    def as_dict(entity, row_type) -> dict:
+        return {name: getattr(entity, name) for name in row_type._fields}
+
+    def reader(build):
+        def read():
+            with Session(engine) as session:
+                return build(session)
+        return read
+
+    width = len(ExerciseLogRow._fields)
+    return {
+        "workout logs": (
+            reader(lambda session: [as_dict(log, WorkoutLogRow) for log in session.exec(owned(select(WorkoutLog)))]),
+            reader(lambda session: [row._asdict() for row in fetch(session, WorkoutLogRow, owned(select_rows(WorkoutLogRow)))]),
+        ),
+        "exercise logs": (
+            reader(lambda session: [as_dict(log, ExerciseLogRow)
+                                    for log in session.exec(owned_exercise_logs(select(ExerciseLog)))]),
+            reader(lambda session: [row._asdict() for row in
+                                    fetch(session, ExerciseLogRow, owned_exercise_logs(select_rows(ExerciseLogRow)))]),
+        ),
+        "exercise logs with exercise": (
+            reader(lambda session: [
+                {**as_dict(log, ExerciseLogRow), "exercise": exercise.name if exercise else None}
+                for log, exercise in session.exec(owned_exercise_logs(
+                    select(ExerciseLog, Exercise).outerjoin(Exercise, ExerciseLog.exercise_id == Exercise.id)))
+            ]),
+            reader(lambda session: [
+                {**ExerciseLogRow._make(row[:width])._asdict(), "exercise": row[width]}
+                for row in session.exec(owned_exercise_logs(
+                    select(*columns(ExerciseLogRow), Exercise.name).outerjoin(Exercise, ExerciseLog.exercise_id == Exercise.id)))
+            ]),
+        ),
+    }
+
+
+def measure(read: Callable[[], List[dict]], repeat: int) -> dict:
+    rows = len(read())  # warm up statement caches and the connection pool
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        read()
+        timings.append(time.process_time() - started)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_thousand = 1000 / rows if rows else 0.0
+    return {
+        "rows": rows,
+        "cpu_ms_per_1k": round(statistics.median(timings) * 1000 * per_thousand, 2),
+        "peak_kb_per_1k": round(peak / 1024 * per_thousand, 1),
+    }
+
+
+def run(engine, user_id: int, repeat: int) -> Dict[str, dict]:
+    results = {}
+    for name, (orm_reader, row_reader) in _readers(engine, user_id).items():
+        orm = measure(orm_reader, repeat)
+        rows = measure(row_reader, repeat)
+        results[name] = {
+            "orm": orm,
+            "rows": rows,
+            "cpu_saved_pct": _saved(orm["cpu_ms_per_1k"], rows["cpu_ms_per_1k"]),
+            "memory_saved_pct": _saved(orm["peak_kb_per_1k"], rows["peak_kb_per_1k"]),
+        }
+    return results
+
+
+def _saved(before: float, after: float):
+    return round(100 * (1 - after / before), 1) if before else None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare ORM entity reads with column-only read rows")
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--logs", type=int, default=1000, help="logged sessions to seed (5 exercise logs each)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    args = parser.parse_args(argv)
+
+    configure_database(args.database_url)
+    from app.db import engine, init_db
+    init_db()
+    user = seed(engine, SeedConfig(users=1, workouts_per_user=4, exercises_per_workout=5, logs_per_user=args.logs))[0]
+    results = run(engine, user.id, args.repeat)
+
+    print(f"{'case':<30} {'rows':>7} {'ORM ms/1k':>10} {'rows ms/1k':>11} {'ORM KB/1k':>10} {'rows KB/1k':>11}")
+    for name, r in results.items():
+        print(f"{name:<30} {r['orm']['rows']:>7} {r['orm']['cpu_ms_per_1k']:>10} {r['rows']['cpu_ms_per_1k']:>11} "
+              f"{r['orm']['peak_kb_per_1k']:>10} {r['rows']['peak_kb_per_1k']:>11}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"logs": args.logs, "repeat": args.repeat, "cases": results}, f, indent=2)
+        print(f"\nWrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+import itertools
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+from app.auth import create_session_cookie
+from .seed import PASSWORD, SeededUser
+
+
+# (url, keyword arguments for httpx's request())
+Request = Tuple[str, dict]
+
+IMPORT_CSV = (
+    "Date,Workout Name,Exercise Name,Weight,Reps\n"
+    "2024-01-10 07:30:00,Imported,Squat,100,5\n"
+    "2024-01-10 07:30:00,Imported,Bench Press,80,5\n"
+)
+
+AI_REQUEST = {"workout_type": "full_body", "difficulty_level": "intermediate", "duration_minutes": 30}
+
+
+@dataclass
+class Context:
+    """Shared state for building requests: the client, seeded users and ids created during setup"""
+    client: httpx.AsyncClient
+    transport: httpx.AsyncBaseTransport
+    users: List[SeededUser]
+    template_id: Optional[int] = None
+    import_jobs: Dict[int, int] = field(default_factory=dict)  # user id -> job id
+    sequence: itertools.count = field(default_factory=itertools.count)
+    _headers: Dict[int, dict] = field(default_factory=dict)
+
+    def auth(self, user: SeededUser) -> dict:
+        if user.id not in self._headers:
+            self._headers[user.id] = {"x-session": create_session_cookie(user.id)}
+        return self._headers[user.id]
+
+    def isolated_client(self) -> httpx.AsyncClient:
+        # Routes that set a session cookie get their own client so the
+        # cookie never leaks into the shared client's other requests
+        return httpx.AsyncClient(transport=self.transport, base_url=str(self.client.base_url))
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix}-{uuid.uuid4().hex[:8]}-{next(self.sequence)}"
+
+
+@dataclass
+class Endpoint:
+    method: str
+    path: str  # route path as declared in the app; also the report key
+    build: Callable[[Context, SeededUser], Awaitable[Request]]
+    isolated: bool = False  # send with a fresh client (sets cookies)
+    after: Optional[Callable[[Context], Awaitable[None]]] = None  # untimed, once the timed phase ends
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+async def _checked(response: httpx.Response) -> dict:
+    if response.status_code >= 400:
+        raise RuntimeError(f"setup request {response.request.method} {response.request.url} "
+                           f"failed: {response.status_code} {response.text[:200]}")
+    return response.json()
+
+
+def _plain(url: str, auth: bool = True, **kwargs):
+    async def build(ctx: Context, user: SeededUser) -> Request:
+        return url, {"headers": ctx.auth(user) if auth else {}, **kwargs}
+    return build
+
+
+def _for_workout(suffix: str = "", workout_index: int = 0, **kwargs):
+    async def build(ctx: Context, user: SeededUser) -> Request:
+        return f"/api/workouts/{user.workout_ids[workout_index]}{suffix}", {"headers": ctx.auth(user), **kwargs}
+    return build
+
+
+async def _register(ctx: Context, user: SeededUser) -> Request:
+    return "/api/users/register", {"json": {"email": f"{ctx.unique('bench-register')}@example.com",
+                                            "password": PASSWORD}}
+
+
+async def _login(ctx: Context, user: SeededUser) -> Request:
+    return "/api/users/login", {"json": {"email": user.email, "password": PASSWORD}}
+
+
+async def _update_profile(ctx: Context, user: SeededUser) -> Request:
+    return "/api/users/profile", {"headers": ctx.auth(user),
+                                  "json": {"full_name": ctx.unique("Bench User"), "email": user.email}}
+
+
+async def _delete_account(ctx: Context, user: SeededUser) -> Request:
+    # A throwaway account, so the seeded users survive the run
+    async with ctx.isolated_client() as client:
+        response = await client.post("/api/users/register", json={
+            "email": f"{ctx.unique('bench-delete')}@example.com", "password": PASSWORD})
+        await _checked(response)
+        token = response.cookies["session"]
+    return "/api/users/account", {"headers": {"x-session": token}}
+
+
+async def _create_workout(ctx: Context, user: SeededUser) -> Request:
+    return "/api/workouts", {"headers": ctx.auth(user), "json": {"title": ctx.unique("Bench workout")}}
+
+
+async def _update_workout(ctx: Context, user: SeededUser) -> Request:
+    return f"/api/workouts/{user.workout_ids[0]}", {"headers": ctx.auth(user), "json": {"notes": ctx.unique("notes")}}
+
+
+async def _delete_workout(ctx: Context, user: SeededUser) -> Request:
+    url, kwargs = await _create_workout(ctx, user)
+    workout = await _checked(await ctx.client.post(url, **kwargs))
+    return f"/api/workouts/{workout['id']}", {"headers": ctx.auth(user)}
+
+
+async def _create_exercise(ctx: Context, user: SeededUser) -> Request:
+    return f"/api/workouts/{user.workout_ids[0]}/exercises", {
+        "headers": ctx.auth(user), "json": {"name": "Burpee", "sets": 3, "reps": 10}}
+
+
+async def _replace_exercises(ctx: Context, user: SeededUser) -> Request:
+    # The last workout is reserved for this route; exercise create/delete use the first. The
+    # list must name every current exercise, so it is read first, as a client does before a reorder.
+    wid = user.workout_ids[-1]
+    current = await _checked(await ctx.client.get(f"/api/workouts/{wid}/exercises", headers=ctx.auth(user)))
+    ids = [exercise["id"] for exercise in current]
+    ordered = ids if next(ctx.sequence) % 2 else list(reversed(ids))
+    return f"/api/workouts/{wid}/exercises", {"headers": ctx.auth(user), "json": [{"id": eid} for eid in ordered]}
+
+
+async def _update_exercise(ctx: Context, user: SeededUser) -> Request:
+    wid = user.workout_ids[0]
+    return f"/api/workouts/{wid}/exercises/{user.exercise_ids[wid][0]}", {
+        "headers": ctx.auth(user), "json": {"notes": ctx.unique("notes")}}
+
+
+async def _delete_exercise(ctx: Context, user: SeededUser) -> Request:
+    url, kwargs = await _create_exercise(ctx, user)
+    exercise = await _checked(await ctx.client.post(url, **kwargs))
+    return f"{url}/{exercise['id']}", {"headers": ctx.auth(user)}
+
+
+async def _log_workout(ctx: Context, user: SeededUser) -> Request:
+    wid = user.workout_ids[0]
+    return f"/api/workouts/{wid}/log", {"headers": ctx.auth(user), "json": {
+        "notes": "benchmark",
+        "exercise_logs": [{"exercise_id": eid, "actual_sets": 3, "actual_reps": 8, "weight": 60}
+                          for eid in user.exercise_ids[wid]],
+    }}
+
+
+def _template_body(ctx: Context) -> dict:
+    return {"name": ctx.unique("Bench template"), "difficulty": "beginner",
+            "exercises": [{"name": "Squat", "sets": 3, "reps": 8}, {"name": "Push-ups", "sets": 3, "reps": 15}]}
+
+
+async def _builtin_template(ctx: Context, user: SeededUser) -> Request:
+    return f"/api/templates/{ctx.template_id}", {"headers": ctx.auth(user)}
+
+
+async def _create_template(ctx: Context, user: SeededUser) -> Request:
+    return "/api/templates", {"headers": ctx.auth(user), "json": _template_body(ctx)}
+
+
+async def _custom_template(ctx: Context, user: SeededUser) -> Request:
+    url, kwargs = await _create_template(ctx, user)
+    template = await _checked(await ctx.client.post(url, **kwargs))
+    return f"/api/templates/{template['id']}", {"headers": ctx.auth(user), "json": {"description": "updated"}}
+
+
+async def _instantiate_template(ctx: Context, user: SeededUser) -> Request:
+    return f"/api/templates/{ctx.template_id}/instantiate", {"headers": ctx.auth(user), "json": {}}
+
+
+async def _start_import(ctx: Context, user: SeededUser) -> Request:
+    return "/api/import", {"headers": ctx.auth(user), "files": {"file": ("history.csv", IMPORT_CSV.encode())}}
+
+
+async def _get_import(ctx: Context, user: SeededUser) -> Request:
+    if user.id not in ctx.import_jobs:
+        url, kwargs = await _start_import(ctx, user)
+        ctx.import_jobs[user.id] = (await _checked(await ctx.client.post(url, **kwargs)))["id"]
+    return f"/api/import/{ctx.import_jobs[user.id]}", {"headers": ctx.auth(user)}
+
+
+async def _wait_for_imports(ctx: Context) -> None:
+    # Background import jobs would otherwise compete with the next endpoints
+    import asyncio
+    for user in ctx.users:
+        while True:
+            jobs = await _checked(await ctx.client.get("/api/import", headers=ctx.auth(user)))
+            if all(job["status"] in ("completed", "failed") for job in jobs):
+                break
+            await asyncio.sleep(0.05)
+
+
+ENDPOINTS = [
+    Endpoint("GET", "/healthz", _plain("/healthz", auth=False)),
+    Endpoint("GET", "/readyz", _plain("/readyz", auth=False)),
+    Endpoint("GET", "/", _plain("/", auth=False)),
+    Endpoint("GET", "/login", _plain("/login", auth=False)),
+    Endpoint("GET", "/signup", _plain("/signup", auth=False)),
+    Endpoint("GET", "/workouts", _plain("/workouts")),
+
+    Endpoint("POST", "/api/users/register", _register, isolated=True),
+    Endpoint("POST", "/api/users/login", _login, isolated=True),
+    Endpoint("POST", "/api/users/logout", _plain("/api/users/logout"), isolated=True),
+    Endpoint("GET", "/api/users/me", _plain("/api/users/me")),
+    Endpoint("PUT", "/api/users/profile", _update_profile),
+    Endpoint("PUT", "/api/users/password", _plain(
+        "/api/users/password", json={"current_password": PASSWORD, "new_password": PASSWORD})),
+    Endpoint("PUT", "/api/users/preferences", _plain("/api/users/preferences", json={})),
+    Endpoint("DELETE", "/api/users/account", _delete_account),
+
+    Endpoint("GET", "/api/workouts/ai-test", _plain("/api/workouts/ai-test", auth=False)),
+    Endpoint("GET", "/api/workouts", _plain("/api/workouts")),
+    Endpoint("GET", "/api/workouts/history", _plain("/api/workouts/history")),
+    Endpoint("GET", "/api/workouts/{wid}", _for_workout()),
+    Endpoint("POST", "/api/workouts", _create_workout),
+    Endpoint("PUT", "/api/workouts/{wid}", _update_workout),
+    Endpoint("DELETE", "/api/workouts/{wid}", _delete_workout),
+    Endpoint("GET", "/api/workouts/{wid}/exercises", _for_workout("/exercises")),
+    Endpoint("POST", "/api/workouts/{wid}/exercises", _create_exercise),
+    Endpoint("PUT", "/api/workouts/{wid}/exercises", _replace_exercises),
+    Endpoint("PUT", "/api/workouts/{wid}/exercises/{eid}", _update_exercise),
+    Endpoint("DELETE", "/api/workouts/{wid}/exercises/{eid}", _delete_exercise),
+    Endpoint("POST", "/api/workouts/{wid}/log", _log_workout),
+    Endpoint("GET", "/api/workouts/{wid}/logs", _for_workout("/logs")),
+    Endpoint("POST", "/api/workouts/ai-generate", _plain("/api/workouts/ai-generate", json=AI_REQUEST)),
+    Endpoint("POST", "/api/workouts/ai-generate-and-save", _plain(
+        "/api/workouts/ai-generate-and-save", json=AI_REQUEST)),
+
+    Endpoint("GET", "/api/analytics/progression", _plain("/api/analytics/progression")),
+    Endpoint("GET", "/api/analytics/exercises", _plain("/api/analytics/exercises")),
+    Endpoint("GET", "/api/analytics/activity", _plain("/api/analytics/activity")),
+    Endpoint("GET", "/api/exercises/search", _plain("/api/exercises/search", auth=False,
+                                                    params={"q": "squat", "facets": "true"})),
+    Endpoint("GET", "/api/search", _plain("/api/search", params={"q": "press"})),
+    Endpoint("GET", "/api/sync", _plain("/api/sync")),
+
+    Endpoint("GET", "/api/templates", _plain("/api/templates")),
+    Endpoint("GET", "/api/templates/{tid}", _builtin_template),
+    Endpoint("POST", "/api/templates", _create_template),
+    Endpoint("PUT", "/api/templates/{tid}", _custom_template),
+    Endpoint("DELETE", "/api/templates/{tid}", _custom_template),
+    Endpoint("POST", "/api/templates/{tid}/instantiate", _instantiate_template),
+
+    Endpoint("GET", "/api/export", _plain("/api/export")),
+    Endpoint("POST", "/api/import", _start_import, after=_wait_for_imports),
+    Endpoint("GET", "/api/import", _plain("/api/import")),
+    Endpoint("GET", "/api/import/{job_id}", _get_import),
+]
+
+# Operator routes deliberately left out: /admin/fail crashes or starves the
+# process under test, and the heap and profiler tools are not user traffic
+EXCLUDED_ROUTES = {
+    "POST /admin/fail/{mode}/{state}",
+    "GET /admin/heap",
+    "POST /admin/heap/start",
+    "POST /admin/heap/stop",
+    "POST /admin/heap/snapshots",
+    "GET /admin/heap/snapshots/{snapshot_id}",
+    "GET /admin/heap/diff",
+    "GET /admin/heap/objects",
+    "POST /admin/profile",
+    "POST /admin/profile/continuous/{state}",
+    "GET /admin/profile/continuous",
+}
+
+
+def stub_ai_response() -> str:
+    """Canned model output in the shape AIWorkoutGenerator parses"""
+    return json.dumps({
+        "title": "Benchmark Full Body",
+        "description": "Synthetic workout from the stubbed Groq client",
+        "estimated_duration": 30,
+        "difficulty": "intermediate",
+        "exercises": [
+            {"name": name, "sets": 3, "reps": 10, "rest_seconds": 60, "notes": ""}
+            for name in ("Squat", "Push-ups", "Barbell Row", "Plank")
+        ],
+        "tips": ["Warm up first"],
+    })
@@ -0,0 +1,111 @@
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+
+PASSWORD = "benchmark-password"
+EXERCISE_NAMES = [
+    "Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row", "Pull-ups", "Push-ups", "Lunges",
+    "Romanian Deadlift", "Leg Press", "Bicep Curl", "Tricep Dips", "Plank", "Lat Pulldown", "Calf Raise",
+]
+
+
+@dataclass
+class SeedConfig:
+    users: int = 20
+    workouts_per_user: int = 8
+    exercises_per_workout: int = 6
+    logs_per_user: int = 150
+    days: int = 365  # logs are spread over this many days before today
+    seed: int = 42
+
+
+@dataclass
+class SeededUser:
+    id: int
+    email: str
+    workout_ids: List[int] = field(default_factory=list)
+    exercise_ids: Dict[int, List[int]] = field(default_factory=dict)  # workout id -> exercise ids
+
+
+def seed(engine, config: SeedConfig) -> List[SeededUser]:
+    """Insert synthetic users with workouts, exercises and logged history.
+
+    Emails carry a run id so repeated seeding of the same database never
+    collides. Every user shares PASSWORD, hashed once.
+    """
+    # Imported here so the runner can configure the database before the app loads
+    from sqlalchemy import insert
+    from sqlmodel import Session
+    from app.auth import hash_password
+    from app.canonical import resolve_canonical
+    from app.models import User, Workout, Exercise, WorkoutLog, ExerciseLog
+    from app.rollups import rebuild_user_rollups
+
+    rng = random.Random(config.seed)
+    run_id = uuid.uuid4().hex[:8]
+    password_hash = hash_password(PASSWORD)
+    now = datetime.utcnow()
+    seeded = []
+    with Session(engine) as session:
+        canonical_ids: Dict[str, int] = {}
+        for n in range(config.users):
+            email = f"bench-{run_id}-{n}@example.com"
+            user_id = session.scalars(insert(User).returning(User.id), [
+                {"email": email, "password_hash": password_hash, "full_name": f"Bench User {n}", "created_at": now}
+            ]).one()
+            user = SeededUser(id=user_id, email=email)
+
+            workout_ids = session.scalars(
+                insert(Workout).returning(Workout.id, sort_by_parameter_order=True),
+                [{"title": f"Workout {w + 1}", "notes": "synthetic", "owner_id": user_id, "created_at": now}
+                 for w in range(config.workouts_per_user)],
+            ).all()
+            user.workout_ids = list(workout_ids)
+            for wid in workout_ids:
+                names = rng.sample(EXERCISE_NAMES, min(config.exercises_per_workout, len(EXERCISE_NAMES)))
+                user.exercise_ids[wid] = list(session.scalars(
+                    insert(Exercise).returning(Exercise.id, sort_by_parameter_order=True),
+                    [{"name": name, "sets": rng.randint(3, 5), "reps": rng.randint(5, 12), "rest_seconds": 90,
+                      "notes": None, "workout_id": wid, "position": position, "created_at": now,
+                      "canonical_id": resolve_canonical(session, name, canonical_ids)}
+                     for position, name in enumerate(names)],
+                ).all())
+
+            if config.logs_per_user and workout_ids:
+                sessions = [
+                    (rng.choice(workout_ids), now - timedelta(days=rng.uniform(0, config.days)))
+                    for _ in range(config.logs_per_user)
+                ]
+                log_ids = session.scalars(
+                    insert(WorkoutLog).returning(WorkoutLog.id, sort_by_parameter_order=True),
+                    [{"workout_id": wid, "workout_date": day, "notes": None, "created_at": day} for wid, day in sessions],
+                ).all()
+                session.execute(insert(ExerciseLog.__table__), [
+                    {"exercise_id": eid, "workout_log_id": log_id, "actual_sets": rng.randint(3, 5),
+                     "actual_reps": rng.randint(5, 12), "weight": rng.randint(20, 140), "notes": None,
+                     "created_at": day}
+                    for log_id, (wid, day) in zip(log_ids, sessions)
+                    for eid in user.exercise_ids[wid]
+                ])
+            rebuild_user_rollups(session, user_id)
+            session.commit()
+            seeded.append(user)
+    return seeded
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.db import engine, init_db
+    parser = argparse.ArgumentParser(description="Seed the configured database with synthetic training data")
+    parser.add_argument("--users", type=int, default=SeedConfig.users)
+    parser.add_argument("--workouts", type=int, default=SeedConfig.workouts_per_user)
+    parser.add_argument("--exercises", type=int, default=SeedConfig.exercises_per_workout)
+    parser.add_argument("--logs", type=int, default=SeedConfig.logs_per_user)
+    parser.add_argument("--seed", type=int, default=SeedConfig.seed)
+    args = parser.parse_args()
+    init_db()
+    users = seed(engine, SeedConfig(args.users, args.workouts, args.exercises, args.logs, seed=args.seed))
+    print(f"Seeded {len(users)} user(s); password: {PASSWORD}")
@@ -0,0 +1,121 @@
+"""Cold-start profile: import cost per package and time until /readyz answers.
+
+Usage, from Backend/:
+
+    python -m benchmarks.startup                 # 5 cold starts against a fresh SQLite file
+    python -m benchmarks.startup --top 30 --output startup.json
+
+Every run is a new interpreter, so nothing is cached between runs. The
+database is created by the first run; the later runs measure a pod
+booting against an existing, up-to-date schema.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Run in the child: times import, startup and the first /readyz, then prints them as JSON
+_BOOT = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app, on_startup
+imported = time.perf_counter()
+on_startup()
+ready = time.perf_counter()
+import httpx
+async def probe():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+        return (await client.get("/readyz")).status_code
+status = asyncio.run(probe())
+answered = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (ready - imported) * 1000,
+                  "readyz_ms": (answered - started) * 1000, "status": status}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self us, cumulative us, depth) for each line of ``python -X importtime`` output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def by_package(rows) -> Dict[str, int]:
+    """Self import time in microseconds summed per top-level package"""
+    totals = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        totals[module.split(".")[0]] += self_us
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def _child_env(data_dir: str) -> dict:
+    env = dict(os.environ, DATA_DIR=data_dir)
+    env.setdefault("GROQ_API_KEY", "startup-profile")
+    for name in ("DATABASE_URL", "DB_HOST", "DB_READ_HOST", "READ_DATABASE_URL"):
+        env.pop(name, None)
+    return env
+
+
+def boot(env: dict, importtime: bool = False) -> Tuple[dict, str]:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _BOOT]
+    result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Profile cold-start imports and time-to-ready")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="packages and modules to list")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    args = parser.parse_args(argv)
+
+    env = _child_env(tempfile.mkdtemp(prefix="workouts-startup-"))
+    first, _ = boot(env)  # creates the schema
+    runs = [boot(env)[0] for _ in range(args.runs)]
+    _, stderr = boot(env, importtime=True)
+    rows = parse_importtime(stderr)
+
+    summary = {key: round(statistics.median(r[key] for r in runs), 1) for key in ("import_ms", "startup_ms", "readyz_ms")}
+    packages = by_package(rows)
+    modules = sorted(rows, key=lambda row: -row[2])
+    app_modules = [row for row in modules if row[0].startswith("app.")]
+
+    print(f"first boot (creates schema): {first['readyz_ms']:.0f}ms to /readyz")
+    print(f"median of {args.runs} cold starts: import {summary['import_ms']}ms, "
+          f"startup {summary['startup_ms']}ms, /readyz answered after {summary['readyz_ms']}ms\n")
+    print(f"{'package':<32} {'self ms':>8}")
+    for name, self_us in list(packages.items())[:args.top]:
+        print(f"{name:<32} {self_us / 1000:>8.1f}")
+    print(f"\n{'app module':<40} {'cumulative ms':>14}")
+    for module, _, cumulative_us, _ in app_modules[:args.top]:
+        print(f"{module:<40} {cumulative_us / 1000:>14.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "first_boot": first,
+                "runs": runs,
+                "median": summary,
+                "packages_ms": {name: round(us / 1000, 2) for name, us in packages.items()},
+                "modules_ms": {module: round(cumulative / 1000, 2) for module, _, cumulative, _ in modules[:args.top]},
+            }, f, indent=2)
+        print(f"\nWrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Gunicorn settings for production: ``gunicorn -c gunicorn.conf.py app.main:app``.
+
+Every setting can be overridden from the environment; the Helm chart
+sets them through the backend ConfigMap.
+"""
+import os
+from app.server import dispose_engines, worker_count
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+workers = worker_count()
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+# Recycle workers after this many requests (plus up to jitter, so they do not all restart together)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# On SIGTERM, workers get this long to finish in-flight requests; keep terminationGracePeriodSeconds above it
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# AI generation waits on Groq, so a silent worker is only killed well after that
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def when_ready(server):
+    # Create or migrate the schema and seed reference data once here, so workers starting
+    # together find them current; the seeds also tolerate racing another replica's
+    from sqlmodel import Session
+    from app.catalog import seed_catalog
+    from app.db import engine, init_db
+    from app.workout_templates import seed_templates
+    init_db()
+    with Session(engine) as session:
+        seed_catalog(session)
+        seed_templates(session)
+    # Nothing pooled in the master may leak into the forked workers
+    dispose_engines()
+    server.log.info("Schema ready; starting %s workers", server.cfg.workers)
+
+
+def post_fork(server, worker):
+    # Belt and braces: a child must never reuse a connection opened before the fork
+    dispose_engines(close=False)
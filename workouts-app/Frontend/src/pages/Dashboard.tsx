@@ -29,6 +29,24 @@ type ExerciseData = {
   color: string
 }
 
+type ActivityBucket = {
+  sessions: number
+  exercise_logs: number
+  total_volume: number
+  distinct_exercises: number
+}
+
+type Activity = {
+  weeks: (ActivityBucket & { week_start: string })[]
+  days: (ActivityBucket & { day: string })[]
+  streaks: {
+    current_days: number
+    longest_days: number
+    current_weeks: number
+    longest_weeks: number
+  }
+}
+
 export function Dashboard() {
   const navigate = useNavigate()
   const { user, isLoading: authLoading } = useAuth()
@@ -74,8 +92,18 @@ export function Dashboard() {
     const base = (window as any).__API_BASE__ || ''
     
     try {
-      const workoutsRes = await fetch(`${base}/api/workouts`, { credentials: 'include' })
-      
+      const [workoutsRes, activityRes] = await Promise.all([
+        fetch(`${base}/api/workouts`, { credentials: 'include' }),
+        fetch(`${base}/api/analytics/activity?weeks=2`, { credentials: 'include' })
+      ])
+
+      // Weekly counts and streaks come precomputed from the server's activity rollups
+      if (activityRes.ok) {
+        applyActivity(await activityRes.json())
+      } else {
+        console.error('Failed to load activity:', activityRes.status)
+      }
+
       if (workoutsRes.ok) {
         const workouts = await workoutsRes.json()
         await loadExerciseLogs(workouts)
@@ -89,6 +117,27 @@ export function Dashboard() {
     }
   }
 
+  function applyActivity(activity: Activity) {
+    const days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    // `days` runs through today, so the last (up to) seven entries are this week starting Monday
+    const thisWeek = activity.days.slice(-((activity.days.length - 1) % 7 + 1))
+
+    setWeeklyData(days.map((day, index) => ({
+      day,
+      workouts: thisWeek[index]?.sessions || 0,
+      duration: (thisWeek[index]?.exercise_logs || 0) * 2 // estimate 2 minutes per exercise
+    })))
+
+    const weeks = activity.weeks
+    setStats(prev => ({
+      ...prev,
+      currentStreak: activity.streaks.current_days,
+      longestStreak: activity.streaks.longest_days,
+      thisWeekWorkouts: weeks[weeks.length - 1]?.sessions || 0,
+      lastWeekWorkouts: weeks[weeks.length - 2]?.sessions || 0
+    }))
+  }
+
   async function loadExerciseLogs(workouts: any[]) {
     const base = (window as any).__API_BASE__ || ''
     const exerciseCounts: { [key: string]: number } = {}
@@ -97,6 +146,17 @@ export function Dashboard() {
     let totalLoggedDuration = 0
 
     try {
+      // Per-exercise counts are aggregated server-side by canonical exercise,
+      // so "Squats" and "Back Squat" logged in different workouts count together
+      const statsRes = await fetch(`${base}/api/analytics/exercises`, { credentials: 'include' })
+      if (statsRes.ok) {
+        const { exercises } = await statsRes.json()
+        for (const item of exercises) {
+          exerciseCounts[item.exercise] = item.entries
+          totalLoggedExercises += item.entries
+        }
+      }
+
       // Load exercise logs from all workouts
       for (const workout of workouts) {
         const logsRes = await fetch(`${base}/api/workouts/${workout.id}/logs`, { credentials: 'include' })
@@ -114,18 +174,6 @@ export function Dashboard() {
             const exerciseCount = log.exercise_logs?.length || 0
             const workoutDuration = exerciseCount * 2
             totalLoggedDuration += workoutDuration
-            
-            if (log.exercise_logs && Array.isArray(log.exercise_logs)) {
-              for (const exerciseLog of log.exercise_logs) {
-                // Find the exercise name from the workout's exercises
-                const exercise = workout.exercises?.find((ex: any) => ex.id === exerciseLog.exercise_id)
-                if (exercise) {
-                  const exerciseName = exercise.name
-                  exerciseCounts[exerciseName] = (exerciseCounts[exerciseName] || 0) + 1
-                  totalLoggedExercises++
-                }
-              }
-            }
           }
         }
       }
@@ -141,19 +189,6 @@ export function Dashboard() {
   }
 
   function calculateStatsWithLogs(workouts: any[], exerciseCounts: { [key: string]: number }, totalLoggedExercises: number, workoutCounts: { [key: string]: number }, totalLoggedDuration: number) {
-    const now = new Date()
-    const oneWeekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
-    const twoWeeksAgo = new Date(now.getTime() - 14 * 24 * 60 * 60 * 1000)
-
-    let thisWeekCount = 0
-    let lastWeekCount = 0
-
-    // Count workouts by week based on actual logged workouts
-    Object.values(workoutCounts).forEach(count => {
-      // For simplicity, assume logged workouts are recent
-      thisWeekCount += count
-    })
-
     // Find favorite exercise from logged data
     const favoriteExercise = Object.keys(exerciseCounts).length > 0 
       ? Object.keys(exerciseCounts).reduce((a, b) => 
@@ -168,9 +203,6 @@ export function Dashboard() {
         )
       : 'None'
 
-    // Generate weekly data for chart
-    const weeklyData = generateWeeklyData(workouts)
-    
     // Generate exercise data for pie chart from logged exercises
     const exerciseData = Object.entries(exerciseCounts)
       .map(([name, count], index) => ({
@@ -191,35 +223,23 @@ export function Dashboard() {
       .sort((a, b) => b.count - a.count)
       .slice(0, 5) // Top 5 workouts
 
-    const newStats = {
+    setStats(prev => ({
+      ...prev,
       totalWorkouts: Object.values(workoutCounts).reduce((sum, count) => sum + count, 0), // Total logged workouts
       totalExercises: totalLoggedExercises, // Use logged exercises count
       totalDuration: totalLoggedDuration, // Use logged duration
-      currentStreak: calculateCurrentStreak(workouts),
-      longestStreak: calculateLongestStreak(workouts),
-      thisWeekWorkouts: thisWeekCount,
-      lastWeekWorkouts: lastWeekCount,
       favoriteExercise,
       favoriteWorkout,
       averageWorkoutDuration: Object.values(workoutCounts).length > 0 ? Math.round(totalLoggedDuration / Object.values(workoutCounts).reduce((sum, count) => sum + count, 0)) : 0
-    }
-
-    setStats(newStats)
-    setWeeklyData(weeklyData)
+    }))
     setExerciseData(exerciseData)
     setWorkoutData(workoutData)
     setLastUpdated(new Date())
   }
 
   function calculateStats(workouts: any[]) {
-    const now = new Date()
-    const oneWeekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
-    const twoWeeksAgo = new Date(now.getTime() - 14 * 24 * 60 * 60 * 1000)
-
     let totalExercises = 0
     let totalDuration = 0
-    let thisWeekCount = 0
-    let lastWeekCount = 0
     const exerciseCounts: { [key: string]: number } = {}
 
     // Process each workout
@@ -240,14 +260,6 @@ export function Dashboard() {
       // Calculate duration (estimate 2 minutes per exercise)
       const workoutDuration = (workout.exercises?.length || 0) * 2
       totalDuration += workoutDuration
-
-      // Count workouts by week
-      const workoutDate = new Date(workout.created_at)
-      if (workoutDate >= oneWeekAgo) {
-        thisWeekCount++
-      } else if (workoutDate >= twoWeeksAgo && workoutDate < oneWeekAgo) {
-        lastWeekCount++
-      }
     })
     
     console.log('Dashboard: Exercise counts:', exerciseCounts)
@@ -260,9 +272,6 @@ export function Dashboard() {
         )
       : 'None'
 
-    // Generate weekly data for chart
-    const weeklyData = generateWeeklyData(workouts)
-    
     // Generate exercise data for pie chart
     const exerciseData = Object.entries(exerciseCounts)
       .map(([name, count], index) => ({
@@ -273,79 +282,19 @@ export function Dashboard() {
       .sort((a, b) => b.count - a.count)
       .slice(0, 5) // Top 5 exercises
 
-    setStats({
+    setStats(prev => ({
+      ...prev,
       totalWorkouts: workouts.length,
       totalExercises,
       totalDuration,
-      currentStreak: calculateCurrentStreak(workouts),
-      longestStreak: calculateLongestStreak(workouts),
-      thisWeekWorkouts: thisWeekCount,
-      lastWeekWorkouts: lastWeekCount,
       favoriteExercise,
       favoriteWorkout: 'None', // Fallback since we don't have workout counts in this function
       averageWorkoutDuration: workouts.length > 0 ? Math.round(totalDuration / workouts.length) : 0
-    })
+    }))
 
-    setWeeklyData(weeklyData)
     setExerciseData(exerciseData)
   }
 
-  function generateWeeklyData(workouts: any[]): WeeklyData[] {
-    const days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-    const now = new Date()
-    const startOfWeek = new Date(now)
-    startOfWeek.setDate(now.getDate() - now.getDay() + 1) // Start from Monday
-
-    return days.map((day, index) => {
-      const date = new Date(startOfWeek)
-      date.setDate(startOfWeek.getDate() + index)
-      
-      const dayWorkouts = workouts.filter(workout => {
-        const workoutDate = new Date(workout.created_at)
-        return workoutDate.toDateString() === date.toDateString()
-      })
-
-      return {
-        day,
-        workouts: dayWorkouts.length,
-        duration: dayWorkouts.reduce((sum, workout) => 
-          sum + ((workout.exercises?.length || 0) * 2), 0
-        )
-      }
-    })
-  }
-
-  function calculateCurrentStreak(workouts: any[]): number {
-    // Simplified streak calculation
-    const sortedWorkouts = workouts
-      .map(w => new Date(w.created_at))
-      .sort((a, b) => b.getTime() - a.getTime())
-
-    let streak = 0
-    const today = new Date()
-    today.setHours(0, 0, 0, 0)
-
-    for (let i = 0; i < sortedWorkouts.length; i++) {
-      const workoutDate = new Date(sortedWorkouts[i])
-      workoutDate.setHours(0, 0, 0, 0)
-      
-      const daysDiff = Math.floor((today.getTime() - workoutDate.getTime()) / (1000 * 60 * 60 * 24))
-      
-      if (daysDiff === i) {
-        streak++
-      } else {
-        break
-      }
-    }
-
-    return streak
-  }
-
-  function calculateLongestStreak(workouts: any[]): number {
-    // Simplified longest streak calculation
-    return Math.max(1, Math.floor(workouts.length / 7))
-  }
-
   function getColorForIndex(index: number): string {
     const colors = [
       '#6366f1', '#ec4899', '#06b6d4', '#10b981', '#f59e0b',
@@ -7,186 +7,23 @@ type Exercise = {
   id: string
   name: string
   category: string
-  muscleGroups: string[]
+  muscle_groups: string[]
   equipment: string[]
   difficulty: 'beginner' | 'intermediate' | 'advanced'
   instructions: string[]
   tips: string[]
-  videoUrl?: string
-  imageUrl?: string
+  video_url?: string
+  image_url?: string
   variations: string[]
-  commonMistakes: string[]
+  common_mistakes: string[]
 }
 
-const exerciseLibrary: Exercise[] = [
-  {
-    id: 'push-ups',
-    name: 'Push-ups',
-    category: 'Upper Body',
-    muscleGroups: ['Chest', 'Shoulders', 'Triceps'],
-    equipment: ['None'],
-    difficulty: 'beginner',
-    instructions: [
-      'Start in a plank position with hands slightly wider than shoulders',
-      'Keep your body in a straight line from head to heels',
-      'Lower your chest toward the ground by bending your elbows',
-      'Push back up to the starting position',
-      'Keep your core tight throughout the movement'
-    ],
-    tips: [
-      'Keep your elbows at a 45-degree angle to your body',
-      'Don\'t let your hips sag or pike up',
-      'Breathe out as you push up, in as you lower down'
-    ],
-    variations: ['Incline Push-ups', 'Decline Push-ups', 'Diamond Push-ups', 'Wide Push-ups'],
-    commonMistakes: [
-      'Flaring elbows too wide',
-      'Sagging hips',
-      'Not going low enough',
-      'Rushing the movement'
-    ]
-  },
-  {
-    id: 'squats',
-    name: 'Squats',
-    category: 'Lower Body',
-    muscleGroups: ['Quadriceps', 'Glutes', 'Hamstrings'],
-    equipment: ['None'],
-    difficulty: 'beginner',
-    instructions: [
-      'Stand with feet shoulder-width apart',
-      'Toes slightly pointed outward',
-      'Lower your body by bending at the hips and knees',
-      'Go down until your thighs are parallel to the floor',
-      'Push through your heels to return to standing'
-    ],
-    tips: [
-      'Keep your chest up and core engaged',
-      'Weight should be on your heels',
-      'Knees should track over your toes'
-    ],
-    variations: ['Jump Squats', 'Pistol Squats', 'Sumo Squats', 'Wall Squats'],
-    commonMistakes: [
-      'Knees caving inward',
-      'Leaning too far forward',
-      'Not going low enough',
-      'Lifting heels off ground'
-    ]
-  },
-  {
-    id: 'plank',
-    name: 'Plank',
-    category: 'Core',
-    muscleGroups: ['Core', 'Shoulders', 'Glutes'],
-    equipment: ['None'],
-    difficulty: 'beginner',
-    instructions: [
-      'Start in a push-up position',
-      'Lower down to your forearms',
-      'Keep your body in a straight line',
-      'Engage your core and glutes',
-      'Hold the position for the desired time'
-    ],
-    tips: [
-      'Keep your hips level',
-      'Don\'t let your lower back sag',
-      'Breathe normally throughout',
-      'Look at the ground to keep neck neutral'
-    ],
-    variations: ['Side Plank', 'Plank Up-Downs', 'Plank Jacks', 'Single-Arm Plank'],
-    commonMistakes: [
-      'Hips too high or too low',
-      'Sagging lower back',
-      'Holding breath',
-      'Looking up instead of down'
-    ]
-  },
-  {
-    id: 'deadlifts',
-    name: 'Deadlifts',
-    category: 'Full Body',
-    muscleGroups: ['Hamstrings', 'Glutes', 'Lower Back', 'Traps'],
-    equipment: ['Barbell', 'Dumbbells'],
-    difficulty: 'intermediate',
-    instructions: [
-      'Stand with feet hip-width apart, bar over mid-foot',
-      'Bend at the hips and knees to grip the bar',
-      'Keep your back straight and chest up',
-      'Drive through your heels to lift the bar',
-      'Stand up straight, squeezing your glutes at the top'
-    ],
-    tips: [
-      'Keep the bar close to your body',
-      'Engage your lats before lifting',
-      'Don\'t round your back',
-      'Push your hips back on the way down'
-    ],
-    variations: ['Romanian Deadlifts', 'Sumo Deadlifts', 'Single-Leg Deadlifts', 'Trap Bar Deadlifts'],
-    commonMistakes: [
-      'Rounding the back',
-      'Bar drifting away from body',
-      'Not engaging core',
-      'Lifting with arms instead of legs'
-    ]
-  },
-  {
-    id: 'pull-ups',
-    name: 'Pull-ups',
-    category: 'Upper Body',
-    muscleGroups: ['Lats', 'Biceps', 'Rhomboids', 'Middle Traps'],
-    equipment: ['Pull-up Bar'],
-    difficulty: 'intermediate',
-    instructions: [
-      'Hang from the bar with hands slightly wider than shoulders',
-      'Engage your lats and pull your shoulder blades down',
-      'Pull your body up until your chin clears the bar',
-      'Lower yourself down with control',
-      'Keep your core engaged throughout'
-    ],
-    tips: [
-      'Start each rep from a dead hang',
-      'Don\'t swing or use momentum',
-      'Focus on pulling with your back, not just arms',
-      'Full range of motion is key'
-    ],
-    variations: ['Chin-ups', 'Wide Grip Pull-ups', 'Close Grip Pull-ups', 'L-Sit Pull-ups'],
-    commonMistakes: [
-      'Using momentum to swing up',
-      'Not going all the way down',
-      'Not engaging the lats',
-      'Rushing the movement'
-    ]
-  },
-  {
-    id: 'burpees',
-    name: 'Burpees',
-    category: 'Full Body',
-    muscleGroups: ['Chest', 'Shoulders', 'Core', 'Legs'],
-    equipment: ['None'],
-    difficulty: 'intermediate',
-    instructions: [
-      'Start standing with feet shoulder-width apart',
-      'Drop into a squat and place hands on the floor',
-      'Jump feet back into a plank position',
-      'Do a push-up',
-      'Jump feet back to squat position',
-      'Jump up with arms overhead'
-    ],
-    tips: [
-      'Keep your core tight throughout',
-      'Land softly on your feet',
-      'Maintain good form even when tired',
-      'Breathe rhythmically'
-    ],
-    variations: ['Half Burpees', 'Burpee Box Jumps', 'Single-Arm Burpees', 'Burpee Pull-ups'],
-    commonMistakes: [
-      'Skipping the push-up',
-      'Not jumping high enough at the end',
-      'Poor landing technique',
-      'Rushing and losing form'
-    ]
-  }
-]
+type Facets = {
+  category: string[]
+  muscle_group: string[]
+  equipment: string[]
+  difficulty: string[]
+}
 
 export function ExerciseLibrary() {
   const navigate = useNavigate()
@@ -197,6 +34,8 @@ export function ExerciseLibrary() {
   const [searchTerm, setSearchTerm] = useState('')
   const [selectedExercise, setSelectedExercise] = useState<Exercise | null>(null)
   const [showModal, setShowModal] = useState(false)
+  const [filteredExercises, setFilteredExercises] = useState<Exercise[]>([])
+  const [facets, setFacets] = useState<Facets | null>(null)
 
   // Redirect to login if not authenticated
   useEffect(() => {
@@ -205,20 +44,41 @@ export function ExerciseLibrary() {
     }
   }, [user, authLoading, navigate])
 
-  const categories = ['All', ...Array.from(new Set(exerciseLibrary.map(e => e.category)))]
-  const difficulties = ['All', 'beginner', 'intermediate', 'advanced']
-  const muscleGroups = ['All', ...Array.from(new Set(exerciseLibrary.flatMap(e => e.muscleGroups)))]
+  // Search runs server-side against the catalog index; only matches are downloaded
+  useEffect(() => {
+    if (!user) return
+    const base = (window as any).__API_BASE__ || ''
+    const params = new URLSearchParams({ q: searchTerm, limit: '100' })
+    if (selectedCategory !== 'All') params.set('category', selectedCategory)
+    if (selectedDifficulty !== 'All') params.set('difficulty', selectedDifficulty)
+    if (selectedMuscleGroup !== 'All') params.set('muscle_group', selectedMuscleGroup)
+    if (!facets) params.set('facets', 'true')
 
-  const filteredExercises = exerciseLibrary.filter(exercise => {
-    const matchesCategory = selectedCategory === 'All' || exercise.category === selectedCategory
-    const matchesDifficulty = selectedDifficulty === 'All' || exercise.difficulty === selectedDifficulty
-    const matchesMuscleGroup = selectedMuscleGroup === 'All' || exercise.muscleGroups.includes(selectedMuscleGroup)
-    const matchesSearch = exercise.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         exercise.muscleGroups.some(mg => mg.toLowerCase().includes(searchTerm.toLowerCase())) ||
-                         exercise.category.toLowerCase().includes(searchTerm.toLowerCase())
-    
-    return matchesCategory && matchesDifficulty && matchesMuscleGroup && matchesSearch
-  })
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(`${base}/api/exercises/search?${params}`, { credentials: 'include', signal: controller.signal })
+        if (res.ok) {
+          const data = await res.json()
+          setFilteredExercises(data.results)
+          if (data.facets) setFacets(data.facets)
+        } else {
+          console.error('Failed to search exercises:', res.status)
+        }
+      } catch (error) {
+        if ((error as any)?.name !== 'AbortError') console.error('Error searching exercises:', error)
+      }
+    }, 150) // debounce keystrokes
+
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [user, searchTerm, selectedCategory, selectedDifficulty, selectedMuscleGroup])
+
+  const categories = ['All', ...(facets?.category || [])]
+  const difficulties = ['All', 'beginner', 'intermediate', 'advanced']
+  const muscleGroups = ['All', ...(facets?.muscle_group || [])]
 
   function openExerciseModal(exercise: Exercise) {
     setSelectedExercise(exercise)
@@ -331,7 +191,7 @@ export function ExerciseLibrary() {
               
               <div className="muscle-groups">
                 <Icon name="activity" size={16} />
-                <span>{exercise.muscleGroups.join(', ')}</span>
+                <span>{exercise.muscle_groups.join(', ')}</span>
               </div>
 
               <div className="exercise-equipment">
@@ -383,7 +243,7 @@ export function ExerciseLibrary() {
                 </div>
                 <div className="info-row">
                   <span className="info-label">Muscle Groups:</span>
-                  <span className="info-value">{selectedExercise.muscleGroups.join(', ')}</span>
+                  <span className="info-value">{selectedExercise.muscle_groups.join(', ')}</span>
                 </div>
                 <div className="info-row">
                   <span className="info-label">Equipment:</span>
@@ -427,7 +287,7 @@ export function ExerciseLibrary() {
               <div className="mistakes-section">
                 <h3>Common Mistakes</h3>
                 <ul className="mistakes-list">
-                  {selectedExercise.commonMistakes.map((mistake, index) => (
+                  {selectedExercise.common_mistakes.map((mistake, index) => (
                     <li key={index}>{mistake}</li>
                   ))}
                 </ul>
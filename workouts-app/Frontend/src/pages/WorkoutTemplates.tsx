@@ -4,7 +4,8 @@ import { useAuth } from '../contexts/AuthContext'
 import { Icon } from '../components/Icon'
 
 type WorkoutTemplate = {
-  id: string
+  id: number
+  slug: string | null
   name: string
   description: string
   category: string
@@ -14,6 +15,7 @@ type WorkoutTemplate = {
   exercises: TemplateExercise[]
   image?: string
   tags: string[]
+  builtin: boolean
 }
 
 type TemplateExercise = {
@@ -24,111 +26,6 @@ type TemplateExercise = {
   notes: string
 }
 
-const workoutTemplates: WorkoutTemplate[] = [
-  {
-    id: 'full-body-beginner',
-    name: 'Full Body Beginner',
-    description: 'A complete full-body workout perfect for beginners',
-    category: 'Full Body',
-    difficulty: 'beginner',
-    duration: 30,
-    equipment: ['None'],
-    tags: ['beginner', 'full-body', 'no-equipment'],
-    exercises: [
-      { name: 'Push-ups', sets: 3, reps: 8, rest_seconds: 60, notes: 'Keep your core tight' },
-      { name: 'Bodyweight Squats', sets: 3, reps: 12, rest_seconds: 60, notes: 'Go down until thighs parallel' },
-      { name: 'Plank', sets: 3, reps: 1, rest_seconds: 60, notes: 'Hold for 30 seconds' },
-      { name: 'Lunges', sets: 3, reps: 10, rest_seconds: 60, notes: 'Alternate legs' },
-      { name: 'Mountain Climbers', sets: 3, reps: 20, rest_seconds: 60, notes: 'Keep core engaged' }
-    ]
-  },
-  {
-    id: 'upper-body-strength',
-    name: 'Upper Body Strength',
-    description: 'Build upper body strength with this focused workout',
-    category: 'Upper Body',
-    difficulty: 'intermediate',
-    duration: 45,
-    equipment: ['Dumbbells', 'Pull-up Bar'],
-    tags: ['strength', 'upper-body', 'intermediate'],
-    exercises: [
-      { name: 'Bench Press', sets: 4, reps: 8, rest_seconds: 90, notes: 'Use proper form' },
-      { name: 'Pull-ups', sets: 4, reps: 6, rest_seconds: 90, notes: 'Full range of motion' },
-      { name: 'Overhead Press', sets: 3, reps: 10, rest_seconds: 75, notes: 'Keep core tight' },
-      { name: 'Bent-over Rows', sets: 3, reps: 12, rest_seconds: 75, notes: 'Squeeze shoulder blades' },
-      { name: 'Dips', sets: 3, reps: 10, rest_seconds: 60, notes: 'Control the movement' }
-    ]
-  },
-  {
-    id: 'hiit-cardio',
-    name: 'HIIT Cardio Blast',
-    description: 'High-intensity interval training for maximum calorie burn',
-    category: 'Cardio',
-    difficulty: 'advanced',
-    duration: 25,
-    equipment: ['None'],
-    tags: ['hiit', 'cardio', 'fat-burn', 'advanced'],
-    exercises: [
-      { name: 'Burpees', sets: 4, reps: 15, rest_seconds: 30, notes: 'Full body movement' },
-      { name: 'Jump Squats', sets: 4, reps: 20, rest_seconds: 30, notes: 'Explosive movement' },
-      { name: 'High Knees', sets: 4, reps: 30, rest_seconds: 30, notes: 'Run in place' },
-      { name: 'Mountain Climbers', sets: 4, reps: 25, rest_seconds: 30, notes: 'Fast pace' },
-      { name: 'Jumping Jacks', sets: 4, reps: 40, rest_seconds: 30, notes: 'Full range' }
-    ]
-  },
-  {
-    id: 'core-focused',
-    name: 'Core Crusher',
-    description: 'Target your core with this intense ab workout',
-    category: 'Core',
-    difficulty: 'intermediate',
-    duration: 20,
-    equipment: ['None'],
-    tags: ['core', 'abs', 'strength', 'intermediate'],
-    exercises: [
-      { name: 'Plank', sets: 3, reps: 1, rest_seconds: 45, notes: 'Hold for 60 seconds' },
-      { name: 'Russian Twists', sets: 3, reps: 20, rest_seconds: 45, notes: 'Keep feet off ground' },
-      { name: 'Bicycle Crunches', sets: 3, reps: 25, rest_seconds: 45, notes: 'Slow and controlled' },
-      { name: 'Leg Raises', sets: 3, reps: 15, rest_seconds: 45, notes: 'Keep legs straight' },
-      { name: 'Mountain Climbers', sets: 3, reps: 30, rest_seconds: 45, notes: 'Core engaged' }
-    ]
-  },
-  {
-    id: 'leg-day',
-    name: 'Leg Day Destroyer',
-    description: 'Build strong, powerful legs with this comprehensive workout',
-    category: 'Lower Body',
-    difficulty: 'advanced',
-    duration: 50,
-    equipment: ['Barbell', 'Dumbbells'],
-    tags: ['legs', 'strength', 'advanced', 'power'],
-    exercises: [
-      { name: 'Back Squats', sets: 4, reps: 8, rest_seconds: 120, notes: 'Full depth' },
-      { name: 'Romanian Deadlifts', sets: 4, reps: 10, rest_seconds: 120, notes: 'Keep back straight' },
-      { name: 'Walking Lunges', sets: 3, reps: 12, rest_seconds: 90, notes: 'Each leg' },
-      { name: 'Bulgarian Split Squats', sets: 3, reps: 10, rest_seconds: 90, notes: 'Each leg' },
-      { name: 'Calf Raises', sets: 4, reps: 20, rest_seconds: 60, notes: 'Full range of motion' }
-    ]
-  },
-  {
-    id: 'yoga-flow',
-    name: 'Morning Yoga Flow',
-    description: 'Start your day with this gentle yoga sequence',
-    category: 'Flexibility',
-    difficulty: 'beginner',
-    duration: 30,
-    equipment: ['Yoga Mat'],
-    tags: ['yoga', 'flexibility', 'morning', 'beginner'],
-    exercises: [
-      { name: 'Sun Salutation A', sets: 3, reps: 1, rest_seconds: 30, notes: 'Flow smoothly' },
-      { name: 'Warrior I', sets: 2, reps: 1, rest_seconds: 30, notes: 'Hold for 30 seconds each side' },
-      { name: 'Downward Dog', sets: 3, reps: 1, rest_seconds: 30, notes: 'Hold for 45 seconds' },
-      { name: 'Child\'s Pose', sets: 2, reps: 1, rest_seconds: 30, notes: 'Relax and breathe' },
-      { name: 'Corpse Pose', sets: 1, reps: 1, rest_seconds: 0, notes: 'Final relaxation' }
-    ]
-  }
-]
-
 export function WorkoutTemplates() {
   const navigate = useNavigate()
   const { user, isLoading: authLoading } = useAuth()
@@ -136,6 +33,7 @@ export function WorkoutTemplates() {
   const [selectedDifficulty, setSelectedDifficulty] = useState<string>('All')
   const [searchTerm, setSearchTerm] = useState('')
   const [isCreating, setIsCreating] = useState(false)
+  const [workoutTemplates, setWorkoutTemplates] = useState<WorkoutTemplate[]>([])
 
   // Redirect to login if not authenticated
   useEffect(() => {
@@ -144,6 +42,26 @@ export function WorkoutTemplates() {
     }
   }, [user, authLoading, navigate])
 
+  useEffect(() => {
+    if (user) {
+      loadTemplates()
+    }
+  }, [user])
+
+  async function loadTemplates() {
+    const base = (window as any).__API_BASE__ || ''
+    try {
+      const res = await fetch(`${base}/api/templates`, { credentials: 'include' })
+      if (res.ok) {
+        setWorkoutTemplates(await res.json())
+      } else {
+        console.error('Failed to load templates:', res.status)
+      }
+    } catch (error) {
+      console.error('Error loading templates:', error)
+    }
+  }
+
   const categories = ['All', ...Array.from(new Set(workoutTemplates.map(t => t.category)))]
   const difficulties = ['All', 'beginner', 'intermediate', 'advanced']
 
@@ -164,30 +82,15 @@ export function WorkoutTemplates() {
     try {
       const base = (window as any).__API_BASE__ || ''
       
-      // Create the workout
-      const workoutRes = await fetch(`${base}/api/workouts`, {
+      // The server creates the workout and all of its exercises in one transaction
+      const workoutRes = await fetch(`${base}/api/templates/${template.id}/instantiate`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         credentials: 'include',
-        body: JSON.stringify({
-          title: template.name,
-          notes: template.description
-        })
+        body: JSON.stringify({})
       })
 
       if (workoutRes.ok) {
-        const workout = await workoutRes.json()
-        
-        // Add exercises to the workout
-        for (const exercise of template.exercises) {
-          await fetch(`${base}/api/workouts/${workout.id}/exercises`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            credentials: 'include',
-            body: JSON.stringify(exercise)
-          })
-        }
-
         alert('Workout created successfully!')
         navigate('/workouts')
       } else {
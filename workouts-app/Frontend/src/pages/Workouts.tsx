@@ -18,6 +18,7 @@ type Exercise = {
   reps: number;
   rest_seconds: number;
   notes?: string;
+  position?: number;
 }
 
 type WorkoutLog = {
@@ -292,6 +293,35 @@ export function Workouts() {
     loadExercises(selectedWorkout.id)
   }
 
+  async function moveExercise(index: number, offset: number) {
+    const base = (window as any).__API_BASE__ || ''
+    if (!selectedWorkout?.exercises) return
+    const target = index + offset
+    if (target < 0 || target >= selectedWorkout.exercises.length) return
+
+    const reordered = [...selectedWorkout.exercises]
+    ;[reordered[index], reordered[target]] = [reordered[target], reordered[index]]
+
+    // The full list is saved in one request; the server diffs it and commits once. It must name
+    // every current exercise: a 409 means this copy is stale, so reload instead of retrying it
+    const res = await fetch(`${base}/api/workouts/${selectedWorkout.id}/exercises`, {
+      method: 'PUT',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      body: JSON.stringify(reordered.map(ex => ({ id: ex.id })))
+    })
+    if (res.ok) {
+      const workout = await res.json()
+      setSelectedWorkout(prev => prev && prev.id === workout.id ? { ...prev, exercises: workout.exercises } : prev)
+      setWorkouts(prev => prev.map(w => w.id === workout.id ? { ...w, exercises: workout.exercises } : w))
+    } else if (res.status === 409) {
+      loadExercises(selectedWorkout.id)
+      showError('Error', 'The exercises changed elsewhere. The list was reloaded, please try again.')
+    } else {
+      showError('Error', 'Failed to reorder exercises. Please try again.')
+    }
+  }
+
   async function logWorkout(e: React.FormEvent) {
     const base = (window as any).__API_BASE__ || ''
     e.preventDefault()
@@ -776,7 +806,7 @@ export function Workouts() {
           <div>
             <h4>Exercises</h4>
             {selectedWorkout.exercises && selectedWorkout.exercises.length > 0 ? (
-              selectedWorkout.exercises.map(exercise => (
+              selectedWorkout.exercises.map((exercise, index) => (
                 <div key={exercise.id} className="exercise-card">
                   <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
                     <div>
@@ -795,12 +825,30 @@ export function Workouts() {
                         </div>
                       )}
                     </div>
-                    <button 
-                      className="delete-btn"
-                      onClick={() => deleteExercise(exercise.id)}
-                    >
-                      <Icon name="trash-2" size={16} />
-                    </button>
+                    <div style={{ display: 'flex', gap: '4px' }}>
+                      <button
+                        className="delete-btn"
+                        title="Move up"
+                        disabled={index === 0}
+                        onClick={() => moveExercise(index, -1)}
+                      >
+                        <Icon name="sort-asc" size={16} />
+                      </button>
+                      <button
+                        className="delete-btn"
+                        title="Move down"
+                        disabled={index === selectedWorkout.exercises!.length - 1}
+                        onClick={() => moveExercise(index, 1)}
+                      >
+                        <Icon name="sort-desc" size={16} />
+                      </button>
+                      <button 
+                        className="delete-btn"
+                        onClick={() => deleteExercise(exercise.id)}
+                      >
+                        <Icon name="trash-2" size={16} />
+                      </button>
+                    </div>
                   </div>
                 </div>
               ))